@@ -16,12 +16,14 @@ Output: attributed credit per channel, plus summary statistics.
 import json
 import logging
 import math
+import threading
 from collections import defaultdict
 from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
 
+from app.services_journey_cache import journey_dataset_key
 from app.services_metrics import journey_outcome_summary, journey_revenue_value
 from app.utils.taxonomy import normalize_touchpoint, load_taxonomy
 
@@ -329,7 +331,7 @@ def compute_markov_diagnostics(
     diagnostics: Dict[str, Any] = {}
 
     total_journeys = len(journeys)
-    converted_journeys = sum(1 for j in journeys if j.get("converted", True))
+    converted_journeys = 0
 
     # Rebuild transition counts (mirrors markov() logic, simplified)
     transitions: Dict[Tuple[str, str], int] = defaultdict(int)
@@ -338,6 +340,7 @@ def compute_markov_diagnostics(
         converted = j.get("converted", True)
         channels = ["__start__"] + [tp.get("channel", "unknown") for tp in tps]
         if converted:
+            converted_journeys += 1
             channels.append("__conversion__")
         else:
             channels.append("__null__")
@@ -476,40 +479,22 @@ MODEL_FN = {
 }
 
 
-def run_attribution(
-    journeys: List[Dict],
-    model: str = "linear",
-    **kwargs,
-) -> Dict[str, Any]:
-    """
-    Run a single attribution model on a list of customer journeys.
+# Model-independent inputs of the last run_attribution call. Running every model over the
+# same journey list (run-all, results refresh) then prepares the totals only once.
+_PREPARED_INPUTS_LOCK = threading.Lock()
+_PREPARED_INPUTS: Dict[str, Any] = {"journeys": None, "length": 0, "value_mode": None, "prepared": None}
 
-    Parameters
-    ----------
-    journeys : list of journey dicts with keys:
-        - customer_id: str
-        - touchpoints: list of {"channel": str, "timestamp": str, ...}
-        - conversion_value: float
-        - converted: bool (default True)
-    model : one of ATTRIBUTION_MODELS
-    **kwargs : extra params (e.g. half_life_days for time_decay)
 
-    Returns
-    -------
-    dict with:
-        - model: str
-        - channel_credit: {channel: attributed_value}
-        - total_conversions: int
-        - total_value: float
-        - channels: list of channel detail dicts
-    """
-    if model not in MODEL_FN:
-        raise ValueError(f"Unknown model: {model}. Choose from {ATTRIBUTION_MODELS}")
+def _prepared_attribution_inputs(journeys: List[Dict], value_mode: str) -> Dict[str, Any]:
+    with _PREPARED_INPUTS_LOCK:
+        if (
+            _PREPARED_INPUTS["journeys"] is journeys
+            and _PREPARED_INPUTS["length"] == len(journeys)
+            and _PREPARED_INPUTS["value_mode"] == value_mode
+        ):
+            return _PREPARED_INPUTS["prepared"]
 
-    fn = MODEL_FN[model]
     converted_journeys = [j for j in journeys if j.get("converted", True)]
-    value_mode = str(kwargs.pop("value_mode", "gross_only") or "gross_only")
-    total_conversions = 0.0
     gross_total_conversions = 0.0
     net_total_conversions = 0.0
     gross_total_value = 0.0
@@ -546,6 +531,64 @@ def run_attribution(
         elif path_type == "mixed_path":
             interaction_summary["mixed_path_conversions"] += selected_count
 
+    prepared = {
+        "converted_journeys": converted_journeys,
+        "gross_total_conversions": gross_total_conversions,
+        "net_total_conversions": net_total_conversions,
+        "gross_total_value": gross_total_value,
+        "net_total_value": net_total_value,
+        "refunded_value": refunded_value,
+        "cancelled_value": cancelled_value,
+        "invalid_leads": invalid_leads,
+        "interaction_summary": interaction_summary,
+    }
+    with _PREPARED_INPUTS_LOCK:
+        _PREPARED_INPUTS.update(journeys=journeys, length=len(journeys), value_mode=value_mode, prepared=prepared)
+    return prepared
+
+
+def run_attribution(
+    journeys: List[Dict],
+    model: str = "linear",
+    **kwargs,
+) -> Dict[str, Any]:
+    """
+    Run a single attribution model on a list of customer journeys.
+
+    Parameters
+    ----------
+    journeys : list of journey dicts with keys:
+        - customer_id: str
+        - touchpoints: list of {"channel": str, "timestamp": str, ...}
+        - conversion_value: float
+        - converted: bool (default True)
+    model : one of ATTRIBUTION_MODELS
+    **kwargs : extra params (e.g. half_life_days for time_decay)
+
+    Returns
+    -------
+    dict with:
+        - model: str
+        - channel_credit: {channel: attributed_value}
+        - total_conversions: int
+        - total_value: float
+        - channels: list of channel detail dicts
+    """
+    if model not in MODEL_FN:
+        raise ValueError(f"Unknown model: {model}. Choose from {ATTRIBUTION_MODELS}")
+
+    fn = MODEL_FN[model]
+    value_mode = str(kwargs.pop("value_mode", "gross_only") or "gross_only")
+    prepared = _prepared_attribution_inputs(journeys, value_mode)
+    converted_journeys = prepared["converted_journeys"]
+    gross_total_conversions = prepared["gross_total_conversions"]
+    net_total_conversions = prepared["net_total_conversions"]
+    gross_total_value = prepared["gross_total_value"]
+    net_total_value = prepared["net_total_value"]
+    refunded_value = prepared["refunded_value"]
+    cancelled_value = prepared["cancelled_value"]
+    invalid_leads = prepared["invalid_leads"]
+    interaction_summary = prepared["interaction_summary"]
     total_conversions = net_total_conversions if value_mode == "net_only" else gross_total_conversions
     total_value = net_total_value if value_mode == "net_only" else gross_total_value
 
@@ -853,14 +896,17 @@ def analyze_paths(
     path_times_total: Dict[str, float] = defaultdict(float)
     path_times_n: Dict[str, int] = defaultdict(int)
 
-    for j in used_for_lengths:
-        tps = j.get("touchpoints", [])
-        path = " > ".join(tp.get("channel", "?") for tp in tps)
+    # Each journey's path string is joined once and reused for the time-to-conversion stats.
+    paths = [" > ".join(tp.get("channel", "?") for tp in j.get("touchpoints", [])) for j in used_for_lengths]
+    for path in paths:
         path_counts[path] += 1
+    converted_paths = (
+        [path for j, path in zip(journeys, paths) if j.get("converted", True)] if include_non_converted else paths
+    )
 
     # Time to conversion – still based only on converted journeys
     times_to_conv: List[float] = []
-    for j in converted:
+    for j, path in zip(converted, converted_paths):
         tps = j.get("touchpoints", [])
         if len(tps) >= 2:
             try:
@@ -870,7 +916,6 @@ def analyze_paths(
                     delta = (last_ts - first_ts).total_seconds() / 86400.0
                     if delta >= 0:
                         times_to_conv.append(delta)
-                        path = " > ".join(tp.get("channel", "?") for tp in tps)
                         path_times_total[path] += delta
                         path_times_n[path] += 1
             except Exception:
@@ -960,9 +1005,51 @@ def _step_string(tp: Dict, level: str) -> str:
     return ch
 
 
+# Step sequences of the last journey dataset seen per level, so path endpoints hitting the
+# same cached dataset do not rebuild every journey's steps on each request.
+_JOURNEY_STEP_PATHS_LOCK = threading.Lock()
+_JOURNEY_STEP_PATHS: Dict[str, Dict[str, Any]] = {}
+
+
+def journey_step_paths(journeys: List[Dict], level: str = "channel") -> Tuple[List[List[str]], List[str]]:
+    """Per-journey step lists and their ``" > "``-joined path strings, index-aligned with `journeys`.
+
+    Cached per journey dataset; callers must treat the returned lists as read-only.
+    """
+    dataset_key = journey_dataset_key(journeys)
+    with _JOURNEY_STEP_PATHS_LOCK:
+        cached = _JOURNEY_STEP_PATHS.get(level)
+        if cached is not None and cached["key"] == dataset_key:
+            return cached["steps"], cached["paths"]
+    steps = [[_step_string(tp, level) for tp in journey.get("touchpoints", [])] for journey in journeys]
+    paths = [" > ".join(journey_steps) for journey_steps in steps]
+    with _JOURNEY_STEP_PATHS_LOCK:
+        _JOURNEY_STEP_PATHS[level] = {"key": dataset_key, "journeys": journeys, "steps": steps, "paths": paths}
+    return steps, paths
+
+
+def _next_step_after_prefix(tps: List[Dict], level: str, prefix: str) -> Optional[str]:
+    """Step that follows `prefix` in a journey's path, or None when the path does not start with it."""
+    if not tps:
+        return None
+    if prefix == "":
+        return _step_string(tps[0], level)
+    joined = ""
+    for i, tp in enumerate(tps):
+        step = _step_string(tp, level)
+        joined = f"{joined} > {step}" if i else step
+        # Joined prefixes only grow, so the first one at least as long decides.
+        if len(joined) >= len(prefix):
+            if joined == prefix and i + 1 < len(tps):
+                return _step_string(tps[i + 1], level)
+            return None
+    return None
+
+
 def compute_next_best_action(
     journeys: List[Dict],
     level: str = "channel",
+    only_prefix: Optional[str] = None,
 ) -> Dict[str, List[Dict[str, Any]]]:
     """
     For each path prefix, compute recommended next step (channel or channel:campaign) based on
@@ -970,6 +1057,7 @@ def compute_next_best_action(
 
     level: "channel" = steps are channel only; "campaign" = steps are "channel:campaign" when
     touchpoint has campaign, else channel.
+    only_prefix: when set, only that prefix is aggregated (the result has at most that key).
 
     Returns a dict keyed by path prefix with value = list of
     { channel, campaign (optional), step, count, conversions, conversion_rate, avg_value }
@@ -982,10 +1070,22 @@ def compute_next_best_action(
 
     for j in journeys:
         tps = j.get("touchpoints", [])
-        steps = [_step_string(tp, level) for tp in tps]
         converted = j.get("converted", True)
+        # Revenue dedupe is order-dependent, so every journey is valued even when skipped.
         value = journey_revenue_value(j, dedupe_seen=dedupe_seen)
 
+        if only_prefix is not None:
+            next_step = _next_step_after_prefix(tps, level, only_prefix)
+            if next_step is None:
+                continue
+            key = (only_prefix, next_step)
+            step_stats[key]["count"] += 1
+            if converted:
+                step_stats[key]["conversions"] += 1
+                step_stats[key]["total_value"] += value
+            continue
+
+        steps = [_step_string(tp, level) for tp in tps]
         for i in range(len(steps)):
             prefix = " > ".join(steps[:i]) if i > 0 else ""
             next_step = steps[i]
@@ -1,5 +1,6 @@
 from dataclasses import dataclass
-from typing import Dict, List, Optional
+from types import MappingProxyType
+from typing import List, Mapping, Optional
 
 from fastapi import Depends, Header, HTTPException, Request
 
@@ -13,20 +14,20 @@ from app.services_auth import SESSION_COOKIE_NAME, resolve_auth_context
 class PermissionContext:
     user_id: str
     workspace_id: str
-    permissions: set[str]
+    permissions: frozenset[str]
     source: str  # session | legacy_header
 
 
-_ALL_PERMISSION_KEYS = {p["key"] for p in RBAC_PERMISSIONS}
-_VIEW_PERMISSIONS = {p for p in _ALL_PERMISSION_KEYS if p.endswith(".view")}
-_EDITOR_PERMISSIONS = _ALL_PERMISSION_KEYS - {"users.manage", "roles.manage", "audit.view"}
-_LEGACY_ROLE_PERMISSION_MAP: Dict[str, set[str]] = {
-    "viewer": set(_VIEW_PERMISSIONS),
-    "analyst": set(_EDITOR_PERMISSIONS),
-    "editor": set(_EDITOR_PERMISSIONS),
-    "power_user": set(_ALL_PERMISSION_KEYS),
-    "admin": set(_ALL_PERMISSION_KEYS),
-}
+_ALL_PERMISSION_KEYS: frozenset[str] = frozenset(p["key"] for p in RBAC_PERMISSIONS)
+_VIEW_PERMISSIONS: frozenset[str] = frozenset(p for p in _ALL_PERMISSION_KEYS if p.endswith(".view"))
+_EDITOR_PERMISSIONS: frozenset[str] = _ALL_PERMISSION_KEYS - frozenset({"users.manage", "roles.manage", "audit.view"})
+_LEGACY_ROLE_PERMISSION_MAP: Mapping[str, frozenset[str]] = MappingProxyType({
+    "viewer": _VIEW_PERMISSIONS,
+    "analyst": _EDITOR_PERMISSIONS,
+    "editor": _EDITOR_PERMISSIONS,
+    "power_user": _ALL_PERMISSION_KEYS,
+    "admin": _ALL_PERMISSION_KEYS,
+})
 _LEGACY_HEADERLESS_VIEWER_PREFIXES = (
     "/api/settings",
     "/api/taxonomy",
@@ -53,7 +54,7 @@ def get_permission_context(
         return PermissionContext(
             user_id=ctx.user.id,
             workspace_id=ctx.workspace.id,
-            permissions=set(ctx.permissions),
+            permissions=ctx.permissions,
             source="session",
         )
 
@@ -63,11 +64,10 @@ def get_permission_context(
         role = "viewer" if request.url.path.startswith(_LEGACY_HEADERLESS_VIEWER_PREFIXES) else ""
     else:
         role = (x_user_role or "viewer").strip().lower()
-    perms = _LEGACY_ROLE_PERMISSION_MAP.get(role, set())
     return PermissionContext(
         user_id=(x_user_id or "system"),
         workspace_id=DEFAULT_WORKSPACE_ID,
-        permissions=set(perms),
+        permissions=_LEGACY_ROLE_PERMISSION_MAP.get(role, frozenset()),
         source="legacy_header",
     )
 
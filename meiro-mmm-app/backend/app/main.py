@@ -1,17 +1,22 @@
 from fastapi import FastAPI, HTTPException, Query, Body, Request, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, Field, ValidationError, field_validator
+from typing import List, Literal, Optional, Dict, Any, Deque, Tuple, Union
+from collections import defaultdict, deque
 from contextlib import asynccontextmanager, contextmanager
 from pathlib import Path
 import json
+import orjson
 import os
+import re
 import time
 import uuid
 import hashlib
 import secrets
 import logging
+import sys
+import tempfile
 import threading
 from datetime import date, datetime, timedelta
 
@@ -21,12 +26,12 @@ from app.utils import datasource_config as ds_config
 from app.utils.taxonomy import load_taxonomy
 from app.utils.kpi_config import load_kpi_config, save_kpi_config, KpiConfig, KpiDefinition
 from app.utils.api_params import clamp_int, resolve_per_page, resolve_sort_dir
+from app.utils.json_response import ORJSON_OPTIONS, ORJSONResponse
 from app.db import Base, engine, get_db, SessionLocal
 from app.models_config_dq import (
     ModelConfig as ORMModelConfig,
     ModelConfigAudit,
     ModelConfigStatus,
-    Role as ORMRole,
     SecurityAuditLog as ORMSecurityAuditLog,
     DQSnapshot,
     DQAlertRule,
@@ -55,6 +60,7 @@ from app.services_attribution_defaults import build_attribution_defaults_overvie
 from app.services_nba_defaults import (
     build_nba_preview_summary,
     filter_nba_recommendations,
+    peek_next_best_action_cache,
 )
 from app.services_mmm_defaults import build_mmm_defaults_preview
 from app.services_attention_queue import build_attention_queue
@@ -70,6 +76,7 @@ from app.services_kpi_decisions import build_kpi_overview, build_kpi_suggestions
 from app.services_journey_cache import (
     get_journey_cache_status,
     invalidate_journey_cache,
+    journey_dataset_key,
     load_cached_journeys,
 )
 from app.services_model_config_suggestions import suggest_model_config_from_journeys
@@ -85,7 +92,7 @@ from app.services_journey_settings import (
     list_journey_settings_versions,
     update_journey_settings_draft,
 )
-from app.services_access_control import ensure_access_control_seed_data, DEFAULT_WORKSPACE_ID
+from app.services_access_control import ensure_access_control_seed_data, get_system_admin_role_id, DEFAULT_WORKSPACE_ID
 from app.services_auth import SESSION_COOKIE_NAME, resolve_auth_context, verify_csrf
 from app.core.permissions import (
     PermissionContext,
@@ -96,7 +103,6 @@ from app.core.permissions import (
 from app.services_data_quality import compute_dq_snapshots, evaluate_alert_rules
 from app.services_conversions import (
     apply_model_config_to_journeys,
-    filter_journeys_by_quality,
     journey_quality_score,
     load_journeys_from_db,
     persist_journeys_as_conversion_paths,
@@ -145,13 +151,21 @@ from app.modules.mmm.router import create_router as create_mmm_router
 from app.modules.segments.router import create_router as create_segments_router
 from app.modules.mmm import service as mmm_service
 from app.modules.mmm.schemas import ModelConfig
+from app.modules.settings.service import clear_settings_file_cache, load_settings_file
 from app.modules.settings.schemas import (
     AdsGovernanceSettings,
-    AttributionSettings,
+    AttributionDefaultsOverviewResponse,
+    AttributionPreviewPayload,
+    AttributionPreviewResponse,
     KpiConfigModel,
     KpiDefinitionModel,
-    MMMSettings,
-    NBASettings,
+    MMMDefaultsPreviewPayload,
+    MMMDefaultsPreviewResponse,
+    NBAPreviewPayload,
+    NBAPreviewResponse,
+    NBATestPayload,
+    NBATestRecommendation,
+    NBATestResponse,
     RevenueConfig,
     Settings,
 )
@@ -189,6 +203,7 @@ from app.services_performance_helpers import (
     build_performance_meta as _build_performance_meta,
     build_mapping_coverage as _build_mapping_coverage,
     compute_campaign_trends as _compute_campaign_trends,
+    compute_campaign_uplift as _compute_campaign_uplift,
     compute_total_spend_for_period as _perf_compute_total_spend_for_period,
     compute_total_converted_value_for_period as _perf_compute_total_converted_value_for_period,
     summarize_mapped_current as _summarize_mapped_current,
@@ -223,7 +238,6 @@ from app.services_incrementality import (
     serialize_experiment_detail,
     serialize_experiment_summary,
 )
-from app.mmm_engine import fit_model as mmm_fit_model, engine_info
 from app.connectors import meiro_cdp
 from app.utils.meiro_config import (
     get_last_test_at,
@@ -243,7 +257,7 @@ from app.attribution_engine import (
     compute_next_best_action,
     has_any_campaign,
     ATTRIBUTION_MODELS,
-    _step_string,
+    journey_step_paths,
 )
 
 # Create DB tables if a real database is configured. This is idempotent and cheap
@@ -483,9 +497,16 @@ async def _app_lifespan(_app: FastAPI):
         yield
     finally:
         MEIRO_AUTO_REPLAY_STOP.set()
+        if _RUNS_SAVE_TIMER is not None:
+            _save_runs(immediate=True)
 
 
-app = FastAPI(title="Meiro Attribution Dashboard API", version="0.3.0", lifespan=_app_lifespan)
+app = FastAPI(
+    title="Meiro Attribution Dashboard API",
+    version="0.3.0",
+    lifespan=_app_lifespan,
+    default_response_class=ORJSONResponse,
+)
 MEIRO_AUTO_REPLAY_RUNNER: Dict[str, Any] = {}
 MEIRO_AUTO_REPLAY_THREAD: Optional[threading.Thread] = None
 MEIRO_AUTO_REPLAY_STOP = threading.Event()
@@ -505,10 +526,15 @@ def _default_session_cookie_secure() -> bool:
 SESSION_COOKIE_SECURE = _default_session_cookie_secure()
 SESSION_COOKIE_SAMESITE = (os.getenv("SESSION_COOKIE_SAMESITE", "lax").strip().lower() or "lax")
 SESSION_COOKIE_MAX_AGE = max(3600, int(os.getenv("SESSION_COOKIE_MAX_AGE_SECONDS", str(60 * 60 * 24 * 7))))
-CSRF_EXEMPT_PATHS = {
+CSRF_EXEMPT_PATHS = frozenset({
     "/api/auth/login",
     "/api/auth/status",
-}
+})
+CSRF_UNSAFE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+# Matches /api/* paths that are not CSRF-exempt in a single regex call.
+_CSRF_PROTECTED_PATH_RE = re.compile(
+    r"^/api/(?!(?:%s)$)" % "|".join(re.escape(p[len("/api/"):]) for p in sorted(CSRF_EXEMPT_PATHS))
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -574,12 +600,9 @@ def _start_meiro_auto_replay_worker() -> None:
 async def csrf_protection_middleware(request: Request, call_next):
     # Enforce CSRF for cookie-authenticated unsafe methods. Legacy header-based
     # callers without session cookies remain unaffected until RBAC rollout.
-    if (
-        request.method in {"POST", "PUT", "PATCH", "DELETE"}
-        and request.url.path.startswith("/api/")
-        and request.url.path not in CSRF_EXEMPT_PATHS
-        and request.cookies.get(SESSION_COOKIE_NAME)
-    ):
+    if request.method not in CSRF_UNSAFE_METHODS:
+        return await call_next(request)
+    if _CSRF_PROTECTED_PATH_RE.match(request.url.path) and request.cookies.get(SESSION_COOKIE_NAME):
         try:
             with _internal_db_session() as db:
                 verify_csrf(db, request)
@@ -588,6 +611,11 @@ async def csrf_protection_middleware(request: Request, call_next):
     return await call_next(request)
 
 
+ExpenseSourceType = Literal["manual", "import"]
+ExpenseStatus = Literal["active", "deleted"]
+ExpenseActorType = Literal["manual", "system", "import"]
+
+
 class ExpenseEntry(BaseModel):
     # Core classification
     channel: str
@@ -614,23 +642,29 @@ class ExpenseEntry(BaseModel):
     notes: Optional[str] = None
 
     # Provenance & status
-    source_type: str = "manual"  # manual | import
+    source_type: ExpenseSourceType = "manual"
     source_name: Optional[str] = None  # e.g. "google_ads", "meta_ads"
-    status: str = "active"  # active | deleted
+    status: ExpenseStatus = "active"
 
     # Audit trail (shallow, no user system)
     created_at: Optional[str] = None  # ISO timestamp
     updated_at: Optional[str] = None  # ISO timestamp
     deleted_at: Optional[str] = None  # ISO timestamp
-    actor_type: str = "manual"  # manual | system | import
+    actor_type: ExpenseActorType = "manual"
     change_note: Optional[str] = None
 
+    @field_validator("channel", "cost_type", "currency", "reporting_currency", "source_name")
+    @classmethod
+    def _intern_low_cardinality(cls, value: Optional[str]) -> Optional[str]:
+        # A handful of distinct values repeat across every entry; share one string object each.
+        return sys.intern(value) if value is not None else None
+
 
 class ExpenseChangeEvent(BaseModel):
     expense_id: str
     timestamp: str
-    event_type: str  # created | updated | deleted | restored
-    actor_type: str  # manual | system | import
+    event_type: Literal["created", "updated", "deleted", "restored"]
+    actor_type: ExpenseActorType
     note: Optional[str] = None
 
 class AttributionMappingConfig(BaseModel):
@@ -657,7 +691,12 @@ class FromCDPRequest(BaseModel):
 RUNS: Dict[str, Any] = {}
 DATASETS: Dict[str, Dict[str, Any]] = {}
 EXPENSES: Dict[str, ExpenseEntry] = {}  # key: arbitrary unique id
-EXPENSE_AUDIT_LOG: List[ExpenseChangeEvent] = []
+# Recent audit events stay in memory (and expenses_audit.json); once the hot buffer
+# reaches EXPENSE_AUDIT_HOT_LIMIT the oldest half is appended to a JSONL archive.
+EXPENSE_AUDIT_HOT_LIMIT = 10_000
+EXPENSE_AUDIT_LOG: Deque[ExpenseChangeEvent] = deque(maxlen=EXPENSE_AUDIT_HOT_LIMIT)
+# Per-expense view of EXPENSE_AUDIT_LOG; rebuilt whenever the hot buffer is replaced or trimmed.
+_EXPENSE_AUDIT_INDEX_STATE: Dict[str, Any] = {"log": None, "index": {}}
 
 # Import health & reconciliation (per-source sync state)
 IMPORT_SYNC_STATE: Dict[str, Dict[str, Any]] = {}  # source -> { last_success_at, last_attempt_at, status, last_error, action_hint, records_imported, platform_total, period_start, period_end }
@@ -686,22 +725,70 @@ def _load_runs():
     global RUNS
     if RUNS_FILE.exists():
         try:
-            raw = RUNS_FILE.read_text(encoding="utf-8")
-            RUNS.update(json.loads(raw))
+            RUNS.update(orjson.loads(RUNS_FILE.read_bytes()))
         except Exception:
             pass
 
 
-def _save_runs():
-    """Persist run registry. Only serializable fields (no Path, etc.)."""
+_RUN_FIELDS = ("status", "stage", "progress_pct", "config", "kpi_mode", "created_at", "updated_at", "dataset_id", "r2", "contrib", "roi", "engine", "engine_version", "detail", "uplift", "campaigns", "channel_summary", "adstock_params", "saturation_params", "diagnostics", "attribution_model", "attribution_config_id", "stale_from_status", "stale_reason", "stale_at")
+# Progress updates during a fit call _save_runs() in quick succession; writes are
+# coalesced so a burst of updates results in a single registry write.
+RUNS_SAVE_DEBOUNCE_SECONDS = 1.0
+_RUNS_SAVE_LOCK = threading.Lock()
+_RUNS_SAVE_TIMER: Optional[threading.Timer] = None
+
+
+def _write_file_atomic(path: Path, payload: bytes) -> None:
+    """Write via a sibling temp file + os.replace so readers never see a partial file.
+
+    Each call gets its own uniquely named temp file, so concurrent writers cannot replace
+    the target with another writer's half-written bytes.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
     try:
-        out = {}
-        for rid, r in RUNS.items():
-            out[rid] = {k: v for k, v in r.items() if k in ("status", "stage", "progress_pct", "config", "kpi_mode", "created_at", "updated_at", "dataset_id", "r2", "contrib", "roi", "engine", "engine_version", "detail", "uplift", "campaigns", "channel_summary", "adstock_params", "saturation_params", "diagnostics", "attribution_model", "attribution_config_id", "stale_from_status", "stale_reason", "stale_at")}
-        RUNS_FILE.parent.mkdir(parents=True, exist_ok=True)
-        RUNS_FILE.write_text(json.dumps(out, indent=0), encoding="utf-8")
-    except Exception:
-        pass
+        with os.fdopen(fd, "wb") as tmp_file:
+            tmp_file.write(payload)
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+def _flush_runs() -> None:
+    """Write the run registry to disk now. Only serializable fields (no Path, etc.)."""
+    global _RUNS_SAVE_TIMER
+    with _RUNS_SAVE_LOCK:
+        _RUNS_SAVE_TIMER = None
+        try:
+            out = {
+                rid: {k: v for k, v in r.items() if k in _RUN_FIELDS}
+                for rid, r in list(RUNS.items())
+            }
+            _write_file_atomic(RUNS_FILE, orjson.dumps(out, option=ORJSON_OPTIONS, default=str))
+        except Exception:
+            logger.warning("Failed to persist MMM run registry", exc_info=True)
+
+
+def _save_runs(*, immediate: bool = False) -> None:
+    """Persist run registry; writes within RUNS_SAVE_DEBOUNCE_SECONDS are coalesced."""
+    global _RUNS_SAVE_TIMER
+    if immediate or RUNS_SAVE_DEBOUNCE_SECONDS <= 0:
+        with _RUNS_SAVE_LOCK:
+            if _RUNS_SAVE_TIMER is not None:
+                _RUNS_SAVE_TIMER.cancel()
+                _RUNS_SAVE_TIMER = None
+        _flush_runs()
+        return
+    with _RUNS_SAVE_LOCK:
+        if _RUNS_SAVE_TIMER is not None:
+            return
+        _RUNS_SAVE_TIMER = threading.Timer(RUNS_SAVE_DEBOUNCE_SECONDS, _flush_runs)
+        _RUNS_SAVE_TIMER.daemon = False
+        _RUNS_SAVE_TIMER.start()
 
 
 def _build_default_expenses() -> Dict[str, ExpenseEntry]:
@@ -794,7 +881,46 @@ def _build_default_expenses() -> Dict[str, ExpenseEntry]:
     }
 
 
+# Bumped whenever EXPENSES is persisted or reloaded; keys the derived expense views.
+EXPENSES_VERSION = 0
+_EXPENSE_RECORDS_CACHE: Dict[str, Any] = {"key": None, "expenses": None, "records": [], "by_channel": None}
+
+
+def _expense_records() -> List[Tuple[str, Dict[str, Any], str]]:
+    """(expense_id, model_dump, lowercase search text) per expense, rebuilt only when EXPENSES changes."""
+    key = (EXPENSES_VERSION, len(EXPENSES))
+    cache = _EXPENSE_RECORDS_CACHE
+    if cache["key"] == key and cache["expenses"] is EXPENSES:
+        return cache["records"]
+    records: List[Tuple[str, Dict[str, Any], str]] = []
+    for expense_id, exp in EXPENSES.items():
+        record = exp.model_dump()
+        haystack = " ".join(
+            filter(None, [record.get("notes"), record.get("invoice_ref"), record.get("external_link"), record.get("campaign")])
+        ).lower()
+        records.append((expense_id, record, haystack))
+    cache.update(key=key, expenses=EXPENSES, records=records, by_channel=None)
+    return records
+
+
+def _active_expense_by_channel() -> Dict[str, float]:
+    """Spend per channel over non-deleted expenses (converted_amount, else amount)."""
+    records = _expense_records()
+    by_channel = _EXPENSE_RECORDS_CACHE.get("by_channel")
+    if by_channel is None:
+        by_channel = {}
+        for _, exp, _ in records:
+            if exp["status"] == "deleted":
+                continue
+            converted = exp["converted_amount"] if exp["converted_amount"] is not None else exp["amount"]
+            by_channel[exp["channel"]] = by_channel.get(exp["channel"], 0.0) + converted
+        _EXPENSE_RECORDS_CACHE["by_channel"] = by_channel
+    return dict(by_channel)
+
+
 def _save_expense_state() -> None:
+    global EXPENSES_VERSION
+    EXPENSES_VERSION += 1
     try:
         payload = {
             expense_id: _with_converted_amount(entry).model_dump()
@@ -810,8 +936,74 @@ def _save_expense_state() -> None:
         logger.warning("Failed to persist expenses state", exc_info=True)
 
 
+def _expense_audit_archive_path() -> Path:
+    return EXPENSE_AUDIT_FILE.with_name(f"{EXPENSE_AUDIT_FILE.stem}_archive.jsonl")
+
+
+def _spill_expense_audit_log() -> None:
+    """Move the oldest half of the hot audit buffer to the JSONL archive."""
+    spill_count = len(EXPENSE_AUDIT_LOG) // 2
+    if spill_count <= 0:
+        return
+    oldest = [EXPENSE_AUDIT_LOG[i] for i in range(spill_count)]
+    try:
+        archive_path = _expense_audit_archive_path()
+        archive_path.parent.mkdir(parents=True, exist_ok=True)
+        with archive_path.open("ab") as fh:
+            for event in oldest:
+                fh.write(orjson.dumps(event.model_dump()) + b"\n")
+    except Exception:
+        # Keep events in memory; the deque maxlen still bounds the buffer.
+        logger.warning("Failed to archive expense audit events", exc_info=True)
+        return
+    for _ in range(spill_count):
+        EXPENSE_AUDIT_LOG.popleft()
+    _EXPENSE_AUDIT_INDEX_STATE["log"] = None
+
+
+def _expense_audit_index() -> Dict[str, List[ExpenseChangeEvent]]:
+    """Hot audit events grouped by expense_id, in append (chronological) order."""
+    if _EXPENSE_AUDIT_INDEX_STATE["log"] is not EXPENSE_AUDIT_LOG:
+        index: Dict[str, List[ExpenseChangeEvent]] = defaultdict(list)
+        for event in EXPENSE_AUDIT_LOG:
+            index[event.expense_id].append(event)
+        _EXPENSE_AUDIT_INDEX_STATE.update(log=EXPENSE_AUDIT_LOG, index=index)
+    return _EXPENSE_AUDIT_INDEX_STATE["index"]
+
+
+def _append_expense_audit(event: ExpenseChangeEvent) -> None:
+    maxlen = getattr(EXPENSE_AUDIT_LOG, "maxlen", None)
+    if maxlen is not None and len(EXPENSE_AUDIT_LOG) >= maxlen:
+        # The deque is about to drop its oldest event; rebuild the index lazily.
+        _EXPENSE_AUDIT_INDEX_STATE["log"] = None
+    EXPENSE_AUDIT_LOG.append(event)
+    if _EXPENSE_AUDIT_INDEX_STATE["log"] is EXPENSE_AUDIT_LOG:
+        _EXPENSE_AUDIT_INDEX_STATE["index"][event.expense_id].append(event)
+    if len(EXPENSE_AUDIT_LOG) >= EXPENSE_AUDIT_HOT_LIMIT:
+        _spill_expense_audit_log()
+
+
+def _load_archived_expense_audit(expense_id: str) -> List[ExpenseChangeEvent]:
+    archive_path = _expense_audit_archive_path()
+    if not archive_path.exists():
+        return []
+    events: List[ExpenseChangeEvent] = []
+    needle = orjson.dumps(expense_id)
+    try:
+        with archive_path.open("rb") as fh:
+            for line in fh:
+                if needle not in line:
+                    continue
+                row = orjson.loads(line)
+                if isinstance(row, dict) and row.get("expense_id") == expense_id:
+                    events.append(ExpenseChangeEvent(**row))
+    except Exception:
+        logger.warning("Failed to read expense audit archive", exc_info=True)
+    return events
+
+
 def _load_expense_state() -> None:
-    global EXPENSES, EXPENSE_AUDIT_LOG
+    global EXPENSES, EXPENSES_VERSION, EXPENSE_AUDIT_LOG
     loaded_expenses: Dict[str, ExpenseEntry] = {}
     loaded_audit: List[ExpenseChangeEvent] = []
 
@@ -822,7 +1014,12 @@ def _load_expense_state() -> None:
                 for expense_id, raw in payload.items():
                     if not isinstance(raw, dict):
                         continue
-                    loaded_expenses[str(expense_id)] = _with_converted_amount(ExpenseEntry(**raw))
+                    try:
+                        entry = ExpenseEntry(**raw)
+                    except ValidationError:
+                        logger.warning("Skipping invalid persisted expense %s", expense_id, exc_info=True)
+                        continue
+                    loaded_expenses[str(expense_id)] = _with_converted_amount(entry)
         except Exception:
             logger.warning("Failed to load persisted expenses; falling back to defaults", exc_info=True)
             loaded_expenses = {}
@@ -836,8 +1033,17 @@ def _load_expense_state() -> None:
             logger.warning("Failed to load persisted expense audit log", exc_info=True)
             loaded_audit = []
 
-    EXPENSES = loaded_expenses or _build_default_expenses()
-    EXPENSE_AUDIT_LOG = loaded_audit
+    if not loaded_expenses and _is_dev_environment():
+        # Sample spend is a dev seed; production boots skip building it.
+        loaded_expenses = _build_default_expenses()
+    EXPENSES = loaded_expenses
+    EXPENSES_VERSION += 1
+    EXPENSE_AUDIT_LOG = deque(maxlen=EXPENSE_AUDIT_HOT_LIMIT)
+    for event in loaded_audit:
+        _append_expense_audit(event)
+    if len(loaded_audit) >= EXPENSE_AUDIT_HOT_LIMIT:
+        # Drop the events just archived from expenses_audit.json.
+        _save_expense_state()
 
 
 def _refresh_journey_aggregates_after_import(db, *, reprocess_days: Optional[int] = None) -> None:
@@ -903,10 +1109,9 @@ def _save_last_import_result(result: Dict[str, Any]) -> None:
             "validation_items": result.get("validation_items", []),
             "items_detail": result.get("items_detail", []),
         }
-        LAST_IMPORT_RESULT_FILE.parent.mkdir(parents=True, exist_ok=True)
-        LAST_IMPORT_RESULT_FILE.write_text(json.dumps(out, indent=0, default=str), encoding="utf-8")
+        _write_file_atomic(LAST_IMPORT_RESULT_FILE, orjson.dumps(out, option=ORJSON_OPTIONS, default=str))
     except Exception:
-        pass
+        logger.warning("Failed to persist last import result", exc_info=True)
 
 
 def _load_last_import_result() -> Dict[str, Any]:
@@ -914,7 +1119,7 @@ def _load_last_import_result() -> Dict[str, Any]:
     if not LAST_IMPORT_RESULT_FILE.exists():
         return {"import_summary": {}, "validation_items": [], "items_detail": []}
     try:
-        return json.loads(LAST_IMPORT_RESULT_FILE.read_text(encoding="utf-8"))
+        return orjson.loads(LAST_IMPORT_RESULT_FILE.read_bytes())
     except Exception:
         return {"import_summary": {}, "validation_items": [], "items_detail": []}
 
@@ -973,101 +1178,18 @@ def _journey_source_availability() -> List[Dict[str, Any]]:
 # ==================== Settings ====================
 
 
-class AttributionPreviewPayload(BaseModel):
-    settings: AttributionSettings
-
-
-class AttributionPreviewResponse(BaseModel):
-    previewAvailable: bool
-    totalJourneys: int
-    eligibleJourneys: int
-    windowImpactCount: int
-    windowDirection: str
-    qualityImpactCount: int
-    qualityDirection: str
-    useConvertedFlagImpact: int
-    useConvertedFlagDirection: str
-    reason: Optional[str] = None
-    decision: Optional[Dict[str, Any]] = None
-
-
-class AttributionDefaultsOverviewResponse(BaseModel):
-    dependencies: Dict[str, Any]
-    resolved_inputs: Dict[str, Any]
-    decision: Dict[str, Any]
-
-
-class NBAPreviewPayload(BaseModel):
-    settings: NBASettings
-    level: Optional[str] = "channel"
-
-
-class NBAPreviewResponse(BaseModel):
-    previewAvailable: bool
-    datasetJourneys: int
-    totalPrefixes: int
-    prefixesEligible: int
-    totalRecommendations: int
-    averageRecommendationsPerPrefix: float
-    filteredBySupportPct: float
-    filteredByConversionPct: float
-    reason: Optional[str] = None
-    decision: Optional[Dict[str, Any]] = None
-
-
-class MMMDefaultsPreviewPayload(BaseModel):
-    settings: MMMSettings
-
-
-class MMMDefaultsPreviewResponse(BaseModel):
-    previewAvailable: bool
-    summary: Dict[str, Any]
-    reason: Optional[str] = None
-    decision: Optional[Dict[str, Any]] = None
-
-
-class NBATestPayload(BaseModel):
-    settings: NBASettings
-    path_prefix: str
-    level: Optional[str] = "channel"
-
-
-class NBATestRecommendation(BaseModel):
-    step: str
-    channel: str
-    campaign: Optional[str] = None
-    count: int
-    conversions: int
-    conversion_rate: float
-    avg_value: float
-    avg_value_converted: float
-    uplift_pct: Optional[float] = None
-
-
-class NBATestResponse(BaseModel):
-    previewAvailable: bool
-    prefix: str
-    level: str
-    totalPrefixSupport: int
-    baselineConversionRate: float
-    recommendations: List[NBATestRecommendation]
-    reason: Optional[str] = None
-    decision: Optional[Dict[str, Any]] = None
-
-
 SETTINGS_PATH = DATA_DIR / "settings.json"
 
 
 def _load_settings() -> Settings:
-    if SETTINGS_PATH.exists():
-        try:
-            data = json.loads(SETTINGS_PATH.read_text())
-            return Settings(**data)
-        except Exception:
-            # Fallback to defaults if file is corrupted
-            pass
+    cached = load_settings_file(SETTINGS_PATH)
+    if cached is not None:
+        # SETTINGS is mutated in place by routes; keep the shared cached model pristine.
+        return cached.model_copy(deep=True)
+    # Fallback to defaults if the file is missing or corrupted
     settings = Settings()
     SETTINGS_PATH.write_text(settings.model_dump_json(indent=2))
+    clear_settings_file_cache()
     return settings
 
 
@@ -1075,38 +1197,64 @@ SETTINGS: Settings = _load_settings()
 
 
 def _save_settings() -> None:
-    SETTINGS_PATH.write_text(SETTINGS.model_dump_json(indent=2))
+    payload = SETTINGS.model_dump_json(indent=2).encode("utf-8")
+    try:
+        if SETTINGS_PATH.read_bytes() == payload:
+            return
+    except OSError:
+        pass
+    _write_file_atomic(SETTINGS_PATH, payload)
+    clear_settings_file_cache()
 
 
 def _replace_settings(new_settings: Settings) -> Settings:
     global SETTINGS
+    # Journey hydration only depends on revenue_config (conversion values);
+    # attribution/NBA/MMM/flag changes keep the warm journey cache.
+    revenue_changed = new_settings.revenue_config != SETTINGS.revenue_config
     SETTINGS = new_settings
-    invalidate_journey_cache()
     _save_settings()
+    if revenue_changed:
+        _refresh_fx_rates(SETTINGS.revenue_config)
+        invalidate_journey_cache()
     return SETTINGS
 
 
 def _replace_revenue_config(payload: RevenueConfig) -> Dict[str, Any]:
     global SETTINGS
+    normalized = normalize_revenue_config(payload.model_dump())
+    # payload was validated by the route and normalization only emits field-typed values.
+    revenue_config = RevenueConfig.model_construct(**normalized)
+    revenue_changed = revenue_config != SETTINGS.revenue_config
     SETTINGS = Settings(
         attribution=SETTINGS.attribution,
         mmm=SETTINGS.mmm,
         nba=SETTINGS.nba,
         feature_flags=SETTINGS.feature_flags,
         ads_governance=getattr(SETTINGS, "ads_governance", AdsGovernanceSettings()),
-        revenue_config=RevenueConfig(**normalize_revenue_config(payload.model_dump())),
+        revenue_config=revenue_config,
     )
-    invalidate_journey_cache()
     _save_settings()
-    return normalize_revenue_config(SETTINGS.revenue_config.model_dump())
+    if revenue_changed:
+        _refresh_fx_rates(SETTINGS.revenue_config)
+        invalidate_journey_cache()
+    return normalized
+
+
+# KPI_CONFIG is only ever replaced, never mutated, so its identity versions the built model.
+_KPI_CONFIG_MODEL_CACHE: Dict[str, Any] = {"source": None, "model": None}
 
 
 def _get_kpi_config_model() -> KpiConfigModel:
     cfg = KPI_CONFIG
-    return KpiConfigModel(
+    if _KPI_CONFIG_MODEL_CACHE["source"] is cfg:
+        return _KPI_CONFIG_MODEL_CACHE["model"]
+    model = KpiConfigModel(
         definitions=[KpiDefinitionModel(**d.__dict__) for d in cfg.definitions],
         primary_kpi_id=cfg.primary_kpi_id,
     )
+    _KPI_CONFIG_MODEL_CACHE.update(source=cfg, model=model)
+    return model
 
 
 def _replace_kpi_config(cfg: KpiConfigModel) -> KpiConfigModel:
@@ -1122,63 +1270,7 @@ KPI_CONFIG: KpiConfig = load_kpi_config()
 
 
 def compute_campaign_uplift(journeys: List[Dict]) -> Dict[str, Dict[str, Any]]:
-    """
-    For each campaign step (channel:campaign or channel), estimate uplift by comparing
-    journeys that include the campaign vs. journeys that do not.
-
-    Uplift is purely observational here (not a causal experiment):
-      - treatment group: journeys that touched the campaign at least once
-      - holdout group: journeys that never touched the campaign
-    """
-    if not journeys:
-        return {}
-
-    total_n = len(journeys)
-    total_conv = 0
-
-    treat_stats: Dict[str, Dict[str, Any]] = {}
-
-    for j in journeys:
-        converted = j.get("converted", True)
-        if converted:
-            total_conv += 1
-        # Build set of campaign steps in this journey
-        steps = set()
-        for tp in j.get("touchpoints", []):
-            channel = tp.get("channel", "unknown")
-            campaign = tp.get("campaign")
-            step = f"{channel}:{campaign}" if campaign else channel
-            steps.add(step)
-        for step in steps:
-            st = treat_stats.setdefault(step, {"n": 0, "conv": 0})
-            st["n"] += 1
-            if converted:
-                st["conv"] += 1
-
-    uplift: Dict[str, Dict[str, Any]] = {}
-    for step, st in treat_stats.items():
-        treat_n = st["n"]
-        treat_conv = st["conv"]
-        control_n = total_n - treat_n
-        control_conv = total_conv - treat_conv
-
-        treat_rate = treat_conv / treat_n if treat_n > 0 else 0.0
-        control_rate = control_conv / control_n if control_n > 0 else 0.0
-        abs_uplift = treat_rate - control_rate
-        rel_uplift = abs_uplift / control_rate if control_rate > 0 else None
-
-        uplift[step] = {
-            "treatment_n": treat_n,
-            "treatment_conversions": treat_conv,
-            "treatment_rate": treat_rate,
-            "holdout_n": control_n,
-            "holdout_conversions": control_conv,
-            "holdout_rate": control_rate,
-            "uplift_abs": abs_uplift,
-            "uplift_rel": rel_uplift,
-        }
-
-    return uplift
+    return _compute_campaign_uplift(journeys)
 
 
 def compute_campaign_trends(journeys: List[Dict]) -> Dict[str, Any]:
@@ -1371,21 +1463,61 @@ def _default_reporting_currency() -> str:
     return "USD"
 
 
+# (currency, reporting_currency, period) -> rate; period "" holds rates valid for any period.
+_FX_RATES: Dict[Tuple[str, str, str], float] = {}
+
+
+def _refresh_fx_rates(revenue_config: RevenueConfig) -> None:
+    """Rebuild the FX lookup table from the static rates in revenue config.
+
+    Static rates convert into the revenue base currency. Cross rates through the base are
+    added too, so expenses reported in another currency (USD by default, while the base
+    defaults to EUR) still convert when that currency has a rate.
+    """
+    rates: Dict[Tuple[str, str, str], float] = {}
+    if revenue_config.fx_enabled and revenue_config.fx_mode == "static_rates":
+        base = revenue_config.base_currency.upper()
+        to_base = {currency.upper(): float(rate) for currency, rate in revenue_config.fx_rates_json.items()}
+        to_base = {currency: rate for currency, rate in to_base.items() if rate > 0}
+        to_base[base] = 1.0
+        for target, target_rate in to_base.items():
+            for currency, rate in to_base.items():
+                if currency != target:
+                    rates[(currency, target, "")] = rate / target_rate
+    _FX_RATES.clear()
+    _FX_RATES.update(rates)
+
+
+def _lookup_fx_rate(currency: str, reporting_currency: str, period: Optional[str]) -> float:
+    currency = (currency or "").upper()
+    reporting_currency = (reporting_currency or "").upper()
+    if currency == reporting_currency:
+        return 1.0
+    rate = _FX_RATES.get((currency, reporting_currency, period or ""))
+    if rate is None:
+        rate = _FX_RATES.get((currency, reporting_currency, ""), 1.0)
+    return rate
+
+
 def _with_converted_amount(entry: ExpenseEntry) -> ExpenseEntry:
     """
     Ensure converted_amount is populated.
-    For now we assume reporting_currency == currency and fx_rate == 1.0 by default.
-    This keeps behaviour predictable while surfacing FX metadata in the UI.
+    An explicit fx_rate wins; otherwise the rate comes from the FX table seeded from
+    revenue config, falling back to 1:1 when no rate is known.
     """
     if entry.reporting_currency is None:
         entry.reporting_currency = _default_reporting_currency()
     if entry.converted_amount is None:
-        # If no explicit FX information, assume 1:1 conversion for now.
-        entry.fx_rate = entry.fx_rate or 1.0
-        entry.converted_amount = entry.amount * (entry.fx_rate or 1.0)
+        entry.fx_rate = entry.fx_rate or _lookup_fx_rate(
+            entry.currency, entry.reporting_currency, entry.period
+        )
+        entry.converted_amount = entry.amount * entry.fx_rate
     return entry
 
 
+_refresh_fx_rates(SETTINGS.revenue_config)
+
+
 _load_expense_state()
 
 BASE_URL = os.getenv("BASE_URL", "http://localhost:8000")
@@ -1393,15 +1525,11 @@ FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:5173")
 
 
 def _admin_role_id_for_workspace(db, workspace_id: str) -> Optional[str]:
-    role = (
-        db.query(ORMRole)
-        .filter(
-            ORMRole.name == "Admin",
-            ORMRole.is_system == True,  # noqa: E712
-        )
-        .first()
-    )
-    return role.id if role else None
+    return get_system_admin_role_id(db)
+
+
+def _security_audit_enabled() -> bool:
+    return bool(SETTINGS.feature_flags.audit_log_enabled)
 
 
 def _write_security_audit(
@@ -1415,9 +1543,9 @@ def _write_security_audit(
     metadata: Optional[Dict[str, Any]] = None,
     request: Optional[Request] = None,
 ) -> None:
+    if not _security_audit_enabled():
+        return
     try:
-        if not getattr(SETTINGS.feature_flags, "audit_log_enabled", False):
-            return
         row = ORMSecurityAuditLog(
             workspace_id=workspace_id,
             actor_user_id=actor_user_id,
@@ -1429,8 +1557,12 @@ def _write_security_audit(
             user_agent=(request.headers.get("user-agent")[:512] if request else None),
             created_at=datetime.utcnow(),
         )
-        db.add(row)
-        db.commit()
+        # Commit through a short-lived session on the same bind: committing the
+        # caller's session would expire its loaded objects and force a reload
+        # SELECT for every attribute the handler reads afterwards.
+        with SessionLocal(bind=db.get_bind()) as audit_db:
+            audit_db.add(row)
+            audit_db.commit()
     except Exception as e:
         logger.warning("Failed to write security audit log (%s): %s", action_key, e)
 
@@ -1439,8 +1571,20 @@ def _invite_token() -> str:
     return secrets.token_urlsafe(32)
 
 
-def _hash_invite_token(raw: str) -> str:
-    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+# New invite hashes are BLAKE2b tagged with this prefix; untagged rows are legacy SHA-256.
+_INVITE_TOKEN_HASH_PREFIX = "b2:"
+
+
+def _hash_invite_token(raw: Union[str, bytes]) -> str:
+    # Accepted tokens are user input, so str keeps UTF-8 rather than assuming ASCII.
+    data = raw if isinstance(raw, bytes) else raw.encode("utf-8")
+    return _INVITE_TOKEN_HASH_PREFIX + hashlib.blake2b(data, digest_size=32).hexdigest()
+
+
+def _invite_token_hash_candidates(raw: Union[str, bytes]) -> List[str]:
+    """Stored hashes an invite token may match: current BLAKE2b, then legacy SHA-256."""
+    data = raw if isinstance(raw, bytes) else raw.encode("utf-8")
+    return [_hash_invite_token(data), hashlib.sha256(data).hexdigest()]
 
 
 def _ads_governance_settings() -> AdsGovernanceSettings:
@@ -1455,15 +1599,86 @@ def _ads_governance_settings() -> AdsGovernanceSettings:
     return AdsGovernanceSettings()
 
 
-def _current_user_id(request: Request) -> str:
-    """Resolve current user for notification prefs; session first, then legacy fallback."""
+def _current_user_id(request: Request, db=None) -> str:
+    """Resolve current user for notification prefs; session first, then legacy fallback.
+
+    Reuses the caller's session when given and memoizes the id on request.state.
+    """
+    cached = getattr(request.state, "current_user_id", None)
+    if cached is not None:
+        return cached
+    user_id = None
     raw_session_id = request.cookies.get(SESSION_COOKIE_NAME)
     if raw_session_id:
-        with _internal_db_session() as db:
+        if db is not None:
             ctx = resolve_auth_context(db, raw_session_id=raw_session_id)
-            if ctx:
-                return ctx.user.id
-    return request.headers.get("X-User-Id") or request.query_params.get("user_id") or "default"
+        else:
+            with _internal_db_session() as own_db:
+                ctx = resolve_auth_context(own_db, raw_session_id=raw_session_id)
+        if ctx:
+            user_id = ctx.user.id
+    if user_id is None:
+        user_id = request.headers.get("X-User-Id") or request.query_params.get("user_id") or "default"
+    request.state.current_user_id = user_id
+    return user_id
+
+
+_ATTRIBUTION_PREVIEW_FACTS_CACHE: Dict[tuple, Dict[str, Any]] = {}
+_ATTRIBUTION_PREVIEW_FACTS_CACHE_LOCK = threading.Lock()
+
+
+def _journey_duration_days(journey: Dict[str, Any]) -> Optional[int]:
+    first = last = None
+    for tp in journey.get("touchpoints", []):
+        ts = tp.get("timestamp")
+        if not ts:
+            continue
+        try:
+            parsed = datetime.fromisoformat(ts)
+        except ValueError:
+            continue
+        if first is None:
+            first = last = parsed
+        elif parsed < first:
+            first = parsed
+        elif parsed > last:
+            last = parsed
+    if first is None:
+        return None
+    return max((last - first).days, 0)
+
+
+def _attribution_preview_facts(journeys: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Per-journey inputs of the attribution preview, computed once per journey dataset."""
+    cache_key = journey_dataset_key(journeys)
+    with _ATTRIBUTION_PREVIEW_FACTS_CACHE_LOCK:
+        cached = _ATTRIBUTION_PREVIEW_FACTS_CACHE.get(cache_key)
+    if cached is not None:
+        return cached["result"]
+    quality_scores: List[int] = []
+    converted: List[bool] = []
+    durations: List[Optional[int]] = []
+    for journey in journeys:
+        is_converted = bool(journey.get("converted", True))
+        quality_scores.append(journey_quality_score(journey))
+        converted.append(is_converted)
+        duration: Optional[int] = None
+        if is_converted:  # window impact only looks at converted journeys
+            try:
+                duration = _journey_duration_days(journey)
+            except TypeError:  # mixed naive/aware timestamps
+                duration = None
+        durations.append(duration)
+    facts = {
+        "quality_scores": quality_scores,
+        "converted": converted,
+        "durations": durations,
+        "converted_false_count": len(converted) - sum(converted),
+    }
+    with _ATTRIBUTION_PREVIEW_FACTS_CACHE_LOCK:
+        _ATTRIBUTION_PREVIEW_FACTS_CACHE.clear()
+        _ATTRIBUTION_PREVIEW_FACTS_CACHE[cache_key] = {"journeys": journeys, "result": facts}
+    return facts
 
 
 @app.post(
@@ -1510,22 +1725,6 @@ def attribution_preview(
     baseline_window = max(baseline.lookback_window_days, 1)
     proposed_window = max(proposed.lookback_window_days, 1)
 
-    def _journey_duration_days(journey: Dict[str, Any]) -> Optional[int]:
-        timestamps = []
-        for tp in journey.get("touchpoints", []):
-            ts = tp.get("timestamp")
-            if not ts:
-                continue
-            try:
-                timestamps.append(datetime.fromisoformat(ts))
-            except ValueError:
-                continue
-        if not timestamps:
-            return None
-        timestamps.sort()
-        delta = timestamps[-1] - timestamps[0]
-        return max(delta.days, 0)
-
     window_direction = "none"
     if proposed_window < baseline_window:
         window_direction = "tighten"
@@ -1542,18 +1741,19 @@ def attribution_preview(
         quality_direction = "loosen"
 
     quality_impact = 0
-    eligible_journeys = len(filter_journeys_by_quality(journeys, proposed_quality))
-    for journey in journeys:
-        q_score = journey_quality_score(journey)
+    facts = _attribution_preview_facts(journeys)
+    eligible_journeys = 0
+    for q_score, is_converted, duration in zip(facts["quality_scores"], facts["converted"], facts["durations"]):
         baseline_quality_allowed = q_score >= baseline_quality
         proposed_quality_allowed = q_score >= proposed_quality
+        if proposed_quality_allowed:
+            eligible_journeys += 1
         if baseline_quality_allowed != proposed_quality_allowed:
             quality_impact += 1
-        if not journey.get("converted", True):
+        if not is_converted:
             continue
         if not proposed_quality_allowed and not baseline_quality_allowed:
             continue
-        duration = _journey_duration_days(journey)
         if duration is None:
             continue
         baseline_allowed = duration <= baseline_window
@@ -1563,7 +1763,7 @@ def attribution_preview(
 
     converted_direction = "none"
     converted_impact = 0
-    converted_false_count = sum(1 for journey in journeys if not journey.get("converted", True))
+    converted_false_count = facts["converted_false_count"]
 
     if baseline.use_converted_flag and not proposed.use_converted_flag:
         converted_direction = "more_included"
@@ -1620,6 +1820,15 @@ def attribution_defaults_overview(
     )
 
 
+def _trusted_response(model_cls: type[BaseModel], **fields: Any) -> ORJSONResponse:
+    """Render server-built, already-coerced fields without FastAPI re-validating them.
+
+    The route keeps response_model for the OpenAPI schema; returning a Response
+    skips the validate-and-dump pass over the whole payload.
+    """
+    return ORJSONResponse(model_cls.model_construct(**fields).model_dump())
+
+
 @app.post(
     "/api/nba/preview",
     response_model=NBAPreviewResponse,
@@ -1627,7 +1836,7 @@ def attribution_defaults_overview(
 def nba_preview(
     payload: NBAPreviewPayload,
     db=Depends(get_db),
-) -> NBAPreviewResponse:
+) -> ORJSONResponse:
     """Return estimated impact metrics for proposed NBA thresholds."""
     journeys = load_cached_journeys(db, loader_fn=load_journeys_from_db, limit=50000)
 
@@ -1636,7 +1845,8 @@ def nba_preview(
         settings=payload.settings,
         level=payload.level or "channel",
     )
-    return NBAPreviewResponse(
+    return _trusted_response(
+        NBAPreviewResponse,
         previewAvailable=bool(summary.get("previewAvailable")),
         datasetJourneys=int(summary.get("datasetJourneys") or 0),
         totalPrefixes=int(summary.get("totalPrefixes") or 0),
@@ -1659,7 +1869,7 @@ def mmm_defaults_preview(
     db=Depends(get_db),
 ) -> MMMDefaultsPreviewResponse:
     """Return readiness and impact context for MMM default aggregation frequency."""
-    if not getattr(SETTINGS.feature_flags, "mmm_enabled", False):
+    if not SETTINGS.feature_flags.mmm_enabled:
         raise HTTPException(status_code=404, detail="mmm_enabled flag is off")
     journeys = load_cached_journeys(db, loader_fn=load_journeys_from_db, limit=50000)
     preview = build_mmm_defaults_preview(
@@ -1681,13 +1891,14 @@ def mmm_defaults_preview(
 def nba_test(
     payload: NBATestPayload,
     db=Depends(get_db),
-) -> NBATestResponse:
+) -> ORJSONResponse:
     """Return recommendations for a specific prefix using proposed settings."""
     journeys = load_cached_journeys(db, loader_fn=load_journeys_from_db, limit=50000)
 
     if not journeys:
         reason = "Recommendations unavailable (no journeys loaded)"
-        return NBATestResponse(
+        return _trusted_response(
+            NBATestResponse,
             previewAvailable=False,
             prefix=payload.path_prefix or "",
             level=payload.level or "channel",
@@ -1710,7 +1921,14 @@ def nba_test(
         else "channel"
     )
     normalized_prefix = payload.path_prefix.strip()
-    nba_raw = compute_next_best_action(journeys, level=use_level)
+    # Reuse a full NBA result memoized by preview calls; otherwise only aggregate
+    # the requested prefix.
+    full_nba_raw = peek_next_best_action_cache(journeys, level=use_level)
+    nba_raw = (
+        full_nba_raw
+        if full_nba_raw is not None
+        else compute_next_best_action(journeys, level=use_level, only_prefix=normalized_prefix)
+    )
 
     if normalized_prefix not in nba_raw and normalized_prefix != "":
         # Allow simple comma-separated prefixes to be normalized via _step_string
@@ -1719,45 +1937,50 @@ def nba_test(
             for step in normalized_prefix.replace(",", " > ").split(" > ")
             if step.strip()
         ]
+        requested_prefix = normalized_prefix
         normalized_prefix = " > ".join(prefix_steps)
+        if full_nba_raw is None and normalized_prefix != requested_prefix:
+            nba_raw = compute_next_best_action(journeys, level=use_level, only_prefix=normalized_prefix)
 
-    prefix_recs = {normalized_prefix: nba_raw.get(normalized_prefix, [])}
-    filtered, stats = filter_nba_recommendations(prefix_recs, payload.settings)
+    raw_recs = nba_raw.get(normalized_prefix, [])
+    filtered, stats = filter_nba_recommendations({normalized_prefix: raw_recs}, payload.settings)
     kept = filtered.get(normalized_prefix, [])
 
-    prefix_support = sum(int(r.get("count", 0)) for r in nba_raw.get(normalized_prefix, []))
-    total_conversions = sum(
-        int(r.get("conversions", 0)) for r in nba_raw.get(normalized_prefix, [])
-    )
+    prefix_support = 0
+    total_conversions = 0
+    for r in raw_recs:
+        prefix_support += int(r.get("count", 0))
+        total_conversions += int(r.get("conversions", 0))
     baseline_rate = (
         total_conversions / prefix_support if prefix_support > 0 else 0.0
     )
-
-    recommendations = [
-        NBATestRecommendation(
-            step=str(rec.get("step") or rec.get("channel")),
-            channel=str(rec.get("channel")),
-            campaign=rec.get("campaign"),
-            count=int(rec.get("count", 0)),
-            conversions=int(rec.get("conversions", 0)),
-            conversion_rate=float(rec.get("conversion_rate", 0.0)),
-            avg_value=float(rec.get("avg_value", 0.0)),
-            avg_value_converted=float(rec.get("avg_value_converted", 0.0)),
-            uplift_pct=(
-                ((float(rec.get("conversion_rate", 0.0)) - baseline_rate) / baseline_rate)
-                if baseline_rate > 0
-                else None
-            ),
+    has_baseline = baseline_rate > 0
+
+    # Fields are coerced here from server-computed stats, so validation is skipped.
+    recommendations: List[NBATestRecommendation] = []
+    for rec in kept:
+        conversion_rate = float(rec.get("conversion_rate", 0.0))
+        recommendations.append(
+            NBATestRecommendation.model_construct(
+                step=str(rec.get("step") or rec.get("channel")),
+                channel=str(rec.get("channel")),
+                campaign=rec.get("campaign"),
+                count=int(rec.get("count", 0)),
+                conversions=int(rec.get("conversions", 0)),
+                conversion_rate=conversion_rate,
+                avg_value=float(rec.get("avg_value", 0.0)),
+                avg_value_converted=float(rec.get("avg_value_converted", 0.0)),
+                uplift_pct=(conversion_rate - baseline_rate) / baseline_rate if has_baseline else None,
+            )
         )
-        for rec in kept
-    ]
 
     if requested_level == "campaign" and use_level != "campaign":
         reason = "Campaign-level recommendations unavailable (journeys lack campaign data)"
     else:
         reason = None
 
-    return NBATestResponse(
+    return _trusted_response(
+        NBATestResponse,
         previewAvailable=True,
         prefix=normalized_prefix or "(start)",
         level=use_level,
@@ -1774,10 +1997,19 @@ def nba_test(
     )
 
 
+def mmm_fit_model(*args: Any, **kwargs: Any) -> Dict[str, Any]:
+    # Deferred so worker start-up does not pay for the PyMC stack until a model is fit.
+    from app.mmm_engine import fit_model
+
+    return fit_model(*args, **kwargs)
+
+
 # ==================== Health ====================
 
 @app.get("/api/health")
 def health():
+    from app.mmm_engine import engine_info
+
     journey_cache = get_journey_cache_status()
     return {
         "status": "ok",
@@ -1941,41 +2173,30 @@ def list_expenses(
     List expense entries with basic filtering.
     Soft-deleted records are excluded by default unless include_deleted=true.
     """
+    needle = search.lower() if search else None
     items = []
-    for expense_id, exp in EXPENSES.items():
-        if not include_deleted and exp.status == "deleted":
+    for expense_id, exp, haystack in _expense_records():
+        if not include_deleted and exp["status"] == "deleted":
             continue
-        if channel and exp.channel != channel:
+        if channel and exp["channel"] != channel:
             continue
-        if campaign and (getattr(exp, "campaign", None) or None) != campaign:
+        if campaign and (exp["campaign"] or None) != campaign:
             continue
-        if cost_type and exp.cost_type != cost_type:
+        if cost_type and exp["cost_type"] != cost_type:
             continue
-        if source_type and exp.source_type != source_type:
+        if source_type and exp["source_type"] != source_type:
             continue
-        if currency and exp.currency != currency:
+        if currency and exp["currency"] != currency:
             continue
-        if status and exp.status != status:
+        if status and exp["status"] != status:
             continue
-        if service_period_start and exp.service_period_start and exp.service_period_start < service_period_start:
+        if service_period_start and exp["service_period_start"] and exp["service_period_start"] < service_period_start:
             continue
-        if service_period_end and exp.service_period_end and exp.service_period_end > service_period_end:
+        if service_period_end and exp["service_period_end"] and exp["service_period_end"] > service_period_end:
             continue
-        if search:
-            haystack = " ".join(
-                filter(
-                    None,
-                    [
-                        exp.notes,
-                        exp.invoice_ref,
-                        exp.external_link,
-                        getattr(exp, "campaign", None),
-                    ],
-                )
-            ).lower()
-            if search.lower() not in haystack:
-                continue
-        items.append({"id": expense_id, **exp.model_dump()})
+        if needle and needle not in haystack:
+            continue
+        items.append({"id": expense_id, **exp})
     return items
 
 
@@ -1994,7 +2215,7 @@ def add_expense(entry: ExpenseEntry):
     entry = _with_converted_amount(entry)
     EXPENSES[expense_id] = entry
 
-    EXPENSE_AUDIT_LOG.append(
+    _append_expense_audit(
         ExpenseChangeEvent(
             expense_id=expense_id,
             timestamp=now,
@@ -2025,7 +2246,7 @@ def update_expense(expense_id: str, entry: ExpenseEntry):
     entry = _with_converted_amount(entry)
     EXPENSES[expense_id] = entry
 
-    EXPENSE_AUDIT_LOG.append(
+    _append_expense_audit(
         ExpenseChangeEvent(
             expense_id=expense_id,
             timestamp=now,
@@ -2056,7 +2277,7 @@ def delete_expense(expense_id: str, change_note: Optional[str] = Query(None)):
     entry.change_note = change_note
     EXPENSES[expense_id] = entry
 
-    EXPENSE_AUDIT_LOG.append(
+    _append_expense_audit(
         ExpenseChangeEvent(
             expense_id=expense_id,
             timestamp=now,
@@ -2087,7 +2308,7 @@ def restore_expense(expense_id: str, change_note: Optional[str] = Query(None)):
     entry.change_note = change_note
     EXPENSES[expense_id] = entry
 
-    EXPENSE_AUDIT_LOG.append(
+    _append_expense_audit(
         ExpenseChangeEvent(
             expense_id=expense_id,
             timestamp=now,
@@ -2105,9 +2326,10 @@ def get_expense_audit(expense_id: str):
     """
     Return audit trail events for a single expense.
     """
-    events = [e.model_dump() for e in EXPENSE_AUDIT_LOG if e.expense_id == expense_id]
-    # Sort by timestamp ascending for timeline display
-    events.sort(key=lambda e: e["timestamp"])
+    events = [e.model_dump() for e in _load_archived_expense_audit(expense_id)]
+    # Archived events predate the hot buffer and both are kept in append order,
+    # so the timeline is already ascending by timestamp.
+    events.extend(e.model_dump() for e in _expense_audit_index().get(expense_id, ()))
     return events
 
 
@@ -2127,18 +2349,18 @@ def expense_summary(
     total_unknown = 0.0
     reporting_currency = _default_reporting_currency()
 
-    for exp in EXPENSES.values():
-        if not include_deleted and getattr(exp, "status", "active") == "deleted":
+    for _, exp, _ in _expense_records():
+        if not include_deleted and exp["status"] == "deleted":
             continue
-        if service_period_start and exp.service_period_start and exp.service_period_start < service_period_start:
+        if service_period_start and exp["service_period_start"] and exp["service_period_start"] < service_period_start:
             continue
-        if service_period_end and exp.service_period_end and exp.service_period_end > service_period_end:
+        if service_period_end and exp["service_period_end"] and exp["service_period_end"] > service_period_end:
             continue
 
-        converted = exp.converted_amount if exp.converted_amount is not None else exp.amount
-        by_channel[exp.channel] = by_channel.get(exp.channel, 0.0) + converted
+        converted = exp["converted_amount"] if exp["converted_amount"] is not None else exp["amount"]
+        by_channel[exp["channel"]] = by_channel.get(exp["channel"], 0.0) + converted
 
-        source_type = getattr(exp, "source_type", "manual")
+        source_type = exp["source_type"]
         if source_type == "import":
             total_imported += converted
         elif source_type == "manual":
@@ -2577,6 +2799,7 @@ app.include_router(
         write_security_audit_fn=_write_security_audit,
         invite_token_fn=_invite_token,
         hash_invite_token_fn=_hash_invite_token,
+        invite_token_hash_candidates_fn=_invite_token_hash_candidates,
     )
 )
 
@@ -2648,7 +2871,7 @@ app.include_router(
         compute_next_best_action_fn=compute_next_best_action,
         has_any_campaign_fn=has_any_campaign,
         filter_nba_recommendations_fn=filter_nba_recommendations,
-        step_string_fn=_step_string,
+        journey_step_paths_fn=journey_step_paths,
         get_latest_quality_for_scope_fn=get_latest_quality_for_scope,
         build_conversion_paths_analysis_from_daily_fn=build_conversion_paths_analysis_from_daily,
         build_conversion_path_details_from_daily_fn=build_conversion_path_details_from_daily,
@@ -2656,7 +2879,7 @@ app.include_router(
         compute_path_archetypes_fn=compute_path_archetypes,
         compute_path_anomalies_fn=compute_path_anomalies,
         run_attribution_campaign_fn=run_attribution_campaign,
-        expenses_obj=EXPENSES,
+        expense_by_channel_fn=_active_expense_by_channel,
         compute_channel_performance_fn=compute_channel_performance,
         derive_efficiency_fn=derive_efficiency,
         compute_campaign_uplift_fn=compute_campaign_uplift,
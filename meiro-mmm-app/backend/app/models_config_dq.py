@@ -172,6 +172,7 @@ class Role(Base):
 
     __table_args__ = (
         Index("ix_roles_workspace_name", "workspace_id", "name", unique=True),
+        Index("ix_roles_name_system", "name", "is_system"),
     )
 
 
@@ -391,6 +392,10 @@ class ConversionPath(Base):
     source_snapshot_id = Column(String(36), nullable=True, index=True)
     imported_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
 
+    __table_args__ = (
+        Index("ix_conversion_paths_key_ts", "conversion_key", "conversion_ts"),
+    )
+
 
 class MeiroRawBatch(Base):
     __tablename__ = "meiro_raw_batches"
@@ -52,9 +52,13 @@ def create_router(
     write_security_audit_fn: Callable[..., None],
     invite_token_fn: Callable[[], str],
     hash_invite_token_fn: Callable[[str], str],
+    invite_token_hash_candidates_fn: Optional[Callable[[str], list[str]]] = None,
 ) -> APIRouter:
     router = APIRouter(tags=["admin_access"])
 
+    def _audit_enabled() -> bool:
+        return bool(get_settings_obj().feature_flags.audit_log_enabled)
+
     @router.get("/api/admin/permissions")
     def admin_list_permissions(
         category: Optional[str] = Query(None),
@@ -79,7 +83,7 @@ def create_router(
         _ctx=Depends(require_any_permission_dependency(["audit.view", "settings.manage"])),
         db=Depends(get_db_dependency),
     ):
-        if not getattr(get_settings_obj().feature_flags, "audit_log_enabled", False):
+        if not _audit_enabled():
             raise HTTPException(status_code=404, detail="audit_log_enabled flag is off")
         workspace_id = workspace_scope_or_403_fn(_ctx, workspaceId)
         from_dt = _parse_admin_audit_datetime(date_from, field_name="date_from")
@@ -210,16 +214,17 @@ def create_router(
         for key in sorted(set(body.permission_keys or [])):
             db.add(ORMRolePermission(role_id=role.id, permission_key=key, created_at=datetime.utcnow()))
         db.commit()
-        write_security_audit_fn(
-            db,
-            actor_user_id=_ctx.user_id,
-            workspace_id=workspace_id,
-            action_key="role.created",
-            target_type="role",
-            target_id=role.id,
-            metadata={"name": role.name, "permission_keys": sorted(set(body.permission_keys or []))},
-            request=request,
-        )
+        if _audit_enabled():
+            write_security_audit_fn(
+                db,
+                actor_user_id=_ctx.user_id,
+                workspace_id=workspace_id,
+                action_key="role.created",
+                target_type="role",
+                target_id=role.id,
+                metadata={"name": role.name, "permission_keys": sorted(set(body.permission_keys or []))},
+                request=request,
+            )
         return {"id": role.id, "name": role.name, "workspace_id": role.workspace_id}
 
     @router.put("/api/admin/roles/{role_id}")
@@ -263,16 +268,17 @@ def create_router(
         role.updated_at = datetime.utcnow()
         db.add(role)
         db.commit()
-        write_security_audit_fn(
-            db,
-            actor_user_id=_ctx.user_id,
-            workspace_id=workspace_id,
-            action_key="role.updated",
-            target_type="role",
-            target_id=role.id,
-            metadata={"name": role.name},
-            request=request,
-        )
+        if _audit_enabled():
+            write_security_audit_fn(
+                db,
+                actor_user_id=_ctx.user_id,
+                workspace_id=workspace_id,
+                action_key="role.updated",
+                target_type="role",
+                target_id=role.id,
+                metadata={"name": role.name},
+                request=request,
+            )
         return {"id": role.id, "name": role.name}
 
     @router.delete("/api/admin/roles/{role_id}")
@@ -305,16 +311,17 @@ def create_router(
         db.query(ORMRolePermission).filter(ORMRolePermission.role_id == role.id).delete(synchronize_session=False)
         db.delete(role)
         db.commit()
-        write_security_audit_fn(
-            db,
-            actor_user_id=_ctx.user_id,
-            workspace_id=workspace_id,
-            action_key="role.deleted",
-            target_type="role",
-            target_id=role_id,
-            metadata={},
-            request=request,
-        )
+        if _audit_enabled():
+            write_security_audit_fn(
+                db,
+                actor_user_id=_ctx.user_id,
+                workspace_id=workspace_id,
+                action_key="role.deleted",
+                target_type="role",
+                target_id=role_id,
+                metadata={},
+                request=request,
+            )
         return {"id": role_id, "deleted": True}
 
     @router.get("/api/admin/users")
@@ -382,16 +389,17 @@ def create_router(
         db.commit()
         if body.status == "disabled":
             revoke_all_user_sessions(db, user.id)
-        write_security_audit_fn(
-            db,
-            actor_user_id=_ctx.user_id,
-            workspace_id=_ctx.workspace_id,
-            action_key="user.status_updated",
-            target_type="user",
-            target_id=user.id,
-            metadata={"status": body.status},
-            request=request,
-        )
+        if _audit_enabled():
+            write_security_audit_fn(
+                db,
+                actor_user_id=_ctx.user_id,
+                workspace_id=_ctx.workspace_id,
+                action_key="user.status_updated",
+                target_type="user",
+                target_id=user.id,
+                metadata={"status": body.status},
+                request=request,
+            )
         return {"id": user.id, "status": user.status}
 
     @router.post("/api/admin/users/{user_id}/reset-sessions")
@@ -412,16 +420,17 @@ def create_router(
         if not membership:
             raise HTTPException(status_code=404, detail="User is not a member of this workspace")
         revoked = revoke_all_user_sessions(db, user.id)
-        write_security_audit_fn(
-            db,
-            actor_user_id=_ctx.user_id,
-            workspace_id=_ctx.workspace_id,
-            action_key="user.sessions_reset",
-            target_type="user",
-            target_id=user.id,
-            metadata={"sessions_revoked": revoked},
-            request=request,
-        )
+        if _audit_enabled():
+            write_security_audit_fn(
+                db,
+                actor_user_id=_ctx.user_id,
+                workspace_id=_ctx.workspace_id,
+                action_key="user.sessions_reset",
+                target_type="user",
+                target_id=user.id,
+                metadata={"sessions_revoked": revoked},
+                request=request,
+            )
         return {"id": user.id, "sessions_revoked": revoked}
 
     @router.get("/api/admin/memberships")
@@ -478,16 +487,17 @@ def create_router(
         membership.updated_at = datetime.utcnow()
         db.add(membership)
         db.commit()
-        write_security_audit_fn(
-            db,
-            actor_user_id=_ctx.user_id,
-            workspace_id=workspace_id,
-            action_key="membership.role_changed",
-            target_type="membership",
-            target_id=membership.id,
-            metadata={"role_id": role.id, "role_name": role.name},
-            request=request,
-        )
+        if _audit_enabled():
+            write_security_audit_fn(
+                db,
+                actor_user_id=_ctx.user_id,
+                workspace_id=workspace_id,
+                action_key="membership.role_changed",
+                target_type="membership",
+                target_id=membership.id,
+                metadata={"role_id": role.id, "role_name": role.name},
+                request=request,
+            )
         return {"id": membership.id, "role_id": membership.role_id}
 
     @router.delete("/api/admin/memberships/{membership_id}")
@@ -506,16 +516,17 @@ def create_router(
         membership.updated_at = datetime.utcnow()
         db.add(membership)
         db.commit()
-        write_security_audit_fn(
-            db,
-            actor_user_id=_ctx.user_id,
-            workspace_id=workspace_id,
-            action_key="membership.removed",
-            target_type="membership",
-            target_id=membership.id,
-            metadata={"user_id": membership.user_id},
-            request=request,
-        )
+        if _audit_enabled():
+            write_security_audit_fn(
+                db,
+                actor_user_id=_ctx.user_id,
+                workspace_id=workspace_id,
+                action_key="membership.removed",
+                target_type="membership",
+                target_id=membership.id,
+                metadata={"user_id": membership.user_id},
+                request=request,
+            )
         return {"id": membership.id, "status": membership.status}
 
     @router.post("/api/admin/invitations")
@@ -548,16 +559,17 @@ def create_router(
         )
         db.add(inv)
         db.commit()
-        write_security_audit_fn(
-            db,
-            actor_user_id=_ctx.user_id,
-            workspace_id=workspace_id,
-            action_key="invitation.created",
-            target_type="invitation",
-            target_id=inv.id,
-            metadata={"email": inv.email, "role_id": inv.role_id},
-            request=request,
-        )
+        if _audit_enabled():
+            write_security_audit_fn(
+                db,
+                actor_user_id=_ctx.user_id,
+                workspace_id=workspace_id,
+                action_key="invitation.created",
+                target_type="invitation",
+                target_id=inv.id,
+                metadata={"email": inv.email, "role_id": inv.role_id},
+                request=request,
+            )
         return {
             "id": inv.id,
             "workspace_id": inv.workspace_id,
@@ -618,16 +630,17 @@ def create_router(
         inv.created_at = datetime.utcnow()
         db.add(inv)
         db.commit()
-        write_security_audit_fn(
-            db,
-            actor_user_id=_ctx.user_id,
-            workspace_id=workspace_id,
-            action_key="invitation.resent",
-            target_type="invitation",
-            target_id=inv.id,
-            metadata={"email": inv.email},
-            request=request,
-        )
+        if _audit_enabled():
+            write_security_audit_fn(
+                db,
+                actor_user_id=_ctx.user_id,
+                workspace_id=workspace_id,
+                action_key="invitation.resent",
+                target_type="invitation",
+                target_id=inv.id,
+                metadata={"email": inv.email},
+                request=request,
+            )
         return {"id": inv.id, "expires_at": inv.expires_at, "token": raw_token}
 
     @router.delete("/api/admin/invitations/{invitation_id}/revoke")
@@ -643,16 +656,17 @@ def create_router(
         workspace_id = workspace_scope_or_403_fn(_ctx, inv.workspace_id)
         db.delete(inv)
         db.commit()
-        write_security_audit_fn(
-            db,
-            actor_user_id=_ctx.user_id,
-            workspace_id=workspace_id,
-            action_key="invitation.revoked",
-            target_type="invitation",
-            target_id=invitation_id,
-            metadata={},
-            request=request,
-        )
+        if _audit_enabled():
+            write_security_audit_fn(
+                db,
+                actor_user_id=_ctx.user_id,
+                workspace_id=workspace_id,
+                action_key="invitation.revoked",
+                target_type="invitation",
+                target_id=invitation_id,
+                metadata={},
+                request=request,
+            )
         return {"id": invitation_id, "revoked": True}
 
     @router.post("/api/invitations/accept")
@@ -664,8 +678,13 @@ def create_router(
         token = (body.token or "").strip()
         if not token:
             raise HTTPException(status_code=400, detail="token is required")
-        token_hash = hash_invite_token_fn(token)
-        inv = db.query(ORMInvitation).filter(ORMInvitation.token_hash == token_hash).first()
+        # Invitations created before a hash change keep their old digest until accepted.
+        token_hashes = (
+            invite_token_hash_candidates_fn(token)
+            if invite_token_hash_candidates_fn is not None
+            else [hash_invite_token_fn(token)]
+        )
+        inv = db.query(ORMInvitation).filter(ORMInvitation.token_hash.in_(token_hashes)).first()
         if not inv:
             raise HTTPException(status_code=404, detail="Invitation not found")
         if inv.accepted_at is not None:
@@ -711,16 +730,17 @@ def create_router(
         inv.accepted_at = datetime.utcnow()
         db.add(inv)
         db.commit()
-        write_security_audit_fn(
-            db,
-            actor_user_id=user.id,
-            workspace_id=inv.workspace_id,
-            action_key="invitation.accepted",
-            target_type="invitation",
-            target_id=inv.id,
-            metadata={"membership_id": membership.id},
-            request=request,
-        )
+        if _audit_enabled():
+            write_security_audit_fn(
+                db,
+                actor_user_id=user.id,
+                workspace_id=inv.workspace_id,
+                action_key="invitation.accepted",
+                target_type="invitation",
+                target_id=inv.id,
+                metadata={"membership_id": membership.id},
+                request=request,
+            )
         return {"ok": True, "workspace_id": inv.workspace_id, "user_id": user.id, "membership_id": membership.id}
 
     return router
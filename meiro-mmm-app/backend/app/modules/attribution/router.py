@@ -1,14 +1,18 @@
+import heapq
 import json
 import threading
 import time
 import urllib.parse
 import urllib.request
+from collections import Counter
 from datetime import date, datetime
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
+import orjson
 import pandas as pd
 from fastapi import APIRouter, Body, Depends, File, Form, HTTPException, Query, UploadFile
 from fastapi.responses import Response
+from starlette.concurrency import run_in_threadpool
 
 from app.modules.attribution.schemas import (
     ImportPreCheckResponse,
@@ -17,8 +21,104 @@ from app.modules.attribution.schemas import (
 )
 from app.services_conversions import filter_journeys_by_quality
 from app.services_deciengine_events import deciengine_inapp_events_to_v2_journeys
+from app.services_journey_cache import get_journey_cache_generation, journey_dataset_key
+from app.services_journeys_health import converted_count_and_channels, journey_dataset_aggregates
 from app.services_meiro_import import import_journeys_from_cdp_source
 from app.services_meiro_quarantine import create_quarantine_run, get_quarantine_run, update_quarantine_records
+from app.utils.json_response import ORJSON_OPTIONS, ORJSONResponse
+
+
+def _parse_upload_payload(content: bytes) -> Tuple[Any, bool]:
+    """Parse an uploaded journeys file; the flag says the raw bytes can be stored as-is.
+
+    orjson handles plain UTF-8 JSON; anything it rejects (BOMs, UTF-16, NaN literals)
+    goes through the stdlib parser as before and is re-serialized when stored.
+    """
+    try:
+        return orjson.loads(content), True
+    except orjson.JSONDecodeError:
+        return json.loads(content), False
+
+
+def _span_days(first_raw: Any, last_raw: Any) -> Optional[float]:
+    try:
+        first_ts = pd.Timestamp(first_raw)
+        last_ts = pd.Timestamp(last_raw)
+        if pd.notna(first_ts) and pd.notna(last_ts):
+            delta = (last_ts - first_ts).total_seconds() / 86400.0
+            if delta >= 0:
+                return delta
+    except Exception:
+        pass
+    return None
+
+
+def _days_to_convert(spans: List[Tuple[Any, Any]]) -> List[float]:
+    """Non-negative first-to-last touch gaps in days, skipping spans that do not parse.
+
+    ISO timestamps are parsed as two vectorized columns; values that format rejects,
+    and any batch pandas cannot subtract as a whole (mixed timezones), go through
+    the per-span scalar path.
+    """
+    if not spans:
+        return []
+    firsts_raw, lasts_raw = zip(*spans)
+    try:
+        firsts = pd.to_datetime(pd.Series(firsts_raw, dtype=object), errors="coerce", format="ISO8601")
+        lasts = pd.to_datetime(pd.Series(lasts_raw, dtype=object), errors="coerce", format="ISO8601")
+        deltas = (lasts - firsts).dt.total_seconds() / 86400.0
+    except Exception:
+        return [delta for delta in (_span_days(first, last) for first, last in spans) if delta is not None]
+    days = deltas[deltas.notna() & (deltas >= 0)].tolist()
+    for idx in (firsts.isna() | lasts.isna()).to_numpy().nonzero()[0]:
+        delta = _span_days(firsts_raw[idx], lasts_raw[idx])
+        if delta is not None:
+            days.append(delta)
+    return days
+
+
+PATH_ARCHETYPES_CACHE_MAX = 64
+
+# Last direct-excluded view, so path endpoints reading the same journey dataset filter it once
+# and downstream dataset-keyed caches (path steps, NBA) keep hitting.
+_DIRECT_EXCLUDED_LOCK = threading.Lock()
+_DIRECT_EXCLUDED: Dict[str, Any] = {"key": None, "journeys": None, "filtered": None}
+
+
+# journeys_for_model of the last few attribution runs, keyed on the journey dataset, config and
+# quality threshold, so repeat /run and /run-all calls skip re-applying the model config and
+# hand run_attribution the same list its prepared-inputs cache recognises.
+_MODEL_JOURNEYS_MAX = 8
+_MODEL_JOURNEYS_LOCK = threading.Lock()
+_MODEL_JOURNEYS: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+
+
+def _exclude_direct_touchpoints(journeys: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Journeys with direct touchpoints dropped; journeys left without touchpoints are skipped."""
+    # The applied model config is already reflected in which journey dicts come in.
+    dataset_key = journey_dataset_key(journeys)
+    with _DIRECT_EXCLUDED_LOCK:
+        if _DIRECT_EXCLUDED["key"] == dataset_key:
+            return _DIRECT_EXCLUDED["filtered"]
+    is_direct_channel: Dict[Any, bool] = {}
+    filtered: List[Dict[str, Any]] = []
+    for journey in journeys:
+        kept = []
+        for tp in journey.get("touchpoints", []):
+            channel = tp.get("channel", "")
+            is_direct = is_direct_channel.get(channel)
+            if is_direct is None:
+                is_direct = is_direct_channel[channel] = channel.lower() == "direct"
+            if not is_direct:
+                kept.append(tp)
+        if not kept:
+            continue
+        j2 = dict(journey)
+        j2["touchpoints"] = kept
+        filtered.append(j2)
+    with _DIRECT_EXCLUDED_LOCK:
+        _DIRECT_EXCLUDED.update(key=dataset_key, journeys=journeys, filtered=filtered)
+    return filtered
 
 
 def create_router(
@@ -64,7 +164,7 @@ def create_router(
     compute_next_best_action_fn: Callable[..., Dict[str, Any]],
     has_any_campaign_fn: Callable[[List[Dict[str, Any]]], bool],
     filter_nba_recommendations_fn: Callable[..., tuple[Dict[str, Any], Any]],
-    step_string_fn: Callable[..., str],
+    journey_step_paths_fn: Callable[..., tuple[List[List[str]], List[str]]],
     get_latest_quality_for_scope_fn: Callable[..., Any],
     build_conversion_paths_analysis_from_daily_fn: Callable[..., Dict[str, Any]],
     build_conversion_path_details_from_daily_fn: Callable[..., Dict[str, Any]],
@@ -72,7 +172,7 @@ def create_router(
     compute_path_archetypes_fn: Callable[..., Dict[str, Any]],
     compute_path_anomalies_fn: Callable[..., Any],
     run_attribution_campaign_fn: Callable[..., Dict[str, Any]],
-    expenses_obj: Dict[str, Any],
+    expense_by_channel_fn: Callable[[], Dict[str, float]],
     compute_channel_performance_fn: Callable[..., List[Dict[str, Any]]],
     derive_efficiency_fn: Callable[..., Dict[str, Any]],
     compute_campaign_uplift_fn: Callable[..., Dict[str, Dict[str, Any]]],
@@ -195,9 +295,27 @@ def create_router(
     ) -> tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
         resolved_cfg, meta = load_config_and_meta_fn(db, config_id)
         journeys = get_journeys_fn(db)
+        settings = get_settings_obj()
+        cache_key = (
+            journey_dataset_key(journeys),
+            (meta or {}).get("config_id"),
+            (meta or {}).get("config_version"),
+            json.dumps(resolved_cfg.config_json or {}, sort_keys=True, default=str) if resolved_cfg else None,
+            int(getattr(settings.attribution, "min_journey_quality_score", 0) or 0),
+            date_from or "",
+            date_to or "",
+        )
+        with _MODEL_JOURNEYS_LOCK:
+            cached = _MODEL_JOURNEYS.get(cache_key)
+        if cached is not None:
+            return cached["journeys_for_model"], meta
         journeys_for_model = apply_model_config_fn(journeys, resolved_cfg.config_json or {}) if resolved_cfg else journeys
         journeys_for_model = _filter_journeys_to_window(journeys_for_model, date_from=date_from, date_to=date_to)
         journeys_for_model = _apply_attribution_filters(journeys_for_model)
+        with _MODEL_JOURNEYS_LOCK:
+            if len(_MODEL_JOURNEYS) >= _MODEL_JOURNEYS_MAX:
+                _MODEL_JOURNEYS.clear()
+            _MODEL_JOURNEYS[cache_key] = {"journeys": journeys, "journeys_for_model": journeys_for_model}
         return journeys_for_model, meta
 
     def _apply_journey_dimension_filters(
@@ -478,7 +596,7 @@ def create_router(
     @router.get("/api/attribution/journeys/validation-report")
     def download_validation_report():
         last = load_last_import_result_fn()
-        content = json.dumps(last, indent=2, default=str)
+        content = orjson.dumps(last, default=str, option=ORJSON_OPTIONS | orjson.OPT_INDENT_2)
         return Response(
             content=content,
             media_type="application/json",
@@ -589,6 +707,7 @@ def create_router(
                     "replace_existing": replace_existing,
                 },
             )
+            converted_count, channels_detected = converted_count_and_channels(journeys)
             append_import_run_fn(
                 "meiro_quarantine_reprocess",
                 len(journeys),
@@ -596,8 +715,8 @@ def create_router(
                 total=int((result.get("import_summary") or {}).get("total", len(originals)) or len(originals)),
                 valid=len(journeys),
                 invalid=len(retry_quarantine_records),
-                converted=sum(1 for j in journeys if j.get("converted", True)),
-                channels_detected=sorted({tp.get("channel", "unknown") for j in journeys for tp in j.get("touchpoints", [])}),
+                converted=converted_count,
+                channels_detected=channels_detected,
                 validation_summary={
                     "cleaning_report": retry_cleaning_report,
                     "top_quarantine_reasons": retry_cleaning_report.get("top_unresolved_patterns") or [],
@@ -635,10 +754,12 @@ def create_router(
 
     @router.get("/api/attribution/import-precheck")
     def import_precheck(source: str = Query(...), db=Depends(get_db_dependency)):
-        current = get_journeys_fn(db)
-        current_count = len(current or [])
-        current_converted = sum(1 for j in (current or []) if j.get("converted", True))
-        current_channels = sorted(set(tp.get("channel", "unknown") for j in (current or []) for tp in j.get("touchpoints", [])))
+        current = get_journeys_fn(db) or []
+        # Same per-dataset aggregates as the journeys summary, so a warm summary makes this free.
+        aggregates = journey_dataset_aggregates(current)
+        current_count = len(current)
+        current_converted = aggregates["converted_count"]
+        current_channels = list(aggregates["channels"])
         last_success = get_last_successful_run_fn()
         if last_success and last_success.get("source") == source:
             incoming_count = last_success.get("valid", 0)
@@ -693,7 +814,7 @@ def create_router(
     async def upload_journeys(file: UploadFile = File(...), import_note: Optional[str] = Form(None), db=Depends(get_db_dependency)):
         try:
             content = await file.read()
-            data = json.loads(content)
+            data, raw_is_canonical = await run_in_threadpool(_parse_upload_payload, content)
             if not (isinstance(data, list) or (isinstance(data, dict) and "journeys" in data)):
                 if not (isinstance(data, dict) and data.get("schema_version") == "2.0"):
                     raise ValueError("Expected JSON array of journeys or v2 envelope with 'journeys'")
@@ -703,7 +824,10 @@ def create_router(
 
         try:
             latest_upload_file_obj.parent.mkdir(parents=True, exist_ok=True)
-            latest_upload_file_obj.write_text(json.dumps(data, ensure_ascii=True), encoding="utf-8")
+            if raw_is_canonical:
+                latest_upload_file_obj.write_bytes(content)
+            else:
+                latest_upload_file_obj.write_text(json.dumps(data, ensure_ascii=True), encoding="utf-8")
         except Exception:
             pass
 
@@ -1003,9 +1127,18 @@ def create_router(
             kwargs["first_pct"] = settings.attribution.position_first_pct
             kwargs["last_pct"] = settings.attribution.position_last_pct
 
+        # Bucket converted journeys by conversion week once instead of rescanning per week.
+        journeys_by_week: Dict[Any, List[Dict[str, Any]]] = {}
+        for journey in journeys_for_model:
+            if not journey.get("converted", True):
+                continue
+            conversion_week = _conversion_week(journey)
+            if conversion_week is not None:
+                journeys_by_week.setdefault(conversion_week, []).append(journey)
+
         out = []
         for week in week_range:
-            week_journeys = [j for j in journeys_for_model if j.get("converted", True) and _conversion_week(j) == week]
+            week_journeys = journeys_by_week.get(week)
             if not week_journeys:
                 out.append({"date": week.strftime("%Y-%m-%d"), "attributed_value": 0.0})
                 continue
@@ -1045,15 +1178,7 @@ def create_router(
         if direct_mode_normalized not in ("include", "exclude"):
             direct_mode_normalized = "include"
         if direct_mode_normalized == "exclude":
-            filtered_journeys = []
-            for journey in journeys_for_analysis:
-                kept = [tp for tp in journey.get("touchpoints", []) if tp.get("channel", "").lower() != "direct"]
-                if not kept:
-                    continue
-                j2 = dict(journey)
-                j2["touchpoints"] = kept
-                filtered_journeys.append(j2)
-            journeys_for_analysis = filtered_journeys
+            journeys_for_analysis = _exclude_direct_touchpoints(journeys_for_analysis)
 
         include_non_converted = (path_scope or "converted").lower() in ("all", "all_journeys", "include_non_converted")
         path_analysis = analyze_paths_fn(journeys_for_analysis, include_non_converted=include_non_converted)
@@ -1073,7 +1198,8 @@ def create_router(
             "path_scope": "all" if include_non_converted else "converted",
         }
         path_analysis["nba_config"] = get_settings_obj().nba.model_dump()
-        return path_analysis
+        # Plain JSON-native payload: render with orjson directly instead of walking it with jsonable_encoder.
+        return ORJSONResponse(path_analysis)
 
     @router.get("/api/conversion-paths/analysis")
     def get_conversion_paths_analysis_aggregated(
@@ -1100,18 +1226,20 @@ def create_router(
             raise HTTPException(status_code=400, detail="date_from/date_to must be YYYY-MM-DD")
         if d_from and d_to and d_from > d_to:
             raise HTTPException(status_code=400, detail="date_from must be <= date_to")
-        return build_conversion_paths_analysis_from_daily_fn(
-            db,
-            definition_id=definition_id,
-            date_from=d_from,
-            date_to=d_to,
-            direct_mode=(direct_mode or "include").lower(),
-            path_scope=(path_scope or "converted").lower(),
-            channel_group=channel_group,
-            campaign_id=campaign_id,
-            device=device,
-            country=country,
-            nba_config=get_settings_obj().nba.model_dump(),
+        return ORJSONResponse(
+            build_conversion_paths_analysis_from_daily_fn(
+                db,
+                definition_id=definition_id,
+                date_from=d_from,
+                date_to=d_to,
+                direct_mode=(direct_mode or "include").lower(),
+                path_scope=(path_scope or "converted").lower(),
+                channel_group=channel_group,
+                campaign_id=campaign_id,
+                device=device,
+                country=country,
+                nba_config=get_settings_obj().nba.model_dump(),
+            )
         )
 
     @router.get("/api/paths/details")
@@ -1136,77 +1264,69 @@ def create_router(
         if direct_mode_normalized not in ("include", "exclude"):
             direct_mode_normalized = "include"
         if direct_mode_normalized == "exclude":
-            filtered_journeys = []
-            for journey in journeys_for_analysis:
-                kept = [tp for tp in journey.get("touchpoints", []) if tp.get("channel", "").lower() != "direct"]
-                if not kept:
-                    continue
-                j2 = dict(journey)
-                j2["touchpoints"] = kept
-                filtered_journeys.append(j2)
-            journeys_for_analysis = filtered_journeys
+            journeys_for_analysis = _exclude_direct_touchpoints(journeys_for_analysis)
 
         include_non_converted = (path_scope or "converted").lower() in ("all", "all_journeys", "include_non_converted")
-        journeys_universe = journeys_for_analysis if include_non_converted else [j for j in journeys_for_analysis if j.get("converted", True)]
+        # Every journey's step sequence, built once per dataset; matching, step breakdown and variants all reuse it.
+        journey_steps, journey_paths = journey_step_paths_fn(journeys_for_analysis, "channel")
+        journeys_universe = journeys_for_analysis
+        if not include_non_converted:
+            in_scope = [idx for idx, journey in enumerate(journeys_for_analysis) if journey.get("converted", True)]
+            journeys_universe = [journeys_for_analysis[idx] for idx in in_scope]
+            journey_steps = [journey_steps[idx] for idx in in_scope]
+            journey_paths = [journey_paths[idx] for idx in in_scope]
         if not journeys_universe:
             raise HTTPException(status_code=400, detail="No journeys for this view.")
 
         target_steps = [s for s in path.split(" > ") if s]
-        matching_journeys = []
-        for journey in journeys_universe:
-            steps = [step_string_fn(tp, "channel") for tp in journey.get("touchpoints", [])]
-            if " > ".join(steps) == path:
-                matching_journeys.append(journey)
+        matching_idx = [idx for idx, candidate in enumerate(journey_paths) if candidate == path]
+        matching_journeys = [journeys_universe[idx] for idx in matching_idx]
 
         total_in_view = len(journeys_universe)
         count = len(matching_journeys)
         avg_len = 0.0
-        times: List[float] = []
+        conversion_spans: List[Tuple[Any, Any]] = []
         for journey in matching_journeys:
             tps = journey.get("touchpoints", [])
             if tps:
                 avg_len += len(tps)
             if journey.get("converted", True) and len(tps) >= 2:
-                try:
-                    first_ts = pd.Timestamp(tps[0].get("timestamp", ""))
-                    last_ts = pd.Timestamp(tps[-1].get("timestamp", ""))
-                    if pd.notna(first_ts) and pd.notna(last_ts):
-                        delta = (last_ts - first_ts).total_seconds() / 86400.0
-                        if delta >= 0:
-                            times.append(delta)
-                except Exception:
-                    pass
+                conversion_spans.append((tps[0].get("timestamp", ""), tps[-1].get("timestamp", "")))
         avg_len = avg_len / count if count else 0.0
+        times = _days_to_convert(conversion_spans)
         avg_time = sum(times) / len(times) if times else None
 
         step_breakdown = []
         if target_steps and count:
+            # prefix_matches[pos] / stops_here[pos] for every position, from one pass over journeys.
+            prefix_matches = [0] * (len(target_steps) + 1)
+            stops_here = [0] * (len(target_steps) + 1)
+            for steps in journey_steps:
+                shared = 0
+                for step, target in zip(steps, target_steps):
+                    if step != target:
+                        break
+                    shared += 1
+                for pos in range(1, shared + 1):
+                    prefix_matches[pos] += 1
+                if 0 < len(steps) <= shared:
+                    stops_here[len(steps)] += 1
             for idx, step in enumerate(target_steps):
                 pos = idx + 1
-                prefix = target_steps[:pos]
-                prefix_matches = 0
-                stops_here = 0
-                for journey in journeys_universe:
-                    steps = [step_string_fn(tp, "channel") for tp in journey.get("touchpoints", [])]
-                    if len(steps) < pos:
-                        continue
-                    if steps[:pos] == prefix:
-                        prefix_matches += 1
-                        if len(steps) == pos:
-                            stops_here += 1
-                dropoff_share = stops_here / prefix_matches if prefix_matches else 0.0
-                step_breakdown.append({"step": step, "position": pos, "dropoff_share": round(dropoff_share, 4), "prefix_journeys": prefix_matches})
+                dropoff_share = stops_here[pos] / prefix_matches[pos] if prefix_matches[pos] else 0.0
+                step_breakdown.append({"step": step, "position": pos, "dropoff_share": round(dropoff_share, 4), "prefix_journeys": prefix_matches[pos]})
 
         variant_counts: Dict[str, int] = {}
-        for journey in journeys_universe:
-            steps = [step_string_fn(tp, "channel") for tp in journey.get("touchpoints", [])]
-            candidate = " > ".join(steps)
+        variant_steps: Dict[str, List[str]] = {}
+        for candidate, steps in zip(journey_paths, journey_steps):
             if candidate == path:
                 continue
-            variant_counts[candidate] = variant_counts.get(candidate, 0) + 1
+            if candidate not in variant_counts:
+                variant_counts[candidate] = 0
+                variant_steps[candidate] = [s for s in steps if s]
+            variant_counts[candidate] += 1
 
-        def _similarity_score(other: str) -> int:
-            o_steps = [s for s in other.split(" > ") if s]
+        def _similarity_score(o_steps: List[str]) -> int:
             score = 0
             for a, b in zip(target_steps, o_steps):
                 if a == b:
@@ -1219,26 +1339,23 @@ def create_router(
                 score -= 1
             return score
 
-        variants = sorted(
-            [{"path": pth, "count": c, "share": round(c / total_in_view, 4)} for pth, c in variant_counts.items()],
-            key=lambda x: (_similarity_score(x["path"]), x["count"]),
-            reverse=True,
-        )[:5]
+        top_variants = heapq.nlargest(
+            5,
+            variant_counts.items(),
+            key=lambda item: (_similarity_score(variant_steps[item[0]]), item[1]),
+        )
+        variants = [{"path": pth, "count": c, "share": round(c / total_in_view, 4)} for pth, c in top_variants]
 
+        # Matching journeys share one channel sequence (barring channel names containing " > "),
+        # so count each distinct sequence once and weight it by how many journeys follow it.
         direct_unknown_touches = 0
         total_touches = 0
         journeys_ending_direct = 0
-        for journey in matching_journeys:
-            tps = journey.get("touchpoints", [])
-            for tp in tps:
-                ch = tp.get("channel", "unknown")
-                total_touches += 1
-                if ch.lower() in ("direct", "unknown"):
-                    direct_unknown_touches += 1
-            if tps:
-                last_ch = tps[-1].get("channel", "unknown")
-                if last_ch and last_ch.lower() == "direct":
-                    journeys_ending_direct += 1
+        for steps, journeys_with_steps in Counter(tuple(journey_steps[idx]) for idx in matching_idx).items():
+            total_touches += len(steps) * journeys_with_steps
+            direct_unknown_touches += sum(1 for ch in steps if ch.lower() in ("direct", "unknown")) * journeys_with_steps
+            if steps and steps[-1] and steps[-1].lower() == "direct":
+                journeys_ending_direct += journeys_with_steps
 
         confidence = None
         if meta and meta.get("conversion_key"):
@@ -1250,22 +1367,24 @@ def create_router(
                     "components": snap.components_json or {},
                 }
 
-        return {
-            "path": path,
-            "summary": {
-                "count": count,
-                "share": round(count / total_in_view, 4) if total_in_view else 0.0,
-                "avg_touchpoints": round(avg_len, 2),
-                "avg_time_to_convert_days": round(avg_time, 2) if avg_time is not None else None,
-            },
-            "step_breakdown": step_breakdown,
-            "variants": variants,
-            "data_health": {
-                "direct_unknown_touch_share": round(direct_unknown_touches / total_touches, 4) if total_touches else 0.0,
-                "journeys_ending_direct_share": round(journeys_ending_direct / count, 4) if count else 0.0,
-                "confidence": confidence,
-            },
-        }
+        return ORJSONResponse(
+            {
+                "path": path,
+                "summary": {
+                    "count": count,
+                    "share": round(count / total_in_view, 4) if total_in_view else 0.0,
+                    "avg_touchpoints": round(avg_len, 2),
+                    "avg_time_to_convert_days": round(avg_time, 2) if avg_time is not None else None,
+                },
+                "step_breakdown": step_breakdown,
+                "variants": variants,
+                "data_health": {
+                    "direct_unknown_touch_share": round(direct_unknown_touches / total_touches, 4) if total_touches else 0.0,
+                    "journeys_ending_direct_share": round(journeys_ending_direct / count, 4) if count else 0.0,
+                    "confidence": confidence,
+                },
+            }
+        )
 
     @router.get("/api/conversion-paths/details")
     def get_conversion_path_details_aggregated(
@@ -1323,8 +1442,15 @@ def create_router(
         recompute: bool = False,
         db=Depends(get_db_dependency),
     ):
+        journeys = get_journeys_fn(db)
+        if not journeys:
+            raise HTTPException(status_code=400, detail="No journeys loaded.")
+        resolved_cfg, _meta = load_config_and_meta_fn(db, config_id)
+        # The journey cache generation and config version pin the dataset a cached result was built from.
+        dataset_key = (get_journey_cache_generation(), (_meta or {}).get("config_version"))
         pre_cache_key = (
             "path_archetypes_v2",
+            dataset_key,
             date_from or "",
             date_to or "",
             conversion_key or "",
@@ -1342,11 +1468,7 @@ def create_router(
         )
         if not recompute and pre_cache_key in path_archetypes_cache_obj:
             return path_archetypes_cache_obj[pre_cache_key]
-        journeys = get_journeys_fn(db)
-        if not journeys:
-            raise HTTPException(status_code=400, detail="No journeys loaded.")
         journeys = _filter_journeys_to_window(journeys, date_from=date_from, date_to=date_to)
-        resolved_cfg, _meta = load_config_and_meta_fn(db, config_id)
         journeys_for_analysis = apply_model_config_fn(journeys, resolved_cfg.config_json or {}) if resolved_cfg else journeys
         direct_mode_normalized = (direct_mode or "include").lower()
         if direct_mode_normalized not in ("include", "exclude"):
@@ -1359,17 +1481,10 @@ def create_router(
             country=country,
         )
         if direct_mode_normalized == "exclude":
-            filtered_journeys = []
-            for journey in journeys_for_analysis:
-                kept = [tp for tp in journey.get("touchpoints", []) if tp.get("channel", "").lower() != "direct"]
-                if not kept:
-                    continue
-                j2 = dict(journey)
-                j2["touchpoints"] = kept
-                filtered_journeys.append(j2)
-            journeys_for_analysis = filtered_journeys
+            journeys_for_analysis = _exclude_direct_touchpoints(journeys_for_analysis)
 
         cache_key = (
+            dataset_key,
             date_from or "",
             date_to or "",
             conversion_key or "",
@@ -1407,6 +1522,8 @@ def create_router(
             "device": device,
             "country": country,
         }
+        if len(path_archetypes_cache_obj) >= PATH_ARCHETYPES_CACHE_MAX:
+            path_archetypes_cache_obj.clear()
         path_archetypes_cache_obj[cache_key] = result
         path_archetypes_cache_obj[pre_cache_key] = result
         return result
@@ -1435,11 +1552,9 @@ def create_router(
             path_counts: Dict[str, int] = {}
             direct_unknown_counts: Dict[str, int] = {}
             total_for_prefix = 0
-            for journey in journeys:
-                steps = [step_string_fn(tp, use_level) for tp in journey.get("touchpoints", [])]
+            for steps, full_path in zip(*journey_step_paths_fn(journeys, use_level)):
                 if len(steps) < len(prefix_steps) or steps[: len(prefix_steps)] != prefix_steps:
                     continue
-                full_path = " > ".join(steps)
                 path_counts[full_path] = path_counts.get(full_path, 0) + 1
                 total_for_prefix += 1
                 for step in steps:
@@ -1500,12 +1615,7 @@ def create_router(
             _with_result_scope(result, meta=meta, basis="workspace")
             _results_store()[model] = result
 
-        expense_by_channel: Dict[str, float] = {}
-        for exp in expenses_obj.values():
-            if getattr(exp, "status", "active") == "deleted":
-                continue
-            converted = exp.converted_amount if getattr(exp, "converted_amount", None) is not None else exp.amount
-            expense_by_channel[exp.channel] = expense_by_channel.get(exp.channel, 0) + converted
+        expense_by_channel = expense_by_channel_fn()
 
         performance = compute_channel_performance_fn(result, expense_by_channel)
         for row in performance:
@@ -1556,12 +1666,7 @@ def create_router(
             kwargs["last_pct"] = settings.attribution.position_last_pct
         result = run_attribution_campaign_fn(journeys_for_model, model=model, **kwargs)
 
-        expense_by_channel: Dict[str, float] = {}
-        for exp in expenses_obj.values():
-            if getattr(exp, "status", "active") == "deleted":
-                continue
-            converted = exp.converted_amount if getattr(exp, "converted_amount", None) is not None else exp.amount
-            expense_by_channel[exp.channel] = expense_by_channel.get(exp.channel, 0) + converted
+        expense_by_channel = expense_by_channel_fn()
 
         total_spend = sum(expense_by_channel.values())
         total_attributed_value = float(result.get("total_value", 0) or 0.0)
@@ -1,5 +1,8 @@
-from typing import Any, Callable, Dict, List, Optional
+import hashlib
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
+import orjson
 from fastapi import APIRouter, Depends, HTTPException
 
 from app.modules.config_management.schemas import (
@@ -15,19 +18,54 @@ from app.modules.config_management.schemas import (
     ModelConfigUpdatePayload,
     ModelConfigValidatePayload,
 )
+from app.services_journey_cache import journey_dataset_key
 from app.services_model_config_decisions import (
     build_model_config_activation_decision,
     build_model_config_preview_decision,
     build_model_config_validation_decision,
 )
+from app.utils.json_response import ORJSON_OPTIONS
+
+_PREVIEW_METRICS_CACHE_MAX = 32
+_PREVIEW_METRICS_CACHE_LOCK = threading.Lock()
+_PREVIEW_METRICS_CACHE: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
 
 
 def _compute_journey_metrics(journeys: List[Dict[str, Any]]) -> Dict[str, Any]:
-    touchpoints = sum(len(j.get("touchpoints") or []) for j in journeys)
-    conversions = sum(1 for j in journeys if j.get("converted", True))
+    touchpoints = 0
+    conversions = 0
+    for j in journeys:
+        touchpoints += len(j.get("touchpoints") or ())
+        if j.get("converted", True):
+            conversions += 1
     return {"journeys": len(journeys), "touchpoints": touchpoints, "conversions": conversions}
 
 
+def _config_fingerprint(cfg_json: Dict[str, Any]) -> str:
+    encoded = orjson.dumps(cfg_json, option=ORJSON_OPTIONS | orjson.OPT_SORT_KEYS, default=str)
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+
+def _preview_journey_metrics(
+    journeys: List[Dict[str, Any]],
+    cfg_json: Dict[str, Any],
+    fingerprint: str,
+    apply_model_config_fn: Callable[..., List[Dict[str, Any]]],
+) -> Dict[str, Any]:
+    """Journey metrics after applying a config, memoized per config and journey dataset."""
+    cache_key = (fingerprint, journey_dataset_key(journeys))
+    with _PREVIEW_METRICS_CACHE_LOCK:
+        cached = _PREVIEW_METRICS_CACHE.get(cache_key)
+    if cached is not None:
+        return dict(cached["result"])
+    metrics = _compute_journey_metrics(apply_model_config_fn(journeys, cfg_json))
+    with _PREVIEW_METRICS_CACHE_LOCK:
+        if len(_PREVIEW_METRICS_CACHE) >= _PREVIEW_METRICS_CACHE_MAX:
+            _PREVIEW_METRICS_CACHE.clear()
+        _PREVIEW_METRICS_CACHE[cache_key] = {"journeys": journeys, "result": dict(metrics)}
+    return metrics
+
+
 def _changed_top_level_keys(old_cfg: Optional[Dict[str, Any]], new_cfg: Dict[str, Any]) -> List[str]:
     old_map = old_cfg if isinstance(old_cfg, dict) else {}
     keys = set(old_map.keys()) | set(new_cfg.keys())
@@ -262,10 +300,15 @@ def create_router(
             .first()
         )
         baseline_json = baseline_cfg.config_json if baseline_cfg else {}
-        baseline_journeys = apply_model_config_fn(journeys, baseline_json or {})
-        draft_journeys = apply_model_config_fn(journeys, cfg_json)
-        baseline_metrics = _compute_journey_metrics(baseline_journeys)
-        draft_metrics = _compute_journey_metrics(draft_journeys)
+        baseline_fingerprint = _config_fingerprint(baseline_json or {})
+        draft_fingerprint = _config_fingerprint(cfg_json)
+        baseline_metrics = _preview_journey_metrics(
+            journeys, baseline_json or {}, baseline_fingerprint, apply_model_config_fn
+        )
+        if draft_fingerprint == baseline_fingerprint:
+            draft_metrics = dict(baseline_metrics)
+        else:
+            draft_metrics = _preview_journey_metrics(journeys, cfg_json, draft_fingerprint, apply_model_config_fn)
         deltas = {key: float(draft_metrics.get(key, 0) - baseline_metrics.get(key, 0)) for key in draft_metrics.keys()}
         deltas_pct: Dict[str, Optional[float]] = {}
         for key, delta in deltas.items():
@@ -20,6 +20,8 @@ from app.modules.meiro_integration.schemas import (
     MeiroMappingApprovalRequest,
     MeiroWebhookReprocessRequest,
 )
+from app.services_journeys_health import converted_count_and_channels
+from app.services_meiro_import import read_cdp_profiles_file
 from app.utils.meiro_config import (
     append_event_archive_entry,
     append_auto_replay_history,
@@ -1387,7 +1389,7 @@ def create_router(
         count = 0
         if out_path.exists():
             try:
-                data = json.loads(out_path.read_text())
+                data = read_cdp_profiles_file(out_path)
                 count = len(data) if isinstance(data, list) else 0
             except Exception:
                 pass
@@ -1514,7 +1516,7 @@ def create_router(
                 to_store = profiles
             else:
                 try:
-                    existing = json.loads(out_path.read_text())
+                    existing = read_cdp_profiles_file(out_path)
                     to_store = (existing if isinstance(existing, list) else []) + list(profiles)
                 except Exception:
                     to_store = profiles
@@ -1707,7 +1709,7 @@ def create_router(
                 existing_tail: list[Any] = []
                 try:
                     if out_path.stat().st_size <= 5_000_000:
-                        existing = json.loads(out_path.read_text())
+                        existing = read_cdp_profiles_file(out_path)
                         existing_tail = (existing if isinstance(existing, list) else [])[-snapshot_limit:]
                 except Exception:
                     existing_tail = []
@@ -2683,14 +2685,7 @@ def create_router(
         set_journeys_cache_fn(journeys)
         persist_journeys_fn(db, journeys, replace=True)
         refresh_journey_aggregates_fn(db)
-        converted = sum(1 for journey in journeys if journey.get("converted", True))
-        channels_detected = sorted(
-            {
-                touchpoint.get("channel", "unknown")
-                for journey in journeys
-                for touchpoint in journey.get("touchpoints", [])
-            }
-        )
+        converted, channels_detected = converted_count_and_channels(journeys)
         append_import_run_fn(
             "meiro_pull",
             len(journeys),
@@ -2757,7 +2752,7 @@ def create_router(
         if archived_profiles:
             profiles = archived_profiles
         elif cdp_json_path.exists():
-            profiles = json.loads(cdp_json_path.read_text())
+            profiles = read_cdp_profiles_file(cdp_json_path)
         elif cdp_path.exists():
             df = pd.read_csv(cdp_path)
             profiles = df.to_dict(orient="records")
@@ -45,7 +45,7 @@ def create_router(
     stale_run_after = timedelta(hours=6)
 
     def _ensure_mmm_enabled() -> None:
-        if not getattr(get_settings_obj().feature_flags, "mmm_enabled", False):
+        if not get_settings_obj().feature_flags.mmm_enabled:
             raise HTTPException(status_code=404, detail="mmm_enabled flag is off")
 
     def _load_run_and_dataset_rows(run_id: str) -> tuple[Dict[str, Any], list[dict[str, Any]]]:
@@ -1,4 +1,3 @@
-import json
 import threading
 import time
 from datetime import datetime
@@ -7,11 +6,12 @@ from typing import Any, Callable, Dict, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 
-from app.attribution_engine import compute_next_best_action, has_any_campaign
-from app.modules.settings.schemas import NBASettings, Settings
+from app.attribution_engine import has_any_campaign
+from app.modules.settings.schemas import NBASettings
+from app.modules.settings.service import load_settings_file
 from app.services_canonical_facts import iter_canonical_conversion_rows
 from app.services_import_runs import get_last_successful_run, get_runs as get_import_runs
-from app.services_nba_defaults import filter_nba_recommendations
+from app.services_nba_defaults import compute_next_best_action_cached, filter_nba_recommendations
 from app.services_activation_measurement import (
     build_activation_feedback_export,
     build_activation_feedback_recommendations,
@@ -117,13 +117,8 @@ _SETTINGS_PATH = Path(__file__).resolve().parents[2] / "data" / "settings.json"
 
 
 def _load_runtime_nba_settings() -> NBASettings:
-    if _SETTINGS_PATH.exists():
-        try:
-            payload = json.loads(_SETTINGS_PATH.read_text())
-            return Settings(**payload).nba
-        except Exception:
-            pass
-    return NBASettings()
+    settings = load_settings_file(_SETTINGS_PATH)
+    return settings.nba if settings is not None else NBASettings()
 
 
 def _filter_journeys_for_campaign_suggestions(
@@ -175,7 +170,7 @@ def _build_campaign_suggestions_payload(
             "reason": "Campaign suggestions unavailable because journeys lack campaign data.",
         }
 
-    nba_campaign_raw = compute_next_best_action(journeys, level="campaign")
+    nba_campaign_raw = compute_next_best_action_cached(journeys, level="campaign")
     nba_campaign, _stats = filter_nba_recommendations(nba_campaign_raw, settings)
     return {
         "items": {prefix: recs[0] for prefix, recs in nba_campaign.items() if recs},
@@ -192,7 +187,7 @@ def _build_channel_suggestions_payload(
     if not journeys:
         return {"items": {}, "level": "channel", "eligible_journeys": 0}
 
-    nba_channel_raw = compute_next_best_action(journeys, level="channel")
+    nba_channel_raw = compute_next_best_action_cached(journeys, level="channel")
     nba_channel, _stats = filter_nba_recommendations(nba_channel_raw, settings)
     return {
         "items": {
@@ -1,4 +1,6 @@
-from typing import Any, Callable, Dict, Optional
+import threading
+from operator import attrgetter
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
 
@@ -25,6 +27,7 @@ from app.services_revenue_config import normalize_revenue_config
 from app.services_attribution_defaults import build_attribution_defaults_overview
 from app.services_nba_defaults import build_nba_preview_summary
 from app.services_nba_policy_sync import build_promoted_journey_policy_overrides
+from app.services_journey_cache import journey_dataset_key
 from app.services_mmm_defaults import build_mmm_defaults_preview
 from app.utils.taxonomy import (
     ChannelRule,
@@ -33,65 +36,90 @@ from app.utils.taxonomy import (
     is_catch_all_rule,
     load_taxonomy,
     save_taxonomy,
+    serialize_taxonomy,
+    taxonomy_file_signature,
 )
 
 
-def _serialize_taxonomy() -> Dict[str, Any]:
-    tax = load_taxonomy()
+# Serialized taxonomy keyed by the taxonomy file signature; a rewrite of the file
+# (save_taxonomy or the catch-all cleanup in load_taxonomy) changes the key.
+_SERIALIZED_TAXONOMY_CACHE: Dict[str, Any] = {"entry": None}
 
-    def _serialize_expression(expr):
-        return {
-            "operator": expr.normalize_operator(),
-            "value": expr.value or "",
-        }
 
-    return {
-        "channel_rules": [
-            {
-                "name": r.name,
-                "channel": r.channel,
-                "priority": r.priority,
-                "enabled": r.enabled,
-                "source": _serialize_expression(r.source),
-                "medium": _serialize_expression(r.medium),
-                "campaign": _serialize_expression(r.campaign),
-            }
-            for r in tax.channel_rules
-        ],
-        "source_aliases": tax.source_aliases,
-        "medium_aliases": tax.medium_aliases,
+def _serialize_taxonomy() -> Dict[str, Any]:
+    signature = taxonomy_file_signature()
+    entry = _SERIALIZED_TAXONOMY_CACHE["entry"]
+    if signature is not None and entry is not None and entry[0] == signature:
+        return entry[1]
+    payload = serialize_taxonomy(load_taxonomy())
+    _SERIALIZED_TAXONOMY_CACHE["entry"] = (taxonomy_file_signature(), payload)
+    return payload
+
+
+_KPI_MATCH_INDEX_CACHE_MAX = 4
+_KPI_MATCH_INDEX_CACHE_LOCK = threading.Lock()
+_KPI_MATCH_INDEX_CACHE: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+
+
+def _kpi_match_index(journeys: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Normalized event names, KPI types and converted flags per journey dataset.
+
+    Lets the KPI test endpoint look up matches for a definition instead of
+    re-normalizing every event of every journey on each call.
+    """
+    cache_key = journey_dataset_key(journeys)
+    with _KPI_MATCH_INDEX_CACHE_LOCK:
+        cached = _KPI_MATCH_INDEX_CACHE.get(cache_key)
+    if cached is not None:
+        return cached["result"]
+
+    events_by_name: Dict[str, List[Tuple[int, Dict[str, Any]]]] = {}
+    journeys_by_kpi_type: Dict[str, List[int]] = {}
+    converted: List[int] = []
+    for idx, journey in enumerate(journeys):
+        for event in journey.get("events") or []:
+            name = str(event.get("name") or event.get("event_name") or "").strip().lower()
+            if name:
+                events_by_name.setdefault(name, []).append((idx, event))
+        journey_type = str(journey.get("kpi_type") or "").strip().lower()
+        journeys_by_kpi_type.setdefault(journey_type, []).append(idx)
+        if journey.get("converted", False):
+            converted.append(idx)
+    index = {
+        "events_by_name": events_by_name,
+        "journeys_by_kpi_type": journeys_by_kpi_type,
+        "converted": converted,
     }
+    with _KPI_MATCH_INDEX_CACHE_LOCK:
+        if len(_KPI_MATCH_INDEX_CACHE) >= _KPI_MATCH_INDEX_CACHE_MAX:
+            _KPI_MATCH_INDEX_CACHE.clear()
+        _KPI_MATCH_INDEX_CACHE[cache_key] = {"journeys": journeys, "result": index}
+    return index
 
 
 def _parse_taxonomy_payload(payload: Dict[str, Any]) -> Taxonomy:
-    def _parse_expression(data: Optional[Dict[str, Any]], fallback_regex: Optional[str] = None):
+    def _parse_expression(data: Optional[Dict[str, Any]], fallback_regex: Optional[str] = None) -> MatchExpression:
         if isinstance(data, dict):
-            return {
-                "operator": data.get("operator", "any"),
-                "value": data.get("value", ""),
-            }
+            return MatchExpression(operator=data.get("operator", "any"), value=data.get("value", ""))
         if fallback_regex:
-            return {"operator": "regex", "value": fallback_regex}
-        return {"operator": "any", "value": ""}
+            return MatchExpression(operator="regex", value=fallback_regex)
+        return MatchExpression()
 
     rules: list[ChannelRule] = []
     channel_rules_payload = payload.get("channel_rules", [])
     for idx, rule_payload in enumerate(channel_rules_payload):
-        expr_source = _parse_expression(rule_payload.get("source"), rule_payload.get("source_regex"))
-        expr_medium = _parse_expression(rule_payload.get("medium"), rule_payload.get("medium_regex"))
-        expr_campaign = _parse_expression(rule_payload.get("campaign"))
         rules.append(
             ChannelRule(
                 name=rule_payload.get("name", ""),
                 channel=rule_payload.get("channel", ""),
                 priority=int(rule_payload.get("priority", (idx + 1) * 10)),
                 enabled=bool(rule_payload.get("enabled", True)),
-                source=MatchExpression(**expr_source),
-                medium=MatchExpression(**expr_medium),
-                campaign=MatchExpression(**expr_campaign),
+                source=_parse_expression(rule_payload.get("source"), rule_payload.get("source_regex")),
+                medium=_parse_expression(rule_payload.get("medium"), rule_payload.get("medium_regex")),
+                campaign=_parse_expression(rule_payload.get("campaign")),
             )
         )
-    rules.sort(key=lambda r: (r.priority, r.name))
+    rules.sort(key=attrgetter("priority", "name"))
     return Taxonomy(
         channel_rules=rules,
         source_aliases=payload.get("source_aliases", {}),
@@ -109,7 +137,7 @@ def create_router(
     get_kpi_config_model_fn: Callable[[], KpiConfigModel],
     replace_kpi_config_fn: Callable[[KpiConfigModel], KpiConfigModel],
     ensure_journeys_loaded_fn: Callable[[Any], list[dict]],
-    resolve_current_user_id_fn: Callable[[Request], str],
+    resolve_current_user_id_fn: Callable[..., str],
 ) -> APIRouter:
     router = APIRouter(tags=["settings"])
 
@@ -601,47 +629,40 @@ def create_router(
         definition = payload.definition
         total_journeys = len(journeys)
         target_event = (definition.event_name or definition.id or "").strip().lower()
-        matched_events = 0
-        journeys_matched = 0
+        fallback_used = False
+        # Every matched event (or fallback journey) is the source its value field is checked on.
+        matched_sources: List[Dict[str, Any]] = []
+
+        index = _kpi_match_index(journeys)
+        event_matched: set[int] = set()
+        if target_event:
+            for idx, event in index["events_by_name"].get(target_event, []):
+                event_matched.add(idx)
+                matched_sources.append(event)
+        journeys_matched = len(event_matched)
+
+        # Journeys without a matching event fall back to their KPI type, or to the
+        # converted flag when the definition names no event at all.
+        fallback_ids: List[int] = []
+        if definition.id:
+            fallback_ids = index["journeys_by_kpi_type"].get(definition.id.strip().lower(), [])
+        if not target_event and definition.event_name == "":
+            type_matched = set(fallback_ids)
+            fallback_ids = fallback_ids + [idx for idx in index["converted"] if idx not in type_matched]
+        for idx in fallback_ids:
+            if idx in event_matched:
+                continue
+            journeys_matched += 1
+            matched_sources.append(journeys[idx])
+            fallback_used = True
+
+        matched_events = len(matched_sources)
         missing_value_checks = 0
         missing_value_count = 0
-        fallback_used = False
-
-        def _record_value(source: Dict[str, Any]) -> None:
-            nonlocal missing_value_checks, missing_value_count
-            if definition.value_field:
-                missing_value_checks += 1
-                value = source.get(definition.value_field)
-                if value in (None, "", []):
-                    missing_value_count += 1
-
-        for journey in journeys:
-            journey_matches = False
-            events = journey.get("events") or []
-            if target_event:
-                for event in events:
-                    name = str(event.get("name") or event.get("event_name") or "").strip().lower()
-                    if name and name == target_event:
-                        matched_events += 1
-                        journey_matches = True
-                        _record_value(event)
-
-            if not journey_matches:
-                journey_type = str(journey.get("kpi_type") or "").strip().lower()
-                if definition.id and journey_type == definition.id.strip().lower():
-                    matched_events += 1
-                    journey_matches = True
-                    _record_value(journey)
-                    fallback_used = True
-                elif not target_event and definition.event_name == "":
-                    if journey.get("converted", False):
-                        matched_events += 1
-                        journey_matches = True
-                        _record_value(journey)
-                        fallback_used = True
-
-            if journey_matches:
-                journeys_matched += 1
+        if definition.value_field:
+            value_field = definition.value_field
+            missing_value_checks = matched_events
+            missing_value_count = sum(1 for source in matched_sources if source.get(value_field) in (None, "", []))
 
         journeys_pct = (journeys_matched / total_journeys) * 100.0 if total_journeys else 0.0
         missing_value_pct = (
@@ -765,7 +786,7 @@ def create_router(
         db=Depends(get_db_dependency),
         _ctx=Depends(require_permission_dependency("settings.view")),
     ):
-        return list_notification_prefs(db, resolve_current_user_id_fn(request))
+        return list_notification_prefs(db, resolve_current_user_id_fn(request, db))
 
     @router.post("/api/settings/notification-preferences")
     def api_upsert_notification_preference(
@@ -776,7 +797,7 @@ def create_router(
     ):
         return upsert_notification_pref(
             db,
-            resolve_current_user_id_fn(request),
+            resolve_current_user_id_fn(request, db),
             body.channel_id,
             severities=body.severities,
             digest_mode=body.digest_mode,
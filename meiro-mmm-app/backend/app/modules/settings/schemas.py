@@ -1,9 +1,14 @@
 from typing import Any, Dict, List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+
+# Leaf settings blocks are replaced wholesale on update, never edited in place.
+_FROZEN_SETTINGS_CONFIG = ConfigDict(frozen=True, extra="ignore")
 
 
 class AttributionSettings(BaseModel):
+    model_config = _FROZEN_SETTINGS_CONFIG
+
     lookback_window_days: int = 30
     use_converted_flag: bool = True
     conversion_value_mode: str = "gross_only"
@@ -16,10 +21,14 @@ class AttributionSettings(BaseModel):
 
 
 class MMMSettings(BaseModel):
+    model_config = _FROZEN_SETTINGS_CONFIG
+
     frequency: str = "W"
 
 
 class NBASettings(BaseModel):
+    model_config = _FROZEN_SETTINGS_CONFIG
+
     min_prefix_support: int = 5
     min_conversion_rate: float = 0.01
     max_prefix_depth: int = 5
@@ -31,6 +40,8 @@ class NBASettings(BaseModel):
 
 
 class FeatureFlags(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     mmm_enabled: bool = False
     journeys_enabled: bool = False
     journey_examples_enabled: bool = False
@@ -44,11 +55,15 @@ class FeatureFlags(BaseModel):
 
 
 class AdsGovernanceSettings(BaseModel):
+    model_config = _FROZEN_SETTINGS_CONFIG
+
     require_approval: bool = True
     max_budget_change_pct: float = 30.0
 
 
 class RevenueConfig(BaseModel):
+    model_config = _FROZEN_SETTINGS_CONFIG
+
     conversion_names: List[str] = Field(default_factory=lambda: ["purchase"])
     value_field_path: str = "value"
     currency_field_path: str = "currency"
@@ -64,6 +79,8 @@ class RevenueConfig(BaseModel):
 
 
 class Settings(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     attribution: AttributionSettings = AttributionSettings()
     mmm: MMMSettings = MMMSettings()
     nba: NBASettings = NBASettings()
@@ -72,6 +89,88 @@ class Settings(BaseModel):
     revenue_config: RevenueConfig = RevenueConfig()
 
 
+class AttributionPreviewPayload(BaseModel):
+    settings: AttributionSettings
+
+
+class AttributionPreviewResponse(BaseModel):
+    previewAvailable: bool
+    totalJourneys: int
+    eligibleJourneys: int
+    windowImpactCount: int
+    windowDirection: str
+    qualityImpactCount: int
+    qualityDirection: str
+    useConvertedFlagImpact: int
+    useConvertedFlagDirection: str
+    reason: Optional[str] = None
+    decision: Optional[Dict[str, Any]] = None
+
+
+class AttributionDefaultsOverviewResponse(BaseModel):
+    dependencies: Dict[str, Any]
+    resolved_inputs: Dict[str, Any]
+    decision: Dict[str, Any]
+
+
+class NBAPreviewPayload(BaseModel):
+    settings: NBASettings
+    level: Optional[str] = "channel"
+
+
+class NBAPreviewResponse(BaseModel):
+    previewAvailable: bool
+    datasetJourneys: int
+    totalPrefixes: int
+    prefixesEligible: int
+    totalRecommendations: int
+    averageRecommendationsPerPrefix: float
+    filteredBySupportPct: float
+    filteredByConversionPct: float
+    reason: Optional[str] = None
+    decision: Optional[Dict[str, Any]] = None
+
+
+class MMMDefaultsPreviewPayload(BaseModel):
+    settings: MMMSettings
+
+
+class MMMDefaultsPreviewResponse(BaseModel):
+    previewAvailable: bool
+    summary: Dict[str, Any]
+    reason: Optional[str] = None
+    decision: Optional[Dict[str, Any]] = None
+
+
+class NBATestPayload(BaseModel):
+    settings: NBASettings
+    path_prefix: str
+    level: Optional[str] = "channel"
+
+
+class NBATestRecommendation(BaseModel):
+    step: str
+    channel: str
+    campaign: Optional[str] = None
+    count: int
+    conversions: int
+    conversion_rate: float
+    avg_value: float
+    avg_value_converted: float
+    uplift_pct: Optional[float] = None
+
+
+class NBATestResponse(BaseModel):
+    previewAvailable: bool
+    prefix: str
+    level: str
+    totalPrefixSupport: int
+    baselineConversionRate: float
+    recommendations: List[NBATestRecommendation]
+    reason: Optional[str] = None
+    decision: Optional[Dict[str, Any]] = None
+
+
 class KpiDefinitionModel(BaseModel):
     id: str
     label: str
@@ -0,0 +1,30 @@
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from app.modules.settings.schemas import Settings
+
+
+@lru_cache(maxsize=4)
+def _parse_settings_file(path: str, mtime_ns: int) -> Optional[Settings]:
+    try:
+        return Settings.model_validate_json(Path(path).read_bytes())
+    except Exception:
+        return None
+
+
+def load_settings_file(path: Path) -> Optional[Settings]:
+    """
+    Parsed settings.json, re-validated only when the file's mtime changes.
+    Returns None when the file is missing or corrupted. The returned model is
+    shared between callers and must be treated as read-only.
+    """
+    try:
+        mtime_ns = path.stat().st_mtime_ns
+    except OSError:
+        return None
+    return _parse_settings_file(str(path), mtime_ns)
+
+
+def clear_settings_file_cache() -> None:
+    _parse_settings_file.cache_clear()
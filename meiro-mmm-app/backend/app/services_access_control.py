@@ -3,8 +3,9 @@
 from __future__ import annotations
 
 import uuid
+import weakref
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from sqlalchemy.orm import Session
 
@@ -13,6 +14,11 @@ from .models_config_dq import Permission, Role, RolePermission, Workspace
 
 DEFAULT_WORKSPACE_ID = "default"
 
+# System roles are seeded once per database, so the Admin role id is memoized per engine.
+# Weak engine keys drop an entry with its engine, so a later engine cannot inherit it through
+# a reused id(); seeding clears the entry in case the role was re-created.
+_ADMIN_ROLE_ID_CACHE: "weakref.WeakKeyDictionary[Any, str]" = weakref.WeakKeyDictionary()
+
 
 def _new_id() -> str:
     return str(uuid.uuid4())
@@ -81,6 +87,31 @@ SYSTEM_ROLE_PERMISSIONS: Dict[str, List[str]] = {
 }
 
 
+def _bind_engine(db: Session) -> Any:
+    bind = db.get_bind()
+    return getattr(bind, "engine", bind)
+
+
+def get_system_admin_role_id(db: Session) -> Optional[str]:
+    engine = _bind_engine(db)
+    cached = _ADMIN_ROLE_ID_CACHE.get(engine)
+    if cached is not None:
+        return cached
+    row = (
+        db.query(Role.id)
+        .filter(
+            Role.name == "Admin",
+            Role.is_system == True,  # noqa: E712
+        )
+        .limit(1)
+        .first()
+    )
+    if row is None:
+        return None
+    _ADMIN_ROLE_ID_CACHE[engine] = row.id
+    return row.id
+
+
 def ensure_access_control_seed_data(db: Session) -> Dict[str, Any]:
     inserted_permissions = 0
     inserted_roles = 0
@@ -162,6 +193,7 @@ def ensure_access_control_seed_data(db: Session) -> Dict[str, Any]:
             inserted_role_permissions += 1
 
     db.commit()
+    _ADMIN_ROLE_ID_CACHE.pop(_bind_engine(db), None)
     return {
         "permissions_inserted": inserted_permissions,
         "roles_inserted": inserted_roles,
@@ -8,7 +8,7 @@ import os
 import secrets
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Dict, Optional, Set
+from typing import Dict, FrozenSet, Optional
 
 from fastapi import HTTPException, Request
 from sqlalchemy.orm import Session
@@ -101,7 +101,7 @@ class AuthContext:
     workspace: Workspace
     membership: WorkspaceMembership
     role: Optional[Role]
-    permissions: Set[str]
+    permissions: FrozenSet[str]
     session: AuthSession
 
 
@@ -385,11 +385,11 @@ def revoke_all_user_sessions(db: Session, user_id: str) -> int:
     return len(rows)
 
 
-def _permissions_for_role(db: Session, role_id: Optional[str]) -> Set[str]:
+def _permissions_for_role(db: Session, role_id: Optional[str]) -> FrozenSet[str]:
     if not role_id:
-        return set()
+        return frozenset()
     perms = db.query(RolePermission.permission_key).filter(RolePermission.role_id == role_id).all()
-    return {p[0] for p in perms}
+    return frozenset(p[0] for p in perms)
 
 
 def resolve_auth_context(
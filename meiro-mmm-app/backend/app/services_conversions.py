@@ -11,9 +11,12 @@ when no ModelConfig is supplied.
 from __future__ import annotations
 
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import hashlib
+import json
+import sys
+import threading
 import uuid
 
 import pandas as pd
@@ -47,6 +50,7 @@ from .services_conversion_signal_facts import (
 from .services_journey_instance_facts import build_journey_instance_and_step_facts
 from .services_journey_role_facts import build_journey_role_facts
 from .services_journey_transition_facts import build_journey_transition_facts
+from .services_journey_cache import journey_dataset_key
 from .services_visit_facts import build_touchpoint_visit_facts
 from .services_revenue_config import compute_payload_revenue_value, extract_revenue_entries, get_revenue_config
 
@@ -231,11 +235,58 @@ def annotate_journeys_with_conversion_key(
     return out
 
 
+# Results of apply_model_config_to_journeys for the last few (journey dataset, config) pairs.
+# Endpoints in one UI session re-apply the same config to the cached journey dataset, and
+# returning the same output list also lets dataset-keyed caches further down keep hitting.
+_MODEL_CONFIG_RESULTS_MAX = 8
+_MODEL_CONFIG_RESULTS_LOCK = threading.Lock()
+_MODEL_CONFIG_RESULTS: Dict[Tuple[int, int, int, str], Dict[str, Any]] = {}
+
+
+def _is_noop_model_config(config_json: Dict[str, Any]) -> bool:
+    """True when no quality threshold, time window or conversion key would touch the journeys."""
+    quality_cfg = config_json.get("quality") or {}
+    windows = config_json.get("windows") or {}
+    conv_cfg = config_json.get("conversions") or {}
+    return (
+        int(quality_cfg.get("min_journey_quality_score") or 0) <= 0
+        and float(windows.get("click_lookback_days") or 0) <= 0
+        and float(windows.get("impression_lookback_days") or 0) <= 0
+        and not conv_cfg.get("primary_conversion_key")
+    )
+
+
 def apply_model_config_to_journeys(
     journeys: List[Dict[str, Any]],
     config_json: Dict[str, Any],
 ) -> List[Dict[str, Any]]:
-    """Apply both time windows and conversion-key annotations to journeys."""
+    """Apply both time windows and conversion-key annotations to journeys.
+
+    A no-op config returns `journeys` itself. Other results are cached per journey dataset
+    and config, so callers must treat the returned list as read-only.
+    """
+    if _is_noop_model_config(config_json):
+        return journeys
+    cache_key = (
+        journey_dataset_key(journeys),
+        json.dumps(config_json, sort_keys=True, default=str),
+    )
+    with _MODEL_CONFIG_RESULTS_LOCK:
+        cached = _MODEL_CONFIG_RESULTS.get(cache_key)
+        if cached is not None:
+            return cached["result"]
+    result = _apply_model_config(journeys, config_json)
+    with _MODEL_CONFIG_RESULTS_LOCK:
+        if len(_MODEL_CONFIG_RESULTS) >= _MODEL_CONFIG_RESULTS_MAX:
+            _MODEL_CONFIG_RESULTS.clear()
+        _MODEL_CONFIG_RESULTS[cache_key] = {"journeys": journeys, "result": result}
+    return result
+
+
+def _apply_model_config(
+    journeys: List[Dict[str, Any]],
+    config_json: Dict[str, Any],
+) -> List[Dict[str, Any]]:
     quality_cfg = config_json.get("quality") or {}
     tmp = filter_journeys_by_quality(
         journeys,
@@ -480,6 +531,7 @@ def persist_journeys_as_conversion_paths(
     now = datetime.utcnow()
     inserted = 0
     seen_conversion_ids = set()
+    path_rows: List[ConversionPath] = []
     fact_rows: List[ConversionScopeDiagnosticFact] = []
     dq_fact_rows: List[ConversionDataQualityFact] = []
     kpi_signal_rows: List[ConversionKpiSignalFact] = []
@@ -524,7 +576,7 @@ def persist_journeys_as_conversion_paths(
             source_snapshot_id=(str(source_snapshot_id).strip() or None) if source_snapshot_id is not None else None,
             imported_at=now,
         )
-        db.add(row)
+        path_rows.append(row)
         fact_rows.extend(
             build_scope_diagnostic_fact_rows(
                 journey=j,
@@ -637,28 +689,23 @@ def persist_journeys_as_conversion_paths(
         )
         inserted += 1
 
-    for fact_row in fact_rows:
-        db.add(fact_row)
-    for dq_fact_row in dq_fact_rows:
-        db.add(dq_fact_row)
-    for kpi_signal_row in kpi_signal_rows:
-        db.add(kpi_signal_row)
-    for taxonomy_touchpoint_row in taxonomy_touchpoint_rows:
-        db.add(taxonomy_touchpoint_row)
-    for silver_conversion_row in silver_conversion_rows:
-        db.add(silver_conversion_row)
-    for silver_touchpoint_row in silver_touchpoint_rows:
-        db.add(silver_touchpoint_row)
-    for touchpoint_visit_row in touchpoint_visit_rows:
-        db.add(touchpoint_visit_row)
-    for journey_instance_row in journey_instance_rows:
-        db.add(journey_instance_row)
-    for journey_role_row in journey_role_rows:
-        db.add(journey_role_row)
-    for journey_step_row in journey_step_rows:
-        db.add(journey_step_row)
-    for journey_transition_row in journey_transition_rows:
-        db.add(journey_transition_row)
+    # Plain multi-row INSERTs per table: the rows are write-only here, so the session does
+    # not need to track them or fetch their generated ids back.
+    for rows in (
+        path_rows,
+        fact_rows,
+        dq_fact_rows,
+        kpi_signal_rows,
+        taxonomy_touchpoint_rows,
+        silver_conversion_rows,
+        silver_touchpoint_rows,
+        touchpoint_visit_rows,
+        journey_instance_rows,
+        journey_role_rows,
+        journey_step_rows,
+        journey_transition_rows,
+    ):
+        db.bulk_save_objects(rows)
     db.commit()
     return inserted
 
@@ -672,7 +719,9 @@ def v2_to_legacy(j: Dict[str, Any]) -> Dict[str, Any]:
     primary = convs[0] if convs else {}
     tps = []
     for tp in j.get("touchpoints") or []:
-        lt = {"channel": tp.get("channel", "unknown")}
+        channel = tp.get("channel", "unknown")
+        # Channel names repeat across every journey; share one string object per name.
+        lt = {"channel": sys.intern(channel) if isinstance(channel, str) else channel}
         ts = tp.get("ts") or tp.get("timestamp")
         if ts:
             lt["timestamp"] = ts
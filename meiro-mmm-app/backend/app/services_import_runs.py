@@ -7,29 +7,48 @@ Every import creates a run with counts, validation summary, config snapshot.
 from __future__ import annotations
 
 import json
+import threading
 import uuid
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 IMPORT_RUNS_FILE = Path(__file__).resolve().parent / "data" / "import_runs.json"
 MAX_RUNS = 200
 
+# Parsed runs keyed by (path, mtime_ns, size) of the file they were read from.
+_LOAD_CACHE_LOCK = threading.Lock()
+_LOAD_CACHE: Dict[str, Any] = {"key": None, "runs": []}
+
 
 def _load() -> List[Dict[str, Any]]:
-    if not IMPORT_RUNS_FILE.exists():
+    try:
+        stat = IMPORT_RUNS_FILE.stat()
+    except OSError:
         return []
+    key: Tuple[Any, ...] = (str(IMPORT_RUNS_FILE), stat.st_mtime_ns, stat.st_size)
+    with _LOAD_CACHE_LOCK:
+        if _LOAD_CACHE["key"] == key:
+            return list(_LOAD_CACHE["runs"])
     try:
         raw = IMPORT_RUNS_FILE.read_text(encoding="utf-8")
         data = json.loads(raw)
-        return data if isinstance(data, list) else []
+        runs = data if isinstance(data, list) else []
     except Exception:
         return []
+    with _LOAD_CACHE_LOCK:
+        _LOAD_CACHE.update(key=key, runs=runs)
+    return list(runs)
 
 
 def _save(runs: List[Dict[str, Any]]) -> None:
     IMPORT_RUNS_FILE.parent.mkdir(parents=True, exist_ok=True)
-    IMPORT_RUNS_FILE.write_text(json.dumps(runs[:MAX_RUNS], indent=0, default=str), encoding="utf-8")
+    payload = json.dumps(runs[:MAX_RUNS], indent=0, default=str)
+    IMPORT_RUNS_FILE.write_text(payload, encoding="utf-8")
+    stat = IMPORT_RUNS_FILE.stat()
+    with _LOAD_CACHE_LOCK:
+        # Re-parse what was written so cached runs match a fresh read exactly (default=str).
+        _LOAD_CACHE.update(key=(str(IMPORT_RUNS_FILE), stat.st_mtime_ns, stat.st_size), runs=json.loads(payload))
 
 
 def create_run(
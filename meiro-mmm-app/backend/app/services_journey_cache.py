@@ -7,15 +7,22 @@ explicit invalidation API instead of exposing a mutable module-level list.
 from __future__ import annotations
 
 import threading
-from typing import Any, Callable, Dict, List
+import time
+from typing import Any, Callable, Dict, List, Tuple
 
 
 JourneyLoader = Callable[..., List[Dict[str, Any]]]
 
+# An empty load is a legitimate answer, but is only trusted briefly so journeys written
+# without going through invalidate_journey_cache() still show up.
+EMPTY_RESULT_TTL_SECONDS = 5.0
+
 _CACHE_LOCK = threading.RLock()
 _CACHE: Dict[str, Any] = {
     "journeys": [],
     "limit": 0,
+    "generation": 0,
+    "loaded_at": None,
 }
 
 
@@ -35,12 +42,16 @@ def load_cached_journeys(
     with _CACHE_LOCK:
         journeys = _CACHE.get("journeys") or []
         cached_limit = int(_CACHE.get("limit") or 0)
-        if journeys and cached_limit >= normalized_limit:
-            return list(journeys[:normalized_limit])
+        loaded_at = _CACHE.get("loaded_at")
+        if cached_limit >= normalized_limit and loaded_at is not None:
+            if journeys or time.monotonic() - loaded_at < EMPTY_RESULT_TTL_SECONDS:
+                return list(journeys[:normalized_limit])
 
         loaded = loader_fn(db, limit=normalized_limit)
         _CACHE["journeys"] = list(loaded or [])
         _CACHE["limit"] = normalized_limit
+        _CACHE["generation"] += 1
+        _CACHE["loaded_at"] = time.monotonic()
         return list(_CACHE["journeys"])
 
 
@@ -48,6 +59,27 @@ def invalidate_journey_cache() -> None:
     with _CACHE_LOCK:
         _CACHE["journeys"] = []
         _CACHE["limit"] = 0
+        _CACHE["generation"] += 1
+        _CACHE["loaded_at"] = None
+
+
+def get_journey_cache_generation() -> int:
+    """Counter bumped whenever the cached dataset is reloaded or invalidated.
+
+    Lets derived caches key on the journey dataset without hashing it.
+    """
+    with _CACHE_LOCK:
+        return int(_CACHE["generation"])
+
+
+def journey_dataset_key(journeys: List[Dict[str, Any]]) -> Tuple[int, int, int]:
+    """Cache key for a journey dataset: cache generation plus the identity of every journey.
+
+    load_cached_journeys hands out a fresh list per call, so derived caches key on the
+    journeys it holds rather than on the list object. A cache entry must keep a reference
+    to the journeys it was built from, or a later dataset could reuse their ids.
+    """
+    return (get_journey_cache_generation(), len(journeys), hash(tuple(map(id, journeys))))
 
 
 def get_journey_cache_status() -> Dict[str, Any]:
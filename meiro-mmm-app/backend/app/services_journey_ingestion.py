@@ -13,6 +13,7 @@ from __future__ import annotations
 import hashlib
 import json
 import re
+import sys
 import uuid
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional, Set, Tuple
@@ -2204,7 +2205,12 @@ def validate_and_normalize(raw_input: Any) -> Dict[str, Any]:
             valid_index += 1
             valid_journeys.append(norm)
             for tp in norm.get("touchpoints", []):
-                channels_detected.add(tp.get("channel", "unknown"))
+                channel = tp.get("channel", "unknown")
+                if isinstance(channel, str):
+                    channel = sys.intern(channel)
+                    if "channel" in tp:
+                        tp["channel"] = channel
+                channels_detected.add(channel)
         items_detail.append(detail)
 
     converted = sum(1 for j in valid_journeys if j.get("conversions"))
@@ -1,13 +1,29 @@
 from __future__ import annotations
 
+import threading
+from collections import Counter
 from datetime import datetime, timezone
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import pandas as pd
 
+from app.services_journey_cache import journey_dataset_key
 from app.services_metrics import journey_revenue_value
 
 
+_DATASET_AGGREGATES_CACHE_MAX = 8
+_DATASET_AGGREGATES_CACHE_LOCK = threading.Lock()
+_DATASET_AGGREGATES_CACHE: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+_TIMESTAMP_SPANS_CACHE_MAX = 8
+_TIMESTAMP_SPANS_CACHE_LOCK = threading.Lock()
+_TIMESTAMP_SPANS_CACHE: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+# The preview endpoint caps `limit` at 100, so only that many rows are ever materialized.
+PREVIEW_ROWS_MAX = 100
+_PREVIEW_ROWS_CACHE_MAX = 8
+_PREVIEW_ROWS_CACHE_LOCK = threading.Lock()
+_PREVIEW_ROWS_CACHE: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+
+
 def _parse_timestamp(value: Any) -> Optional[datetime]:
     if not value:
         return None
@@ -30,6 +46,51 @@ def _parse_timestamp(value: Any) -> Optional[datetime]:
     return parsed_pd.to_pydatetime()
 
 
+def _touchpoint_span(touchpoints: List[Dict[str, Any]]) -> Tuple[Optional[datetime], Optional[datetime]]:
+    first_ts = None
+    last_ts = None
+    for tp in touchpoints:
+        ts = tp.get("timestamp")
+        if not ts:
+            continue
+        dt = _parse_timestamp(ts)
+        if dt is None:
+            continue
+        if first_ts is None or dt < first_ts:
+            first_ts = dt
+        if last_ts is None or dt > last_ts:
+            last_ts = dt
+    return first_ts, last_ts
+
+
+def journey_timestamp_spans(
+    journeys: List[Dict[str, Any]],
+) -> List[Tuple[Optional[datetime], Optional[datetime]]]:
+    """First/last touchpoint timestamp of every journey, parsed once per journey dataset.
+
+    Shared by the summary and the preview so the second endpoint does not re-parse.
+    """
+    cache_key = journey_dataset_key(journeys)
+    with _TIMESTAMP_SPANS_CACHE_LOCK:
+        cached = _TIMESTAMP_SPANS_CACHE.get(cache_key)
+    if cached is not None:
+        return cached["result"]
+    spans = [_touchpoint_span(journey.get("touchpoints") or []) for journey in journeys]
+    with _TIMESTAMP_SPANS_CACHE_LOCK:
+        if len(_TIMESTAMP_SPANS_CACHE) >= _TIMESTAMP_SPANS_CACHE_MAX:
+            _TIMESTAMP_SPANS_CACHE.clear()
+        _TIMESTAMP_SPANS_CACHE[cache_key] = {"journeys": journeys, "result": spans}
+    return spans
+
+
+def _peek_journey_timestamp_spans(
+    journeys: List[Dict[str, Any]],
+) -> Optional[List[Tuple[Optional[datetime], Optional[datetime]]]]:
+    with _TIMESTAMP_SPANS_CACHE_LOCK:
+        cached = _TIMESTAMP_SPANS_CACHE.get(journey_dataset_key(journeys))
+    return cached["result"] if cached is not None else None
+
+
 def _journey_quality_score(journey: Dict[str, Any]) -> Optional[int]:
     score = journey.get("quality_score")
     if score is None:
@@ -40,33 +101,37 @@ def _journey_quality_score(journey: Dict[str, Any]) -> Optional[int]:
         return None
 
 
+_NO_TOUCHPOINTS_ERROR = "Journey has no touchpoints"
+_MISSING_CHANNEL_WARNING = "Touchpoint missing channel/source"
+_MISSING_TIMESTAMP_WARNING = "Touchpoint missing timestamp"
+
+
 def compute_journey_validation(journeys: List[Dict[str, Any]]) -> Dict[str, Any]:
-    seen_ids: Dict[str, int] = {}
-    error_list: List[str] = []
-    warn_list: List[str] = []
-    for journey in journeys or []:
-        customer_id = str(journey.get("customer_id") or "")
-        if customer_id:
-            seen_ids[customer_id] = seen_ids.get(customer_id, 0) + 1
+    journeys = journeys or []
+    id_counts = Counter(str(journey.get("customer_id") or "") for journey in journeys)
+    id_counts.pop("", None)
+    # Message -> occurrences, in first-seen order; keeps memory bounded by the number of distinct messages.
+    error_counts: Dict[str, int] = {}
+    warn_counts: Dict[str, int] = {}
+    for journey in journeys:
         touchpoints = journey.get("touchpoints") or []
         if not touchpoints:
-            error_list.append("Journey has no touchpoints")
+            error_counts[_NO_TOUCHPOINTS_ERROR] = error_counts.get(_NO_TOUCHPOINTS_ERROR, 0) + 1
+            continue
         for tp in touchpoints:
             if not tp.get("channel") and not tp.get("source"):
-                warn_list.append("Touchpoint missing channel/source")
+                warn_counts[_MISSING_CHANNEL_WARNING] = warn_counts.get(_MISSING_CHANNEL_WARNING, 0) + 1
             if not tp.get("timestamp"):
-                warn_list.append("Touchpoint missing timestamp")
-    dup_ids = [pid for pid, c in seen_ids.items() if c > 1]
-    if dup_ids:
-        warn_list.append(f"Duplicate customer_ids: {len(dup_ids)} ids")
-    top_errors = list(dict.fromkeys(error_list))[:5]
-    top_warnings = list(dict.fromkeys(warn_list))[:5]
+                warn_counts[_MISSING_TIMESTAMP_WARNING] = warn_counts.get(_MISSING_TIMESTAMP_WARNING, 0) + 1
+    dup_ids_count = sum(1 for count in id_counts.values() if count > 1)
+    if dup_ids_count:
+        warn_counts[f"Duplicate customer_ids: {dup_ids_count} ids"] = 1
     return {
-        "error_count": len(error_list),
-        "warn_count": len(warn_list),
-        "top_errors": top_errors,
-        "top_warnings": top_warnings,
-        "duplicate_ids_count": len(dup_ids),
+        "error_count": sum(error_counts.values()),
+        "warn_count": sum(warn_counts.values()),
+        "top_errors": list(error_counts)[:5],
+        "top_warnings": list(warn_counts)[:5],
+        "duplicate_ids_count": dup_ids_count,
     }
 
 
@@ -102,34 +167,46 @@ def derive_system_state(
     return "data_loaded"
 
 
-def build_journeys_summary(
-    *,
-    journeys: List[Dict[str, Any]],
-    kpi_config: Any,
-    get_import_runs_fn: Callable[..., List[Dict[str, Any]]],
-) -> Dict[str, Any]:
-    converted = [j for j in journeys if j.get("converted", True)]
+def converted_count_and_channels(journeys: List[Dict[str, Any]]) -> Tuple[int, List[str]]:
+    """Converted-journey count and sorted channel list in a single pass, for import run records."""
+    converted = 0
+    channels: set[str] = set()
+    for journey in journeys:
+        if journey.get("converted", True):
+            converted += 1
+        for tp in journey.get("touchpoints", []):
+            channels.add(tp.get("channel", "unknown"))
+    return converted, sorted(channels)
+
+
+def journey_dataset_aggregates(journeys: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Summary facts that depend only on the journey dataset, memoized per dataset.
+
+    Keyed on the journey cache generation plus the identity of every journey, so a
+    date-window subset gets its own entry and any reload recomputes. Callers must
+    not mutate the returned containers.
+    """
+    cache_key = journey_dataset_key(journeys)
+    with _DATASET_AGGREGATES_CACHE_LOCK:
+        cached = _DATASET_AGGREGATES_CACHE.get(cache_key)
+    if cached is not None:
+        return cached["result"]
+
+    converted_count = 0
     total_value = 0.0
     dedupe_seen_total: set[str] = set()
-    for journey in converted:
-        total_value += journey_revenue_value(journey, dedupe_seen=dedupe_seen_total)
+    for journey in journeys:
+        if journey.get("converted", True):
+            converted_count += 1
+            total_value += journey_revenue_value(journey, dedupe_seen=dedupe_seen_total)
 
     channels: set[str] = set()
-    first_ts = None
-    last_ts = None
     for journey in journeys:
         for tp in journey.get("touchpoints", []):
             channels.add(tp.get("channel", "unknown"))
-            ts = tp.get("timestamp")
-            if not ts:
-                continue
-            dt = _parse_timestamp(ts)
-            if dt is None:
-                continue
-            if first_ts is None or dt < first_ts:
-                first_ts = dt
-            if last_ts is None or dt > last_ts:
-                last_ts = dt
+    spans = journey_timestamp_spans(journeys)
+    first_ts = min((first for first, _ in spans if first is not None), default=None)
+    last_ts = max((last for _, last in spans if last is not None), default=None)
 
     kpi_counts: Dict[str, int] = {}
     quality_scores: List[int] = []
@@ -141,6 +218,41 @@ def build_journeys_summary(
         if q_score is not None:
             quality_scores.append(q_score)
 
+    aggregates = {
+        "converted_count": converted_count,
+        "total_value": total_value,
+        "channels": sorted(channels),
+        "first_ts": first_ts,
+        "last_ts": last_ts,
+        "kpi_counts": kpi_counts,
+        "quality": {
+            "scored_journeys": len(quality_scores),
+            "average_score": round(sum(quality_scores) / float(len(quality_scores) or 1), 1) if quality_scores else None,
+            "low_share": round(sum(1 for score in quality_scores if score < 50) / float(len(quality_scores) or 1), 4)
+            if quality_scores
+            else None,
+        },
+        "validation": compute_journey_validation(journeys),
+    }
+    with _DATASET_AGGREGATES_CACHE_LOCK:
+        if len(_DATASET_AGGREGATES_CACHE) >= _DATASET_AGGREGATES_CACHE_MAX:
+            _DATASET_AGGREGATES_CACHE.clear()
+        _DATASET_AGGREGATES_CACHE[cache_key] = {"journeys": journeys, "result": aggregates}
+    return aggregates
+
+
+def build_journeys_summary(
+    *,
+    journeys: List[Dict[str, Any]],
+    kpi_config: Any,
+    get_import_runs_fn: Callable[..., List[Dict[str, Any]]],
+) -> Dict[str, Any]:
+    aggregates = journey_dataset_aggregates(journeys)
+    converted_count = aggregates["converted_count"]
+    kpi_counts = aggregates["kpi_counts"]
+    first_ts = aggregates["first_ts"]
+    last_ts = aggregates["last_ts"]
+
     primary_kpi_id = kpi_config.primary_kpi_id
     primary_kpi_label = None
     if primary_kpi_id:
@@ -148,14 +260,14 @@ def build_journeys_summary(
             if definition.id == primary_kpi_id:
                 primary_kpi_label = definition.label
                 break
-    primary_count = kpi_counts.get(primary_kpi_id, len(converted) if primary_kpi_id else len(converted))
+    primary_count = kpi_counts.get(primary_kpi_id, converted_count)
 
-    runs = get_import_runs_fn(limit=50)
-    last_run = next((r for r in runs if r.get("status") == "success"), None)
+    runs = get_import_runs_fn(status="success", limit=1)
+    last_run = runs[0] if runs else None
     last_import_at = last_run.get("at") if last_run else None
     last_import_source = last_run.get("source") if last_run else None
     freshness_hours = compute_data_freshness_hours(last_ts)
-    validation = compute_journey_validation(journeys)
+    validation = dict(aggregates["validation"])
     system_state = derive_system_state(
         True,
         len(journeys),
@@ -168,14 +280,14 @@ def build_journeys_summary(
     return {
         "loaded": True,
         "count": len(journeys),
-        "converted": len(converted),
-        "non_converted": len(journeys) - len(converted),
-        "channels": sorted(channels),
-        "total_value": total_value,
+        "converted": converted_count,
+        "non_converted": len(journeys) - converted_count,
+        "channels": list(aggregates["channels"]),
+        "total_value": aggregates["total_value"],
         "primary_kpi_id": primary_kpi_id,
         "primary_kpi_label": primary_kpi_label,
         "primary_kpi_count": primary_count,
-        "kpi_counts": kpi_counts,
+        "kpi_counts": dict(kpi_counts),
         "date_min": first_ts.isoformat() if first_ts is not None else None,
         "date_max": last_ts.isoformat() if last_ts is not None else None,
         "last_import_at": last_import_at,
@@ -183,45 +295,66 @@ def build_journeys_summary(
         "data_freshness_hours": round(freshness_hours, 1) if freshness_hours is not None else None,
         "system_state": system_state,
         "validation": validation,
-        "quality": {
-            "scored_journeys": len(quality_scores),
-            "average_score": round(sum(quality_scores) / float(len(quality_scores) or 1), 1) if quality_scores else None,
-            "low_share": round(sum(1 for score in quality_scores if score < 50) / float(len(quality_scores) or 1), 4)
-            if quality_scores
-            else None,
-        },
+        "quality": dict(aggregates["quality"]),
+    }
+
+
+def _unique_channels(touchpoints: List[Dict[str, Any]]) -> List[str]:
+    seen: set[str] = set()
+    out: List[str] = []
+    for tp in touchpoints:
+        channel = tp.get("channel", "?")
+        if channel not in seen:
+            seen.add(channel)
+            out.append(channel)
+    return out
+
+
+def _preview_row(
+    idx: int,
+    journey: Dict[str, Any],
+    span: Optional[Tuple[Optional[datetime], Optional[datetime]]] = None,
+) -> Dict[str, Any]:
+    touchpoints = journey.get("touchpoints") or []
+    first_ts, last_ts = span if span is not None else _touchpoint_span(touchpoints)
+    return {
+        "validIndex": idx,
+        "customer_id": journey.get("customer_id") or journey.get("profile_id") or journey.get("id") or "—",
+        "touchpoints_count": len(touchpoints),
+        "first_ts": first_ts.isoformat() if first_ts is not None else None,
+        "last_ts": last_ts.isoformat() if last_ts is not None else None,
+        "converted": journey.get("converted", True),
+        "conversion_value": journey.get("conversion_value"),
+        "revenue_value": journey_revenue_value(journey),
+        "channels_list": _unique_channels(touchpoints),
     }
 
 
+def _journeys_preview_rows(journeys: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Preview rows for the head of the dataset, built once per journey dataset."""
+    head = journeys[:PREVIEW_ROWS_MAX]
+    cache_key = journey_dataset_key(head)
+    with _PREVIEW_ROWS_CACHE_LOCK:
+        cached = _PREVIEW_ROWS_CACHE.get(cache_key)
+    if cached is not None:
+        return cached["result"]
+
+    spans = _peek_journey_timestamp_spans(journeys)
+    rows = [
+        _preview_row(idx, journey, spans[idx] if spans is not None else None)
+        for idx, journey in enumerate(head)
+    ]
+    with _PREVIEW_ROWS_CACHE_LOCK:
+        if len(_PREVIEW_ROWS_CACHE) >= _PREVIEW_ROWS_CACHE_MAX:
+            _PREVIEW_ROWS_CACHE.clear()
+        _PREVIEW_ROWS_CACHE[cache_key] = {"journeys": head, "result": rows}
+    return rows
+
+
 def build_journeys_preview(*, journeys: List[Dict[str, Any]], limit: int) -> Dict[str, Any]:
-    rows = []
-    for idx, journey in enumerate(journeys[:limit]):
-        touchpoints = journey.get("touchpoints") or []
-        first_ts = None
-        last_ts = None
-        for tp in touchpoints:
-            ts = tp.get("timestamp")
-            if ts:
-                dt = _parse_timestamp(ts)
-                if dt is not None:
-                    if first_ts is None or dt < first_ts:
-                        first_ts = dt
-                    if last_ts is None or dt > last_ts:
-                        last_ts = dt
-        channels = list(dict.fromkeys(tp.get("channel", "?") for tp in touchpoints))
-        rows.append(
-            {
-                "validIndex": idx,
-                "customer_id": journey.get("customer_id") or journey.get("profile_id") or journey.get("id") or "—",
-                "touchpoints_count": len(touchpoints),
-                "first_ts": first_ts.isoformat() if first_ts is not None else None,
-                "last_ts": last_ts.isoformat() if last_ts is not None else None,
-                "converted": journey.get("converted", True),
-                "conversion_value": journey.get("conversion_value"),
-                "revenue_value": journey_revenue_value(journey),
-                "channels_list": channels,
-            }
-        )
+    rows = [{**row, "channels_list": list(row["channels_list"])} for row in _journeys_preview_rows(journeys)[:limit]]
+    for idx, journey in enumerate(journeys[PREVIEW_ROWS_MAX:limit], start=PREVIEW_ROWS_MAX):
+        rows.append(_preview_row(idx, journey))
     return {
         "rows": rows,
         "columns": [
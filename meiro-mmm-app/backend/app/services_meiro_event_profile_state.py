@@ -12,6 +12,10 @@ from sqlalchemy.orm import Session
 from app.models_config_dq import MeiroEventProfileState
 
 
+class MeiroEventProfileStateUnavailableError(RuntimeError):
+    pass
+
+
 def _stable_item_key(item: Dict[str, Any], *, keys: Iterable[str]) -> str:
     for key in keys:
         value = item.get(key)
@@ -7,12 +7,31 @@ from pathlib import Path
 from typing import Any, Callable, Dict, Optional
 import uuid
 
+import orjson
 import pandas as pd
 from fastapi import HTTPException
 
 from app.services_meiro_replay_snapshots import get_meiro_replay_snapshot
 
 
+def _record_customer_id(record: Dict[str, Any]) -> str:
+    customer = record.get("customer") if isinstance(record.get("customer"), dict) else {}
+    return str(record.get("customer_id") or customer.get("id") or "").strip()
+
+
+def read_cdp_profiles_file(path: Path) -> Any:
+    """Parse a stored CDP profiles JSON file, using orjson for the common case.
+
+    Files written with the stdlib json module may contain NaN/Infinity, which orjson
+    rejects; those fall back to json.loads.
+    """
+    raw = path.read_bytes()
+    try:
+        return orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        return json.loads(raw)
+
+
 def import_journeys_from_cdp_source(
     *,
     req: Any,
@@ -80,8 +99,7 @@ def import_journeys_from_cdp_source(
         profiles = replay_snapshot.get("profiles_json") or []
         source_label = "meiro_events_replay" if str(replay_snapshot.get("source_kind") or "") == "events" else source_label
     elif cdp_json_path.exists():
-        with open(cdp_json_path) as fh:
-            profiles = json.load(fh)
+        profiles = read_cdp_profiles_file(cdp_json_path)
     elif cdp_path.exists():
         df = pd.read_csv(cdp_path)
         profiles = df.to_dict(orient="records")
@@ -119,22 +137,13 @@ def import_journeys_from_cdp_source(
     cleaning_report = ((result.get("import_summary") or {}).get("cleaning_report") or {})
     import_batch_id = str(uuid.uuid4())
     source_snapshot_id = replay_snapshot.get("snapshot_id") if replay_snapshot else None
-    attributable_profile_ids = {
-        str(
-            profile.get("customer_id")
-            or ((profile.get("customer") or {}) if isinstance(profile.get("customer"), dict) else {}).get("id")
-            or ""
-        ).strip()
-        for profile in profiles
-        if isinstance(profile, dict)
-        and bool(profile.get("touchpoints"))
-        and bool(profile.get("conversions"))
-        and str(
-            profile.get("customer_id")
-            or ((profile.get("customer") or {}) if isinstance(profile.get("customer"), dict) else {}).get("id")
-            or ""
-        ).strip()
-    }
+    attributable_profile_ids = set()
+    for profile in profiles:
+        if not isinstance(profile, dict) or not profile.get("touchpoints") or not profile.get("conversions"):
+            continue
+        profile_id = _record_customer_id(profile)
+        if profile_id:
+            attributable_profile_ids.add(profile_id)
     replace_profile_ids = []
     if replay_snapshot:
         snapshot_context = replay_snapshot.get("context_json") or {}
@@ -162,33 +171,21 @@ def import_journeys_from_cdp_source(
         source_snapshot_id=source_snapshot_id,
     )
     refresh_journey_aggregates_fn(db)
-    converted = sum(
-        1
-        for journey in journeys
-        if bool(journey.get("conversions")) or bool(journey.get("converted", False))
-    )
-    persisted_profile_ids = {
-        str(
-            journey.get("customer_id")
-            or ((journey.get("customer") or {}) if isinstance(journey.get("customer"), dict) else {}).get("id")
-            or ""
-        ).strip()
-        for journey in journeys
-        if isinstance(journey, dict)
-        and str(
-            journey.get("customer_id")
-            or ((journey.get("customer") or {}) if isinstance(journey.get("customer"), dict) else {}).get("id")
-            or ""
-        ).strip()
-    }
+    # One pass over the persisted journeys for the run summary counters.
+    converted = 0
+    persisted_profile_ids = set()
+    channel_set = set()
+    for journey in journeys:
+        if bool(journey.get("conversions")) or bool(journey.get("converted", False)):
+            converted += 1
+        if isinstance(journey, dict):
+            profile_id = _record_customer_id(journey)
+            if profile_id:
+                persisted_profile_ids.add(profile_id)
+        for touchpoint in journey.get("touchpoints", []):
+            channel_set.add(touchpoint.get("channel", "unknown"))
     persisted_attributable_profile_count = len(persisted_profile_ids & attributable_profile_ids)
-    channels_detected = sorted(
-        {
-            touchpoint.get("channel", "unknown")
-            for journey in journeys
-            for touchpoint in journey.get("touchpoints", [])
-        }
-    )
+    channels_detected = sorted(channel_set)
     summary = result.get("import_summary") or {}
     pull_cfg = get_pull_config_fn()
     validation_summary = {
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import copy
 import json
+import threading
 import uuid
 from datetime import datetime
 from typing import Any, Dict, Optional, Tuple
@@ -254,19 +255,33 @@ from pathlib import Path  # noqa: E402
 _DATA_DIR = Path(__file__).resolve().parent / "data"
 _DATA_DIR.mkdir(parents=True, exist_ok=True)
 _DEFAULT_CFG_PATH = _DATA_DIR / "model_config_settings.json"
+# Default config id keyed by (path, mtime_ns, size) of _DEFAULT_CFG_PATH.
+_DEFAULT_CFG_CACHE_LOCK = threading.Lock()
+_DEFAULT_CFG_CACHE: Dict[str, Any] = {"key": None, "config_id": None}
 
 
 def _set_default_config_id(cfg_id: str) -> None:
     payload = {"default_config_id": cfg_id, "updated_at": _now().isoformat()}
-    _DEFAULT_CFG_PATH.write_text(json.dumps(payload, indent=2))
+    with _DEFAULT_CFG_CACHE_LOCK:
+        _DEFAULT_CFG_CACHE.update(key=None, config_id=None)
+        _DEFAULT_CFG_PATH.write_text(json.dumps(payload, indent=2))
 
 
 def get_default_config_id() -> Optional[str]:
-    if not _DEFAULT_CFG_PATH.exists():
+    try:
+        stat = _DEFAULT_CFG_PATH.stat()
+    except OSError:
         return None
+    key = (str(_DEFAULT_CFG_PATH), stat.st_mtime_ns, stat.st_size)
+    with _DEFAULT_CFG_CACHE_LOCK:
+        if _DEFAULT_CFG_CACHE["key"] == key:
+            return _DEFAULT_CFG_CACHE["config_id"]
     try:
         data = json.loads(_DEFAULT_CFG_PATH.read_text())
-        return data.get("default_config_id")
+        config_id = data.get("default_config_id")
     except Exception:
         return None
+    with _DEFAULT_CFG_CACHE_LOCK:
+        _DEFAULT_CFG_CACHE.update(key=key, config_id=config_id)
+    return config_id
 
@@ -1,95 +1,262 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Tuple
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+import numpy as np
 
 from app.attribution_engine import compute_next_best_action, has_any_campaign
 from app.modules.settings.schemas import NBASettings
+from app.services_journey_cache import journey_dataset_key
 from app.services_nba_policy_sync import apply_promoted_policy_overrides
 from app.services_settings_decisions import build_nba_preview_decision
 
 
+_NBA_RAW_CACHE_MAX = 8
+_NBA_RAW_CACHE_LOCK = threading.Lock()
+_NBA_RAW_CACHE: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+
+
+def _nba_raw_cache_key(journeys: List[Dict[str, Any]], level: str) -> Tuple[Any, ...]:
+    return (level, journey_dataset_key(journeys))
+
+
+def peek_next_best_action_cache(
+    journeys: List[Dict[str, Any]],
+    level: str = "channel",
+) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+    """Return the memoized full NBA result if one exists, without computing it."""
+    cache_key = _nba_raw_cache_key(journeys, level)
+    with _NBA_RAW_CACHE_LOCK:
+        cached = _NBA_RAW_CACHE.get(cache_key)
+    return cached["result"] if cached is not None else None
+
+
+def compute_next_best_action_cached(
+    journeys: List[Dict[str, Any]],
+    level: str = "channel",
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Memoized compute_next_best_action for repeated preview/test calls.
+
+    Keyed on the journey cache generation plus the identity of every journey, so
+    threshold tuning reuses the prefix aggregation while any reload or filtered
+    subset recomputes. The returned mapping is shared; callers must not mutate it.
+    """
+    cache_key = _nba_raw_cache_key(journeys, level)
+    with _NBA_RAW_CACHE_LOCK:
+        cached = _NBA_RAW_CACHE.get(cache_key)
+    if cached is not None:
+        return cached["result"]
+    nba_raw = compute_next_best_action(journeys, level=level)
+    with _NBA_RAW_CACHE_LOCK:
+        if len(_NBA_RAW_CACHE) >= _NBA_RAW_CACHE_MAX:
+            _NBA_RAW_CACHE.clear()
+        _NBA_RAW_CACHE[cache_key] = {"journeys": journeys, "result": nba_raw}
+    return nba_raw
+
+
+@dataclass(frozen=True)
+class _NBAThresholds:
+    min_prefix_support: int
+    min_conversion_rate: float
+    max_prefix_depth: int
+    min_next_support: int
+    max_suggestions: int
+    min_uplift_pct: Optional[float]
+    excluded_channels: FrozenSet[str]
+
+    @property
+    def check_uplift(self) -> bool:
+        return self.min_uplift_pct is not None and self.min_uplift_pct > 0
+
+
+@lru_cache(maxsize=16)
+def _nba_thresholds(
+    min_prefix_support: int,
+    min_conversion_rate: float,
+    max_prefix_depth: int,
+    min_next_support: int,
+    max_suggestions_per_prefix: int,
+    min_uplift_pct: Optional[float],
+    excluded_channels: Tuple[str, ...],
+) -> _NBAThresholds:
+    return _NBAThresholds(
+        min_prefix_support=max(1, min_prefix_support),
+        min_conversion_rate=max(0.0, min_conversion_rate),
+        max_prefix_depth=max(0, max_prefix_depth),
+        min_next_support=max(1, min_next_support or min_prefix_support),
+        max_suggestions=max(1, max_suggestions_per_prefix),
+        min_uplift_pct=min_uplift_pct,
+        excluded_channels=frozenset(ch.strip().lower() for ch in excluded_channels if ch),
+    )
+
+
+def _thresholds_for(settings: NBASettings) -> _NBAThresholds:
+    return _nba_thresholds(
+        settings.min_prefix_support,
+        settings.min_conversion_rate,
+        settings.max_prefix_depth,
+        settings.min_next_support,
+        settings.max_suggestions_per_prefix,
+        settings.min_uplift_pct,
+        tuple(settings.excluded_channels or ()),
+    )
+
+
+def _filter_stats(
+    *,
+    total_before: int = 0,
+    total_after: int = 0,
+    filtered_support: int = 0,
+    filtered_conversion: int = 0,
+    filtered_uplift: int = 0,
+    filtered_excluded: int = 0,
+    filtered_depth: int = 0,
+    trimmed_cap: int = 0,
+    prefixes_considered: int = 0,
+    prefixes_retained: int = 0,
+) -> Dict[str, Any]:
+    return {
+        "total_before": total_before,
+        "total_after": total_after,
+        "filtered_support": filtered_support,
+        "filtered_conversion": filtered_conversion,
+        "filtered_uplift": filtered_uplift,
+        "filtered_excluded": filtered_excluded,
+        "filtered_depth": filtered_depth,
+        "trimmed_cap": trimmed_cap,
+        "prefixes_considered": prefixes_considered,
+        "prefixes_retained": prefixes_retained,
+    }
+
+
 def filter_nba_recommendations(
     nba_raw: Dict[str, List[Dict[str, Any]]],
     settings: NBASettings,
 ) -> Tuple[Dict[str, List[Dict[str, Any]]], Dict[str, Any]]:
     """Apply NBA settings thresholds to raw recommendations and collect stats."""
 
-    stats: Dict[str, Any] = {
-        "total_before": 0,
-        "total_after": 0,
-        "filtered_support": 0,
-        "filtered_conversion": 0,
-        "filtered_uplift": 0,
-        "filtered_excluded": 0,
-        "filtered_depth": 0,
-        "trimmed_cap": 0,
-        "prefixes_considered": 0,
-        "prefixes_retained": 0,
-    }
+    # Counters are plain locals and packed into the stats dict on return.
+    total_before = total_after = trimmed_cap = prefixes_retained = filtered_depth = 0
+    prefixes_considered = len(nba_raw)
 
-    min_prefix_support = max(1, settings.min_prefix_support)
-    min_conversion_rate = max(0.0, settings.min_conversion_rate)
-    max_prefix_depth = max(0, settings.max_prefix_depth)
-    min_next_support = max(1, settings.min_next_support or settings.min_prefix_support)
-    max_suggestions = max(1, settings.max_suggestions_per_prefix)
-    min_uplift_pct = settings.min_uplift_pct
-    excluded_channels = {
-        ch.strip().lower() for ch in (settings.excluded_channels or []) if ch
-    }
+    thresholds = _thresholds_for(settings)
+    min_prefix_support = thresholds.min_prefix_support
+    min_conversion_rate = thresholds.min_conversion_rate
+    max_prefix_depth = thresholds.max_prefix_depth
+    min_next_support = thresholds.min_next_support
+    max_suggestions = thresholds.max_suggestions
+    min_uplift_pct = thresholds.min_uplift_pct
+    excluded_channels = thresholds.excluded_channels
     promoted_overrides = apply_promoted_policy_overrides(
         nba_raw,
         list(getattr(settings, "promoted_journey_policies", []) or []),
     )
+    check_excluded = bool(excluded_channels)
+    check_uplift_setting = thresholds.check_uplift
 
     filtered: Dict[str, List[Dict[str, Any]]] = {}
 
+    # Pass 1: flatten the recs of every prefix within the depth cap into parallel
+    # arrays; prefix support/baseline and the per-rec thresholds all reuse them.
+    eligible: List[Tuple[str, List[Dict[str, Any]], int, int]] = []
+    flat_recs: List[Dict[str, Any]] = []
+    promoted: List[Dict[str, Any] | None] = []
     for prefix, recs in nba_raw.items():
-        stats["prefixes_considered"] += 1
-        stats["total_before"] += len(recs)
+        total_before += len(recs)
 
-        depth = len([step for step in prefix.split(" > ") if step])
+        # Separator count is an upper bound on depth; only split (to drop empty
+        # segments) when that bound exceeds the cap.
+        depth = prefix.count(" > ") + 1 if prefix else 0
+        if depth > max_prefix_depth:
+            depth = len([step for step in prefix.split(" > ") if step])
         if depth > max_prefix_depth:
-            stats["filtered_depth"] += len(recs)
+            filtered_depth += len(recs)
             continue
-
-        prefix_support = sum(int(r.get("count", 0)) for r in recs)
-        if prefix_support < min_prefix_support:
-            stats["filtered_support"] += len(recs)
+        if not recs:
+            # Zero support: nothing to retain and nothing to count as filtered.
             continue
 
-        total_conversions = sum(int(r.get("conversions", 0)) for r in recs)
-        baseline_rate = (
-            total_conversions / prefix_support if prefix_support > 0 else 0.0
+        start = len(flat_recs)
+        flat_recs.extend(recs)
+        if promoted_overrides:
+            promoted.extend(
+                [
+                    promoted_overrides.get(f"{prefix}::{str(r.get('step') or r.get('channel') or '').strip().lower()}")
+                    for r in recs
+                ]
+            )
+        eligible.append((prefix, recs, start, len(flat_recs)))
+
+    if not eligible:
+        return filtered, _filter_stats(
+            total_before=total_before,
+            filtered_depth=filtered_depth,
+            prefixes_considered=prefixes_considered,
         )
+    if not promoted_overrides:
+        promoted = [None] * len(flat_recs)
 
+    n_recs = len(flat_recs)
+    count_arr = np.array([int(r.get("count", 0)) for r in flat_recs], dtype=np.int64)
+    rate_arr = np.array([float(r.get("conversion_rate", 0.0)) for r in flat_recs], dtype=np.float64)
+    starts = np.fromiter((start for _, _, start, _ in eligible), dtype=np.int64, count=len(eligible))
+    lengths = np.diff(np.append(starts, n_recs))
+
+    # Prefix-level support and baseline conversion rate, one segmented reduction each.
+    prefix_support = np.add.reduceat(count_arr, starts)
+    prefix_conversions = np.add.reduceat(
+        np.array([int(r.get("conversions", 0)) for r in flat_recs], dtype=np.int64), starts
+    )
+    prefix_ok = prefix_support >= min_prefix_support
+    with np.errstate(divide="ignore", invalid="ignore"):
+        prefix_baseline = np.where(prefix_support > 0, prefix_conversions / prefix_support, 0.0)
+    rec_prefix_ok = np.repeat(prefix_ok, lengths)
+    baseline_arr = np.repeat(prefix_baseline, lengths)
+    filtered_support = int((~rec_prefix_ok).sum())
+
+    # Pass 2: threshold masks over every rec of a supported prefix. Each rec is
+    # attributed to the first threshold it fails, in the order support, conversion,
+    # excluded, uplift.
+    is_promoted = np.array([bool(p) for p in promoted], dtype=bool)
+
+    m_support = count_arr >= min_next_support
+    m_conv = rate_arr >= min_conversion_rate
+    if check_excluded:
+        # Lowercase each distinct channel value once rather than once per rec.
+        raw_channels = [r.get("channel", "") for r in flat_recs]
+        excluded_raw = {ch for ch in set(raw_channels) if str(ch).lower() in excluded_channels}
+        m_excl = np.array([ch not in excluded_raw for ch in raw_channels], dtype=bool)
+    else:
+        m_excl = np.ones(n_recs, dtype=bool)
+    if check_uplift_setting:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            uplift_arr = (rate_arr - baseline_arr) / baseline_arr
+        m_uplift = ~((baseline_arr > 0) & (uplift_arr < min_uplift_pct))
+    else:
+        m_uplift = np.ones(n_recs, dtype=bool)
+
+    open_ = rec_prefix_ok & ~is_promoted
+    filtered_support += int((open_ & ~m_support).sum())
+    open_ &= m_support
+    filtered_conversion = int((open_ & ~m_conv).sum())
+    open_ &= m_conv
+    filtered_excluded = int((open_ & ~m_excl).sum())
+    open_ &= m_excl
+    filtered_uplift = int((open_ & ~m_uplift).sum())
+    keep = (rec_prefix_ok & is_promoted) | (open_ & m_uplift)
+
+    # Pass 3: materialize survivors per prefix.
+    keep_flags = keep.tolist()
+    for (prefix, recs, start, end), supported in zip(eligible, prefix_ok.tolist()):
+        if not supported:
+            continue
         kept: List[Dict[str, Any]] = []
-        for rec in recs:
-            count = int(rec.get("count", 0))
-            conv_rate = float(rec.get("conversion_rate", 0.0))
-            channel = str(rec.get("channel", "")).lower()
-            step_key = str(rec.get("step") or rec.get("channel") or "").strip().lower()
-            promoted_policy = promoted_overrides.get(f"{prefix}::{step_key}")
-
-            if count < min_next_support and not promoted_policy:
-                stats["filtered_support"] += 1
-                continue
-            if conv_rate < min_conversion_rate and not promoted_policy:
-                stats["filtered_conversion"] += 1
-                continue
-            if excluded_channels and channel in excluded_channels and not promoted_policy:
-                stats["filtered_excluded"] += 1
+        for rec, kept_flag, promoted_policy in zip(recs, keep_flags[start:end], promoted[start:end]):
+            if not kept_flag:
                 continue
-            if (
-                min_uplift_pct is not None
-                and min_uplift_pct > 0
-                and baseline_rate > 0
-                and not promoted_policy
-            ):
-                uplift = (conv_rate - baseline_rate) / baseline_rate
-                if uplift < min_uplift_pct:
-                    stats["filtered_uplift"] += 1
-                    continue
-
             kept.append(
                 {
                     **rec,
@@ -109,13 +276,24 @@ def filter_nba_recommendations(
                 )
             )
             if len(kept) > max_suggestions:
-                stats["trimmed_cap"] += len(kept) - max_suggestions
+                trimmed_cap += len(kept) - max_suggestions
                 kept = kept[:max_suggestions]
             filtered[prefix] = kept
-            stats["prefixes_retained"] += 1
-            stats["total_after"] += len(kept)
+            prefixes_retained += 1
+            total_after += len(kept)
 
-    return filtered, stats
+    return filtered, _filter_stats(
+        total_before=total_before,
+        total_after=total_after,
+        filtered_support=filtered_support,
+        filtered_conversion=filtered_conversion,
+        filtered_uplift=filtered_uplift,
+        filtered_excluded=filtered_excluded,
+        filtered_depth=filtered_depth,
+        trimmed_cap=trimmed_cap,
+        prefixes_considered=prefixes_considered,
+        prefixes_retained=prefixes_retained,
+    )
 
 
 def build_nba_preview_summary(
@@ -158,7 +336,7 @@ def build_nba_preview_summary(
         else None
     )
 
-    nba_raw = compute_next_best_action(journeys, level=use_level)
+    nba_raw = compute_next_best_action_cached(journeys, level=use_level)
     _, stats = filter_nba_recommendations(nba_raw, settings)
 
     total_before = stats.get("total_before", 0) or 0
@@ -20,25 +20,34 @@ import logging
 import pandas as pd
 from .services_metrics import journey_revenue_value
 
-# Optional ML stack. The app can run in "minimal" mode without clustering.
-try:
-    import numpy as np  # type: ignore
-    from sklearn.cluster import MiniBatchKMeans  # type: ignore
-    from sklearn.feature_extraction import DictVectorizer  # type: ignore
-    from sklearn.feature_extraction.text import TfidfTransformer  # type: ignore
-    from sklearn.metrics import adjusted_rand_score, silhouette_score  # type: ignore
-    from sklearn.preprocessing import normalize  # type: ignore
-
-    _HAS_ML = True
-except Exception:  # pragma: no cover
-    np = None  # type: ignore
-    MiniBatchKMeans = None  # type: ignore
-    DictVectorizer = None  # type: ignore
-    TfidfTransformer = None  # type: ignore
-    silhouette_score = None  # type: ignore
-    adjusted_rand_score = None  # type: ignore
-    normalize = None  # type: ignore
-    _HAS_ML = False
+import numpy as np
+
+# Optional ML stack, imported on first clustering call because scikit-learn
+# dominates app import time. The app can run in "minimal" mode without clustering.
+MiniBatchKMeans = None  # type: ignore
+DictVectorizer = None  # type: ignore
+TfidfTransformer = None  # type: ignore
+silhouette_score = None  # type: ignore
+adjusted_rand_score = None  # type: ignore
+normalize = None  # type: ignore
+_HAS_ML: Optional[bool] = None
+
+
+def _ensure_ml() -> bool:
+    global _HAS_ML, MiniBatchKMeans, DictVectorizer, TfidfTransformer, silhouette_score, adjusted_rand_score, normalize
+    if _HAS_ML is not None:
+        return _HAS_ML
+    try:
+        from sklearn.cluster import MiniBatchKMeans  # type: ignore
+        from sklearn.feature_extraction import DictVectorizer  # type: ignore
+        from sklearn.feature_extraction.text import TfidfTransformer  # type: ignore
+        from sklearn.metrics import adjusted_rand_score, silhouette_score  # type: ignore
+        from sklearn.preprocessing import normalize  # type: ignore
+
+        _HAS_ML = True
+    except Exception:  # pragma: no cover
+        _HAS_ML = False
+    return _HAS_ML
 
 
 logger = logging.getLogger(__name__)
@@ -372,7 +381,7 @@ def compute_path_archetypes(
         }
 
     # If the ML stack is unavailable, fall back to "top distinct paths" archetypes.
-    if not _HAS_ML:
+    if not _ensure_ml():
         return _distinct_paths_fallback("ml_unavailable")
 
     try:
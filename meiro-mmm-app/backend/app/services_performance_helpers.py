@@ -1,10 +1,15 @@
 from __future__ import annotations
 
+import threading
 from dataclasses import dataclass
 from datetime import date, datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
+import numpy as np
+import pandas as pd
+
+from app.services_journey_cache import journey_dataset_key
 from app.services_metrics import journey_revenue_value
 from app.services_performance_trends import resolve_period_windows
 
@@ -27,20 +32,114 @@ class PerformanceQueryContext:
     previous_period: Optional[Dict[str, Any]] = None
 
 
-def compute_campaign_trends(journeys: List[Dict[str, Any]]) -> Dict[str, Any]:
+def compute_campaign_uplift(journeys: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
     """
-    Build time series per campaign step (channel:campaign or channel):
-      - transactions: number of converted journeys attributed to that campaign (last touch)
-      - revenue: sum of configured revenue for those journeys
+    For each campaign step (channel:campaign or channel), estimate uplift by comparing
+    journeys that include the campaign vs. journeys that do not.
+
+    Uplift is purely observational here (not a causal experiment):
+      - treatment group: journeys that touched the campaign at least once
+      - holdout group: journeys that never touched the campaign
     """
     if not journeys:
-        return {"campaigns": [], "dates": [], "series": {}}
+        return {}
+
+    converted = np.fromiter((bool(j.get("converted", True)) for j in journeys), dtype=bool, count=len(journeys))
+    total_n = len(journeys)
+    total_conv = int(converted.sum())
+
+    jids: List[int] = []
+    step_codes: List[int] = []
+    # Step key -> code in first-appearance order. A plain dict rather than pd.factorize, which
+    # would code a None step (touchpoint with "channel": None) as -1 and decode it below to the
+    # wrong (journey, step) pair.
+    step_index: Dict[Any, int] = {}
+    for jid, j in enumerate(journeys):
+        for tp in j.get("touchpoints") or ():
+            campaign = tp.get("campaign")
+            channel = tp.get("channel", "unknown")
+            step = f"{channel}:{campaign}" if campaign else channel
+            code = step_index.get(step)
+            if code is None:
+                code = step_index[step] = len(step_index)
+            jids.append(jid)
+            step_codes.append(code)
+    if not step_codes:
+        return {}
+    steps = list(step_index)
+    codes = np.asarray(step_codes, dtype=np.int64)
+    n_steps = len(steps)
+    # One entry per (journey, step): a journey counts once towards each step it touched.
+    # Deduping here in one vectorized pass is cheaper than building a set per journey.
+    pair_keys = pd.unique(np.asarray(jids, dtype=np.int64) * n_steps + codes)
+    pair_codes = pair_keys % n_steps
+    pair_conv = converted[pair_keys // n_steps]
+
+    # Group-by over step codes (codes follow first-appearance order).
+    treat_n = np.bincount(pair_codes, minlength=n_steps)
+    treat_conv = np.bincount(pair_codes, weights=pair_conv, minlength=n_steps).astype(np.int64)
+    control_n = total_n - treat_n
+    control_conv = total_conv - treat_conv
+    with np.errstate(divide="ignore", invalid="ignore"):
+        treat_rate = np.where(treat_n > 0, treat_conv / treat_n, 0.0)
+        control_rate = np.where(control_n > 0, control_conv / control_n, 0.0)
+        abs_uplift = treat_rate - control_rate
+        rel_uplift = np.where(control_rate > 0, abs_uplift / control_rate, np.nan)
+
+    uplift: Dict[str, Dict[str, Any]] = {}
+    for step, t_n, t_conv, t_rate, c_n, c_conv, c_rate, a_up, r_up in zip(
+        steps,
+        treat_n.tolist(),
+        treat_conv.tolist(),
+        treat_rate.tolist(),
+        control_n.tolist(),
+        control_conv.tolist(),
+        control_rate.tolist(),
+        abs_uplift.tolist(),
+        rel_uplift.tolist(),
+    ):
+        uplift[step] = {
+            "treatment_n": t_n,
+            "treatment_conversions": t_conv,
+            "treatment_rate": t_rate,
+            "holdout_n": c_n,
+            "holdout_conversions": c_conv,
+            "holdout_rate": c_rate,
+            "uplift_abs": a_up,
+            "uplift_rel": None if r_up != r_up else r_up,
+        }
+    return uplift
+
+
+_LAST_TOUCH_CACHE_MAX = 8
+_LAST_TOUCH_CACHE_LOCK = threading.Lock()
+_LAST_TOUCH_CACHE: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+
+
+def _last_touch_date_key(ts: Any) -> str:
+    if isinstance(ts, str) and len(ts) >= 10 and ts[4] == "-" and ts[7] == "-" and (len(ts) == 10 or ts[10] in "T "):
+        # ISO date prefix: the calendar date is the first 10 characters.
+        return ts[:10]
+    try:
+        return datetime.fromisoformat(ts).date().isoformat()
+    except Exception:
+        return str(ts)
 
-    series: Dict[str, Dict[str, Dict[str, float]]] = {}
-    all_dates: set[str] = set()
-    dedupe_seen: set[str] = set()
 
-    for journey in journeys:
+def _converted_last_touches(journeys: List[Dict[str, Any]]) -> List[Tuple[int, str, str]]:
+    """(journey index, last-touch step, conversion date key) of converted journeys, per dataset.
+
+    Kept beside the journeys rather than on them, so a copied or edited journey is never
+    read with a stale last touch. Callers must not mutate the returned list.
+    """
+    cache_key = journey_dataset_key(journeys)
+    with _LAST_TOUCH_CACHE_LOCK:
+        cached = _LAST_TOUCH_CACHE.get(cache_key)
+    if cached is not None:
+        return cached["result"]
+
+    touches: List[Tuple[int, str, str]] = []
+    for idx, journey in enumerate(journeys):
         if not journey.get("converted", True):
             continue
         touchpoints = journey.get("touchpoints", [])
@@ -50,32 +149,57 @@ def compute_campaign_trends(journeys: List[Dict[str, Any]]) -> Dict[str, Any]:
         ts = last_tp.get("timestamp")
         if not ts:
             continue
-        try:
-            dt = datetime.fromisoformat(ts)
-            date_key = dt.date().isoformat()
-        except Exception:
-            date_key = str(ts)
-
         channel = last_tp.get("channel", "unknown")
         campaign = last_tp.get("campaign")
-        step = f"{channel}:{campaign}" if campaign else channel
+        touches.append((idx, f"{channel}:{campaign}" if campaign else channel, _last_touch_date_key(ts)))
+    with _LAST_TOUCH_CACHE_LOCK:
+        if len(_LAST_TOUCH_CACHE) >= _LAST_TOUCH_CACHE_MAX:
+            _LAST_TOUCH_CACHE.clear()
+        _LAST_TOUCH_CACHE[cache_key] = {"journeys": journeys, "result": touches}
+    return touches
+
+
+def compute_campaign_trends(journeys: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Build time series per campaign step (channel:campaign or channel):
+      - transactions: number of converted journeys attributed to that campaign (last touch)
+      - revenue: sum of configured revenue for those journeys
+    """
+    if not journeys:
+        return {"campaigns": [], "dates": [], "series": {}}
 
-        all_dates.add(date_key)
-        step_series = series.setdefault(step, {})
-        entry = step_series.setdefault(date_key, {"transactions": 0.0, "revenue": 0.0})
-        entry["transactions"] += 1.0
-        entry["revenue"] += journey_revenue_value(journey, dedupe_seen=dedupe_seen)
+    steps: List[str] = []
+    dates: List[str] = []
+    revenues: List[float] = []
+    dedupe_seen: set[str] = set()
+
+    # Revenue depends on the revenue config, so only the last touches are reused across calls.
+    for idx, step, date_key in _converted_last_touches(journeys):
+        steps.append(step)
+        dates.append(date_key)
+        revenues.append(journey_revenue_value(journeys[idx], dedupe_seen=dedupe_seen))
+
+    if not steps:
+        return {"campaigns": [], "dates": [], "series": {}}
 
-    sorted_dates = sorted(all_dates)
-    campaigns = sorted(series.keys())
+    df = pd.DataFrame({"step": steps, "date": dates, "revenue": revenues})
+    agg = df.groupby(["step", "date"], sort=True)["revenue"].agg(transactions="size", revenue="sum")
+    # Dense step x date grid; days without conversions for a step are zero-filled.
+    # The axis is the sorted set of observed dates (not a calendar range): keys that
+    # failed ISO parsing are kept verbatim, and quiet days are not emitted.
+    grid = agg.unstack("date", fill_value=0)
+    tx_grid = grid["transactions"]
+    sorted_dates: List[str] = tx_grid.columns.tolist()
+    campaigns: List[str] = grid.index.tolist()
+    tx_matrix = tx_grid.to_numpy(dtype=np.int64).tolist()
+    rev_matrix = grid["revenue"].to_numpy(dtype=float).tolist()
 
     out_series: Dict[str, List[Dict[str, Any]]] = {}
-    for step, date_map in series.items():
-        points = []
-        for day in sorted_dates:
-            val = date_map.get(day, {"transactions": 0.0, "revenue": 0.0})
-            points.append({"date": day, "transactions": int(val["transactions"]), "revenue": val["revenue"]})
-        out_series[step] = points
+    for step, tx_row, rev_row in zip(campaigns, tx_matrix, rev_matrix):
+        out_series[step] = [
+            {"date": day, "transactions": tx, "revenue": rev}
+            for day, tx, rev in zip(sorted_dates, tx_row, rev_row)
+        ]
 
     return {"campaigns": campaigns, "dates": sorted_dates, "series": out_series}
 
@@ -52,8 +52,9 @@ def rebuild_taxonomy_dq_outputs(
     if snapshots is None:
         source = "journeys_fallback"
         from .services_conversions import load_journeys_from_db
+        from .services_journey_cache import load_cached_journeys
 
-        journeys = load_journeys_from_db(db, limit=10000)
+        journeys = load_cached_journeys(db, loader_fn=load_journeys_from_db, limit=10000)
         snapshots = persist_taxonomy_dq_snapshots(db, journeys, taxonomy=taxonomy)
     return {
         "backfill": backfill,
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+import copy
 import json
 import math
 
@@ -29,7 +30,7 @@ _ALLOWED_DEFAULT_VALUE_MODE = {"disabled", "missing_only", "missing_or_zero"}
 
 
 def default_revenue_config() -> Dict[str, Any]:
-    return dict(_DEFAULT_CONFIG)
+    return copy.deepcopy(_DEFAULT_CONFIG)
 
 
 def _safe_number(value: Any) -> float:
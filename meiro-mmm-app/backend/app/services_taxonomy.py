@@ -19,6 +19,7 @@ import re
 from collections import defaultdict
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
+from operator import attrgetter
 from typing import Any, Dict, List, Optional, Tuple
 
 from sqlalchemy.orm import Session
@@ -37,6 +38,7 @@ _TAXONOMY_SNAPSHOT_METRIC_KEYS = {
     "medium_coverage",
     "low_confidence_touchpoint_share",
 }
+_RULE_ORDER = attrgetter("priority", "name")
 
 
 def _normalized_text(value: Any) -> str:
@@ -284,7 +286,7 @@ def map_to_channel(
     medium_normalized = taxonomy.medium_aliases.get(medium_clean, medium_clean)
     
     # Try to match rules
-    for rule in sorted(taxonomy.channel_rules, key=lambda r: (r.priority, r.name)):
+    for rule in sorted(taxonomy.channel_rules, key=_RULE_ORDER):
         if not rule.enabled:
             continue
 
@@ -420,6 +422,39 @@ class UnknownShareReport:
     sample_unmapped: List[Dict[str, Any]]
 
 
+def _touchpoint_utm_fields(tp: Dict[str, Any]) -> Tuple[str, str, str]:
+    utm = tp.get("utm") or {}
+    utm = utm if isinstance(utm, dict) else {}
+    source = _normalized_text(tp.get("utm_source") or utm.get("source") or tp.get("source"))
+    medium = _normalized_text(tp.get("utm_medium") or utm.get("medium") or tp.get("medium"))
+    campaign = _normalized_text(tp.get("utm_campaign") or utm.get("campaign") or tp.get("campaign"))
+    return source, medium, campaign
+
+
+MappedTouchpoint = Tuple[Dict[str, Any], str, str, str, ChannelMapping]
+
+
+def _map_journey_touchpoints(
+    journeys: List[Dict[str, Any]],
+    taxonomy: Taxonomy,
+) -> List[MappedTouchpoint]:
+    """Map every touchpoint once so several taxonomy reports can share the result.
+
+    Traffic repeats a small set of source/medium/campaign combinations, so each
+    distinct combination is resolved against the taxonomy rules only once.
+    """
+    mapped: List[MappedTouchpoint] = []
+    mappings: Dict[Tuple[str, str, str], ChannelMapping] = {}
+    for journey in journeys:
+        for tp in journey.get("touchpoints", []):
+            fields = _touchpoint_utm_fields(tp)
+            mapping = mappings.get(fields)
+            if mapping is None:
+                mapping = mappings[fields] = map_to_channel(*fields, taxonomy)
+            mapped.append((tp, *fields, mapping))
+    return mapped
+
+
 def compute_unknown_share(
     journeys: List[Dict[str, Any]],
     taxonomy: Optional[Taxonomy] = None,
@@ -432,42 +467,33 @@ def compute_unknown_share(
     """
     if taxonomy is None:
         taxonomy = load_taxonomy()
+    return _unknown_share_report(_map_journey_touchpoints(journeys, taxonomy), sample_size)
 
-    total_touchpoints = 0
+
+def _unknown_share_report(mapped: List[MappedTouchpoint], sample_size: int) -> UnknownShareReport:
+    total_touchpoints = len(mapped)
     unknown_count = 0
     by_source = defaultdict(int)
     by_medium = defaultdict(int)
     by_source_medium = defaultdict(int)
     unmapped_samples = []
     
-    for journey in journeys:
-        touchpoints = journey.get("touchpoints", [])
-        for tp in touchpoints:
-            total_touchpoints += 1
-            
-            # Normalize and check channel
-            utm = tp.get("utm") or {}
-            source = _normalized_text(tp.get("utm_source") or (utm.get("source") if isinstance(utm, dict) else None) or tp.get("source"))
-            medium = _normalized_text(tp.get("utm_medium") or (utm.get("medium") if isinstance(utm, dict) else None) or tp.get("medium"))
-            campaign = _normalized_text(tp.get("utm_campaign") or (utm.get("campaign") if isinstance(utm, dict) else None) or tp.get("campaign"))
-            
-            mapping = map_to_channel(source, medium, campaign, taxonomy)
+    for tp, source, medium, _campaign, mapping in mapped:
+        if mapping.channel == "unknown" or mapping.confidence < 0.5:
+            unknown_count += 1
+            by_source[source] += 1
+            by_medium[medium] += 1
+            by_source_medium[(source, medium)] += 1
             
-            if mapping.channel == "unknown" or mapping.confidence < 0.5:
-                unknown_count += 1
-                by_source[source] += 1
-                by_medium[medium] += 1
-                by_source_medium[(source, medium)] += 1
-                
-                if len(unmapped_samples) < sample_size:
-                    unmapped_samples.append({
-                        "source": source,
-                        "medium": medium,
-                        "channel": mapping.channel,
-                        "confidence": mapping.confidence,
-                        "fallback_reason": mapping.fallback_reason,
-                        "campaign": tp.get("campaign") or tp.get("utm_campaign"),
-                    })
+            if len(unmapped_samples) < sample_size:
+                unmapped_samples.append({
+                    "source": source,
+                    "medium": medium,
+                    "channel": mapping.channel,
+                    "confidence": mapping.confidence,
+                    "fallback_reason": mapping.fallback_reason,
+                    "campaign": tp.get("campaign") or tp.get("utm_campaign"),
+                })
     
     unknown_share = unknown_count / total_touchpoints if total_touchpoints > 0 else 0.0
     
@@ -561,12 +587,14 @@ def compute_journey_confidence(journey: Dict[str, Any], taxonomy: Optional[Taxon
     
     Uses harmonic mean to penalize low-confidence touchpoints.
     """
-    touchpoints = journey.get("touchpoints", [])
-    if not touchpoints:
+    confidences = [compute_touchpoint_confidence(tp, taxonomy) for tp in journey.get("touchpoints", [])]
+    return _harmonic_mean_confidence(confidences)
+
+
+def _harmonic_mean_confidence(confidences: List[float]) -> float:
+    if not confidences:
         return 0.0
     
-    confidences = [compute_touchpoint_confidence(tp, taxonomy) for tp in touchpoints]
-    
     # Harmonic mean (penalizes low scores more than arithmetic mean)
     if any(c == 0 for c in confidences):
         return 0.0
@@ -713,33 +741,27 @@ def compute_taxonomy_coverage(
     """
     if taxonomy is None:
         taxonomy = load_taxonomy()
-    
+    return _taxonomy_coverage_report(_map_journey_touchpoints(journeys, taxonomy))
+
+
+def _taxonomy_coverage_report(mapped: List[MappedTouchpoint]) -> Dict[str, Any]:
     channel_dist = defaultdict(int)
     rule_usage = defaultdict(int)
     source_confidences = defaultdict(list)
     medium_confidences = defaultdict(list)
     unmapped_patterns = defaultdict(int)
     
-    for journey in journeys:
-        touchpoints = journey.get("touchpoints", [])
-        for tp in touchpoints:
-            utm = tp.get("utm") or {}
-            source = _normalized_text(tp.get("utm_source") or (utm.get("source") if isinstance(utm, dict) else None) or tp.get("source"))
-            medium = _normalized_text(tp.get("utm_medium") or (utm.get("medium") if isinstance(utm, dict) else None) or tp.get("medium"))
-            campaign = _normalized_text(tp.get("utm_campaign") or (utm.get("campaign") if isinstance(utm, dict) else None) or tp.get("campaign"))
-            
-            mapping = map_to_channel(source, medium, campaign, taxonomy)
-            
-            channel_dist[mapping.channel] += 1
-            
-            if mapping.matched_rule:
-                rule_usage[mapping.matched_rule] += 1
-            
-            source_confidences[source].append(mapping.confidence)
-            medium_confidences[medium].append(mapping.confidence)
-            
-            if mapping.confidence < 0.5:
-                unmapped_patterns[(source, medium, campaign)] += 1
+    for _tp, source, medium, campaign, mapping in mapped:
+        channel_dist[mapping.channel] += 1
+        
+        if mapping.matched_rule:
+            rule_usage[mapping.matched_rule] += 1
+        
+        source_confidences[source].append(mapping.confidence)
+        medium_confidences[medium].append(mapping.confidence)
+        
+        if mapping.confidence < 0.5:
+            unmapped_patterns[(source, medium, campaign)] += 1
     
     # Compute coverage metrics
     sources_with_good_mapping = sum(
@@ -859,27 +881,25 @@ def persist_taxonomy_dq_snapshots(
     
     ts_bucket = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
     
-    # Unknown share
-    unknown_report = compute_unknown_share(journeys, taxonomy)
+    # Unknown share and coverage share one channel mapping per touchpoint
+    mapped = _map_journey_touchpoints(journeys, taxonomy)
+    unknown_report = _unknown_share_report(mapped, sample_size=20)
     
-    # Confidence scores
+    # Confidence scores; each touchpoint is scored once and reused for its journey
     touchpoint_confidences = []
     journey_confidences = []
     
     for journey in journeys:
-        journey_conf = compute_journey_confidence(journey, taxonomy)
-        journey_confidences.append(journey_conf)
-        
-        for tp in journey.get("touchpoints", []):
-            tp_conf = compute_touchpoint_confidence(tp, taxonomy)
-            touchpoint_confidences.append(tp_conf)
+        confidences = [compute_touchpoint_confidence(tp, taxonomy) for tp in journey.get("touchpoints", [])]
+        touchpoint_confidences.extend(confidences)
+        journey_confidences.append(_harmonic_mean_confidence(confidences))
     
     mean_tp_conf = sum(touchpoint_confidences) / len(touchpoint_confidences) if touchpoint_confidences else 0.0
     mean_journey_conf = sum(journey_confidences) / len(journey_confidences) if journey_confidences else 0.0
     low_conf_share = sum(1 for c in touchpoint_confidences if c < 0.5) / len(touchpoint_confidences) if touchpoint_confidences else 0.0
     
     # Coverage
-    coverage = compute_taxonomy_coverage(journeys, taxonomy)
+    coverage = _taxonomy_coverage_report(mapped)
     
     # Build snapshots
     snapshots = []
@@ -1,4 +1,5 @@
 """Meiro integration config: metadata, mapping, webhook stats."""
+import copy
 import json
 import secrets
 import threading
@@ -14,6 +15,8 @@ WEBHOOK_ARCHIVE_PATH = DATA_DIR / "meiro_webhook_archive.jsonl"
 EVENT_ARCHIVE_PATH = DATA_DIR / "meiro_event_archive.jsonl"
 MEIRO_CDP_PLATFORM = "meiro_cdp"
 _CONFIG_LOCK = threading.RLock()
+# Mapping section of CONFIG_PATH keyed by (path, mtime_ns, size); reset on every write.
+_MAPPING_CACHE: Dict[str, Any] = {"key": None, "mapping": {}}
 
 
 def _backup_path() -> Path:
@@ -43,6 +46,7 @@ def _mutate(mutator: Callable[[Dict[str, Any]], None]) -> Dict[str, Any]:
         current = _read_json_file(CONFIG_PATH)
         next_data = dict(current)
         mutator(next_data)
+        _MAPPING_CACHE.update(key=None, mapping={})
         _write_json_file(CONFIG_PATH, next_data)
         _write_json_file(_backup_path(), next_data)
         return next_data
@@ -61,6 +65,7 @@ def _load() -> Dict[str, Any]:
 
 def _save(data: Dict[str, Any]) -> None:
     with _CONFIG_LOCK:
+        _MAPPING_CACHE.update(key=None, mapping={})
         _write_json_file(CONFIG_PATH, data)
         _write_json_file(_backup_path(), data)
 
@@ -330,11 +335,27 @@ def rebuild_profiles_from_webhook_archive(
     return rebuilt
 
 
+def _config_file_key() -> Optional[tuple]:
+    try:
+        stat = CONFIG_PATH.stat()
+    except OSError:
+        return None
+    return (str(CONFIG_PATH), stat.st_mtime_ns, stat.st_size)
+
+
 def get_mapping() -> Dict[str, Any]:
-    raw = _load().get("mapping", {})
-    if isinstance(raw, dict) and isinstance(raw.get("config"), dict):
-        return raw.get("config", {})
-    return raw if isinstance(raw, dict) else {}
+    with _CONFIG_LOCK:
+        key = _config_file_key()
+        if key is not None and _MAPPING_CACHE["key"] == key:
+            return copy.deepcopy(_MAPPING_CACHE["mapping"])
+        raw = _load().get("mapping", {})
+        if isinstance(raw, dict) and isinstance(raw.get("config"), dict):
+            mapping = raw.get("config", {})
+        else:
+            mapping = raw if isinstance(raw, dict) else {}
+        if key is not None:
+            _MAPPING_CACHE.update(key=key, mapping=copy.deepcopy(mapping))
+        return mapping
 
 
 def save_mapping(mapping: Dict[str, Any]) -> None:
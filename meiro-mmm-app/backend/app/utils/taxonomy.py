@@ -3,8 +3,10 @@ from __future__ import annotations
 import json
 import re
 from dataclasses import dataclass, field
+from functools import lru_cache
+from operator import attrgetter
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from urllib.parse import urlparse
 
 
@@ -120,24 +122,29 @@ class MatchExpression:
         return op
 
 
+@lru_cache(maxsize=512)
+def _compiled_pattern(value: str) -> Optional[re.Pattern[str]]:
+    try:
+        return re.compile(value, re.IGNORECASE)
+    except re.error:
+        return None
+
+
 def _evaluate_expression(expr: MatchExpression, text: Optional[str]) -> bool:
     operator = expr.normalize_operator()
     value = expr.value or ""
-    candidate = (text or "").lower()
     if operator == "any" or not value:
         return True
 
     if operator == "contains":
-        return value.lower() in candidate
+        return value.lower() in (text or "").lower()
 
     if operator == "equals":
-        return value.lower() == candidate
+        return value.lower() == (text or "").lower()
 
     if operator == "regex":
-        try:
-            return re.search(value, text or "", re.IGNORECASE) is not None
-        except re.error:
-            return False
+        pattern = _compiled_pattern(value)
+        return pattern is not None and pattern.search(text or "") is not None
 
     return True
 
@@ -268,7 +275,7 @@ def load_taxonomy() -> Taxonomy:
             )
         )
 
-    rules.sort(key=lambda rule: (rule.priority, rule.name))
+    rules.sort(key=attrgetter("priority", "name"))
     taxonomy = Taxonomy(
         channel_rules=rules,
         source_aliases=raw.get("source_aliases", {}),
@@ -288,17 +295,23 @@ def load_taxonomy() -> Taxonomy:
     return taxonomy
 
 
-def save_taxonomy(taxonomy: Taxonomy) -> None:
-    path = _taxonomy_path()
-    path.parent.mkdir(parents=True, exist_ok=True)
+def taxonomy_file_signature() -> Optional[Tuple[int, int]]:
+    """(mtime_ns, size) of the taxonomy file, or None when it does not exist yet."""
+    try:
+        stat = _taxonomy_path().stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
 
+def serialize_taxonomy(taxonomy: Taxonomy) -> Dict[str, Any]:
     def _serialize_expression(expr: MatchExpression) -> Dict[str, str]:
         return {
             "operator": expr.normalize_operator(),
             "value": expr.value or "",
         }
 
-    payload = {
+    return {
         "channel_rules": [
             {
                 "name": r.name,
@@ -314,7 +327,12 @@ def save_taxonomy(taxonomy: Taxonomy) -> None:
         "source_aliases": taxonomy.source_aliases,
         "medium_aliases": taxonomy.medium_aliases,
     }
-    path.write_text(json.dumps(payload, indent=2))
+
+
+def save_taxonomy(taxonomy: Taxonomy) -> None:
+    path = _taxonomy_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(serialize_taxonomy(taxonomy), indent=2))
 
 
 def _normalized_host(value: Any) -> str:
@@ -0,0 +1,2 @@
+CREATE INDEX IF NOT EXISTS ix_roles_name_system
+  ON roles(name, is_system);
@@ -0,0 +1,2 @@
+CREATE INDEX IF NOT EXISTS ix_conversion_paths_key_ts
+  ON conversion_paths(conversion_key, conversion_ts);
@@ -17,6 +17,7 @@ from app.services_access_control import (
     DEFAULT_WORKSPACE_ID,
     SYSTEM_ROLE_PERMISSIONS,
     ensure_access_control_seed_data,
+    get_system_admin_role_id,
 )
 
 
@@ -99,3 +100,27 @@ def test_workspace_membership_unique_workspace_user():
     finally:
         db.close()
 
+
+def test_system_admin_role_id_is_scoped_to_engine_and_cleared_on_seed():
+    db_a = _unit_db_session()
+    db_b = _unit_db_session()
+    try:
+        assert get_system_admin_role_id(db_a) is None
+        ensure_access_control_seed_data(db_a)
+        ensure_access_control_seed_data(db_b)
+        admin_a = db_a.query(Role).filter(Role.name == "Admin", Role.is_system == True).one()  # noqa: E712
+        admin_b = db_b.query(Role).filter(Role.name == "Admin", Role.is_system == True).one()  # noqa: E712
+
+        assert get_system_admin_role_id(db_a) == admin_a.id
+        assert get_system_admin_role_id(db_b) == admin_b.id
+
+        db_a.query(RolePermission).filter(RolePermission.role_id == admin_a.id).delete()
+        db_a.delete(admin_a)
+        db_a.commit()
+        ensure_access_control_seed_data(db_a)
+        reseeded = db_a.query(Role).filter(Role.name == "Admin", Role.is_system == True).one()  # noqa: E712
+        assert reseeded.id != admin_a.id
+        assert get_system_admin_role_id(db_a) == reseeded.id
+    finally:
+        db_a.close()
+        db_b.close()
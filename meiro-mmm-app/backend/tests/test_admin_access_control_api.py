@@ -161,3 +161,33 @@ def test_admin_audit_log_endpoint_filters_and_pagination(client):
     assert filtered.status_code == 200
     assert filtered.json()["items"]
     assert all("invitation.created" in row["action_key"] for row in filtered.json()["items"])
+
+
+def test_invitation_accept_matches_legacy_sha256_token_hash(client):
+    import hashlib
+    from datetime import datetime, timedelta
+
+    from app.models_config_dq import Invitation, Role
+
+    test_client, SessionLocal = client
+    token = "legacy-invite-token"
+    db = SessionLocal()
+    try:
+        viewer = db.query(Role).filter(Role.name == "Viewer").first()
+        db.add(
+            Invitation(
+                id="legacy-inv",
+                workspace_id="default",
+                email="legacy.user@example.com",
+                role_id=viewer.id,
+                token_hash=hashlib.sha256(token.encode("utf-8")).hexdigest(),
+                expires_at=datetime.utcnow() + timedelta(days=1),
+            )
+        )
+        db.commit()
+    finally:
+        db.close()
+
+    accepted = test_client.post("/api/invitations/accept", json={"token": token})
+    assert accepted.status_code == 200
+    assert accepted.json()["ok"] is True
@@ -38,3 +38,86 @@ def test_data_quality_snapshots_list_empty_or_more():
     assert resp.status_code == 200
     body = resp.json()
     assert isinstance(body, list)
+
+
+def test_import_precheck_reports_current_dataset():
+    resp = client.get("/api/attribution/import-precheck", params={"source": "upload"})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["current_count"] >= body["current_converted"] >= 0
+    assert body["current_channels"] == sorted(body["current_channels"])
+
+
+def test_validation_report_download_returns_json_attachment():
+    resp = client.get("/api/attribution/journeys/validation-report")
+    assert resp.status_code == 200
+    assert resp.headers["content-disposition"] == "attachment; filename=validation-report.json"
+    assert isinstance(resp.json(), dict)
+
+
+def test_path_archetypes_cache_is_scoped_to_journey_dataset():
+    from app import main
+    from app.services_journey_cache import invalidate_journey_cache, load_cached_journeys
+
+    def _journeys(channels):
+        return [
+            {
+                "customer_id": f"c{i}",
+                "converted": True,
+                "conversion_value": 10.0,
+                "touchpoints": [{"channel": ch, "timestamp": "2026-01-0%dT10:00:00Z" % (i % 9 + 1)} for ch in path],
+            }
+            for i, path in enumerate(channels)
+        ]
+
+    main.PATH_ARCHETYPES_CACHE.clear()
+    try:
+        invalidate_journey_cache()
+        first_set = _journeys([["email", "seo"], ["seo"], ["email"], ["paid", "email"]] * 5)
+        load_cached_journeys(None, loader_fn=lambda db, limit: first_set, limit=50000)
+        first = client.get("/api/paths/archetypes", params={"k_mode": "fixed", "k": 2}).json()
+        assert client.get("/api/paths/archetypes", params={"k_mode": "fixed", "k": 2}).json() == first
+
+        invalidate_journey_cache()
+        second_set = _journeys([["paid"], ["paid", "seo"], ["direct"], ["seo", "seo"]] * 5)
+        load_cached_journeys(None, loader_fn=lambda db, limit: second_set, limit=50000)
+        second = client.get("/api/paths/archetypes", params={"k_mode": "fixed", "k": 2}).json()
+        assert second != first
+    finally:
+        invalidate_journey_cache()
+        main.PATH_ARCHETYPES_CACHE.clear()
+
+
+def test_repeat_attribution_runs_reuse_journeys_for_model(monkeypatch):
+    from app import attribution_engine, main
+    import app.modules.attribution.router as attribution_router
+    from app.services_journey_cache import invalidate_journey_cache, load_cached_journeys
+
+    monkeypatch.setattr(attribution_router, "_MODEL_JOURNEYS", {})
+    monkeypatch.setattr(main, "ATTRIBUTION_RESULTS", dict(main.ATTRIBUTION_RESULTS))
+    dataset = [
+        {
+            "customer_id": f"c{i}",
+            "converted": True,
+            "conversion_value": 10.0,
+            "touchpoints": [{"channel": ch, "timestamp": "2026-01-0%dT10:00:00Z" % (i % 9 + 1)} for ch in ("email", "seo")],
+        }
+        for i in range(5)
+    ]
+    try:
+        invalidate_journey_cache()
+        load_cached_journeys(None, loader_fn=lambda db, limit: dataset, limit=50000)
+        assert client.post("/api/attribution/run", params={"model": "linear"}).status_code == 200
+        (entry,) = attribution_router._MODEL_JOURNEYS.values()
+        journeys_for_model = entry["journeys_for_model"]
+
+        assert client.post("/api/attribution/run", params={"model": "last_touch"}).status_code == 200
+        assert list(attribution_router._MODEL_JOURNEYS.values()) == [entry]
+        assert attribution_engine._PREPARED_INPUTS["journeys"] is journeys_for_model
+
+        invalidate_journey_cache()
+        load_cached_journeys(None, loader_fn=lambda db, limit: dataset, limit=50000)
+        assert client.post("/api/attribution/run", params={"model": "linear"}).status_code == 200
+        assert len(attribution_router._MODEL_JOURNEYS) == 2
+    finally:
+        invalidate_journey_cache()
@@ -8,6 +8,7 @@ from app.attribution_engine import (
     position_based,
     markov,
     run_attribution,
+    compute_next_best_action,
 )
 
 
@@ -213,3 +214,65 @@ def test_run_attribution_reports_click_view_mixed_and_net_outcomes():
     assert result["refunded_value"] == 30.0
     assert result["invalid_leads"] == 1.0
     assert result["interaction_summary"]["view_through_conversions"] == 1.0
+
+
+def test_compute_next_best_action_only_prefix_matches_full_result():
+    journeys = _simple_journeys() + [
+        {
+            "customer_id": "c3",
+            "touchpoints": [{"channel": "google"}, {"channel": "email"}, {"channel": "meta"}],
+            "conversion_value": 20.0,
+            "converted": True,
+        },
+    ]
+    full = compute_next_best_action(journeys)
+
+    for prefix in ("", "google", "google > email", "meta"):
+        restricted = compute_next_best_action(journeys, only_prefix=prefix)
+        assert restricted == ({prefix: full[prefix]} if prefix in full else {})
+
+
+def test_run_attribution_prepares_totals_once_per_journey_list(monkeypatch):
+    import app.attribution_engine as engine
+
+    calls = []
+    original_summary = engine.journey_outcome_summary
+    monkeypatch.setattr(engine, "journey_outcome_summary", lambda journey: calls.append(journey) or original_summary(journey))
+    journeys = _simple_journeys()
+
+    linear_result = run_attribution(journeys, model="linear")
+    last_result = run_attribution(journeys, model="last_touch")
+    assert len(calls) == 2
+    assert last_result["total_value"] == linear_result["total_value"]
+
+    run_attribution(journeys, model="linear", value_mode="net_only")
+    run_attribution(list(journeys), model="linear")
+    assert len(calls) == 6
+
+
+def test_journey_step_paths_reuses_steps_for_same_journey_dataset(monkeypatch):
+    import app.attribution_engine as engine
+    from app.services_journey_cache import invalidate_journey_cache, load_cached_journeys
+
+    monkeypatch.setattr(engine, "_JOURNEY_STEP_PATHS", {})
+    invalidate_journey_cache()
+    dataset = [
+        {"touchpoints": [{"channel": "email", "campaign": "spring"}, {"channel": "seo"}]},
+        {"touchpoints": []},
+    ]
+
+    def loader(_db, *, limit: int):
+        return dataset[:limit]
+
+    journeys = load_cached_journeys(object(), loader_fn=loader)
+    steps, paths = engine.journey_step_paths(journeys, "channel")
+    campaign_steps, campaign_paths = engine.journey_step_paths(journeys, "campaign")
+
+    assert steps == [["email", "seo"], []]
+    assert paths == ["email > seo", ""]
+    assert campaign_paths == ["email:spring > seo", ""]
+    assert engine.journey_step_paths(load_cached_journeys(object(), loader_fn=loader), "channel")[0] is steps
+    assert engine.journey_step_paths([dict(j) for j in journeys], "channel")[0] is not steps
+
+    invalidate_journey_cache()
+    assert engine.journey_step_paths(load_cached_journeys(object(), loader_fn=loader), "channel")[0] is not steps
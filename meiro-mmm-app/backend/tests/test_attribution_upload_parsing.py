@@ -0,0 +1,64 @@
+import json
+
+import pytest
+
+import app.modules.attribution.router as attribution_router
+from app.modules.attribution.router import _days_to_convert, _exclude_direct_touchpoints, _parse_upload_payload
+from app.services_journey_cache import invalidate_journey_cache, load_cached_journeys
+
+
+def test_parse_upload_payload_keeps_raw_bytes_for_plain_utf8_json():
+    content = '[{"customer_id": "č1", "touchpoints": []}]'.encode("utf-8")
+
+    data, raw_is_canonical = _parse_upload_payload(content)
+
+    assert raw_is_canonical is True
+    assert data == [{"customer_id": "č1", "touchpoints": []}]
+
+
+def test_parse_upload_payload_falls_back_to_stdlib_parser():
+    bom, bom_raw = _parse_upload_payload(b"\xef\xbb\xbf[]")
+    nan, nan_raw = _parse_upload_payload(b'[{"conversion_value": NaN}]')
+
+    assert (bom, bom_raw) == ([], False)
+    assert nan_raw is False and nan[0]["conversion_value"] != nan[0]["conversion_value"]
+    with pytest.raises(json.JSONDecodeError):
+        _parse_upload_payload(b"{not json")
+
+
+def test_days_to_convert_matches_scalar_timestamp_parsing():
+    spans = [
+        ("2026-01-01T00:00:00Z", "2026-01-03T12:00:00Z"),
+        ("2026-01-05", "2026-01-04"),
+        ("01/01/2026", "01/02/2026"),
+        ("", "2026-01-02"),
+        ("garbage", "2026-01-02"),
+    ]
+
+    assert sorted(_days_to_convert(spans)) == [1.0, 2.5]
+    assert _days_to_convert([("2026-01-01T00:00:00", "2026-01-02T00:00:00Z")]) == []
+    assert _days_to_convert([]) == []
+
+
+def test_exclude_direct_touchpoints_filters_once_per_journey_dataset(monkeypatch):
+    monkeypatch.setattr(attribution_router, "_DIRECT_EXCLUDED", {"key": None, "journeys": None, "filtered": None})
+    invalidate_journey_cache()
+    dataset = [
+        {"customer_id": "a", "touchpoints": [{"channel": "Direct"}, {"channel": "email"}]},
+        {"customer_id": "b", "touchpoints": [{"channel": "direct"}]},
+        {"customer_id": "c", "touchpoints": [{"channel": "seo"}]},
+    ]
+
+    def loader(_db, *, limit: int):
+        return dataset[:limit]
+
+    journeys = load_cached_journeys(object(), loader_fn=loader)
+    filtered = _exclude_direct_touchpoints(journeys)
+
+    assert [j["customer_id"] for j in filtered] == ["a", "c"]
+    assert filtered[0]["touchpoints"] == [{"channel": "email"}]
+    assert journeys[0]["touchpoints"][0] == {"channel": "Direct"}
+    assert _exclude_direct_touchpoints(load_cached_journeys(object(), loader_fn=loader)) is filtered
+    assert _exclude_direct_touchpoints(journeys[:2]) is not filtered
+    invalidate_journey_cache()
+    assert _exclude_direct_touchpoints(load_cached_journeys(object(), loader_fn=loader)) is not filtered
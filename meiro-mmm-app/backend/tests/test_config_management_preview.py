@@ -0,0 +1,36 @@
+import app.modules.config_management.router as config_router
+from app.services_journey_cache import invalidate_journey_cache, load_cached_journeys
+
+
+def test_preview_journey_metrics_is_keyed_on_every_journey(monkeypatch):
+    monkeypatch.setattr(config_router, "_PREVIEW_METRICS_CACHE", {})
+    invalidate_journey_cache()
+    first_journey = {"customer_id": "a", "converted": True, "touchpoints": [{"channel": "email"}]}
+    dataset = [first_journey, {"customer_id": "b", "converted": False, "touchpoints": [{"channel": "seo"}]}]
+    applied = []
+
+    def apply_fn(journeys, cfg_json):
+        applied.append(len(journeys))
+        return journeys
+
+    def loader(_db, *, limit: int):
+        return dataset[:limit]
+
+    metrics = config_router._preview_journey_metrics(
+        load_cached_journeys(object(), loader_fn=loader), {}, "fp", apply_fn
+    )
+    again = config_router._preview_journey_metrics(
+        load_cached_journeys(object(), loader_fn=loader), {}, "fp", apply_fn
+    )
+    assert metrics == again == {"journeys": 2, "touchpoints": 2, "conversions": 1}
+    assert applied == [2]
+
+    # Same length and first journey, different later journey: must not collide.
+    other = [first_journey, {"customer_id": "c", "converted": True, "touchpoints": [{"channel": "a"}, {"channel": "b"}]}]
+    assert config_router._preview_journey_metrics(other, {}, "fp", apply_fn) == {
+        "journeys": 2,
+        "touchpoints": 3,
+        "conversions": 2,
+    }
+    assert applied == [2, 2]
+    assert all(entry["journeys"] for entry in config_router._PREVIEW_METRICS_CACHE.values())
@@ -1,3 +1,6 @@
+from collections import deque
+
+import pytest
 from fastapi.testclient import TestClient
 
 from app import main
@@ -58,3 +61,163 @@ def test_expenses_default_seed_used_only_when_no_persisted_state(monkeypatch, tm
 
     assert "google_ads_2024-01" in main.EXPENSES
     assert len(main.EXPENSE_AUDIT_LOG) == 0
+
+
+def test_expenses_default_seed_skipped_in_production(monkeypatch, tmp_path):
+    monkeypatch.setattr(main, "EXPENSES_FILE", tmp_path / "expenses.json")
+    monkeypatch.setattr(main, "EXPENSE_AUDIT_FILE", tmp_path / "expenses_audit.json")
+    monkeypatch.setattr(main, "EXPENSES", {})
+    monkeypatch.setattr(main, "EXPENSE_AUDIT_LOG", [])
+    monkeypatch.setenv("APP_ENV", "production")
+
+    main._load_expense_state()
+
+    assert main.EXPENSES == {}
+
+
+def test_expense_enumerated_fields_are_validated_and_invalid_persisted_rows_skipped(monkeypatch, tmp_path):
+    expenses_file = tmp_path / "expenses.json"
+    audit_file = tmp_path / "expenses_audit.json"
+    monkeypatch.setattr(main, "EXPENSES_FILE", expenses_file)
+    monkeypatch.setattr(main, "EXPENSE_AUDIT_FILE", audit_file)
+    monkeypatch.setattr(main, "EXPENSES", {})
+    monkeypatch.setattr(main, "EXPENSE_AUDIT_LOG", [])
+
+    client = TestClient(app)
+    response = client.post(
+        "/api/expenses",
+        json={"channel": "google_ads", "amount": 10.0, "status": "archived"},
+    )
+    assert response.status_code == 422
+
+    expenses_file.write_text(
+        '{"ok": {"channel": "meta_ads", "amount": 5.0, "source_type": "import"},'
+        ' "bad": {"channel": "meta_ads", "amount": 5.0, "source_type": "spreadsheet"}}',
+        encoding="utf-8",
+    )
+    main._load_expense_state()
+
+    assert list(main.EXPENSES) == ["ok"]
+    assert main.EXPENSES["ok"].source_type == "import"
+
+
+def test_expense_audit_spills_oldest_events_to_archive(monkeypatch, tmp_path):
+    monkeypatch.setattr(main, "EXPENSES_FILE", tmp_path / "expenses.json")
+    monkeypatch.setattr(main, "EXPENSE_AUDIT_FILE", tmp_path / "expenses_audit.json")
+    monkeypatch.setattr(main, "EXPENSES", {})
+    monkeypatch.setattr(main, "EXPENSE_AUDIT_HOT_LIMIT", 4)
+    monkeypatch.setattr(main, "EXPENSE_AUDIT_LOG", deque(maxlen=4))
+
+    client = TestClient(app)
+    created = client.post("/api/expenses", json={"channel": "google_ads", "amount": 1.0})
+    expense_id = created.json()["id"]
+    for amount in (2.0, 3.0, 4.0, 5.0):
+        response = client.patch(f"/api/expenses/{expense_id}", json={"channel": "google_ads", "amount": amount})
+        assert response.status_code == 200
+
+    archive_lines = (tmp_path / "expenses_audit_archive.jsonl").read_text(encoding="utf-8").splitlines()
+    assert len(archive_lines) == 2
+    assert len(main.EXPENSE_AUDIT_LOG) == 3
+
+    audit = client.get(f"/api/expenses/{expense_id}/audit").json()
+    assert [event["event_type"] for event in audit] == ["created"] + ["updated"] * 4
+
+
+def test_expense_list_and_summary_reuse_records_until_expenses_change(monkeypatch, tmp_path):
+    monkeypatch.setattr(main, "EXPENSES_FILE", tmp_path / "expenses.json")
+    monkeypatch.setattr(main, "EXPENSE_AUDIT_FILE", tmp_path / "expenses_audit.json")
+    monkeypatch.setattr(main, "EXPENSES", {})
+    monkeypatch.setattr(main, "EXPENSE_AUDIT_LOG", [])
+
+    client = TestClient(app)
+    first = client.post("/api/expenses", json={"channel": "google_ads", "amount": 10.0, "notes": "Spring Promo"}).json()
+    client.post("/api/expenses", json={"channel": "meta_ads", "amount": 5.0, "source_type": "import"})
+
+    records = main._expense_records()
+    assert main._expense_records() is records
+    assert [item["id"] for item in client.get("/api/expenses", params={"search": "spring"}).json()] == [first["id"]]
+    assert client.get("/api/expenses/summary").json()["by_channel"] == {"google_ads": 10.0, "meta_ads": 5.0}
+
+    assert client.delete(f"/api/expenses/{first['id']}").status_code == 200
+    assert main._expense_records() is not records
+    assert [item["channel"] for item in client.get("/api/expenses").json()] == ["meta_ads"]
+    summary = client.get("/api/expenses/summary").json()
+    assert summary["by_channel"] == {"meta_ads": 5.0}
+    assert summary["imported_total"] == 5.0
+
+
+def test_active_expense_by_channel_is_cached_per_expenses_version(monkeypatch, tmp_path):
+    monkeypatch.setattr(main, "EXPENSES_FILE", tmp_path / "expenses.json")
+    monkeypatch.setattr(main, "EXPENSE_AUDIT_FILE", tmp_path / "expenses_audit.json")
+    monkeypatch.setattr(main, "EXPENSES", {})
+    monkeypatch.setattr(main, "EXPENSE_AUDIT_LOG", [])
+
+    client = TestClient(app)
+    client.post("/api/expenses", json={"channel": "google_ads", "amount": 10.0})
+    created = client.post("/api/expenses", json={"channel": "google_ads", "amount": 2.5}).json()
+
+    by_channel = main._active_expense_by_channel()
+    assert by_channel == {"google_ads": 12.5}
+    by_channel["google_ads"] = 0.0
+    assert main._active_expense_by_channel() == {"google_ads": 12.5}
+
+    client.delete(f"/api/expenses/{created['id']}")
+    assert main._active_expense_by_channel() == {"google_ads": 10.0}
+
+
+def test_expense_audit_index_tracks_appends_and_buffer_replacement(monkeypatch, tmp_path):
+    monkeypatch.setattr(main, "EXPENSES_FILE", tmp_path / "expenses.json")
+    monkeypatch.setattr(main, "EXPENSE_AUDIT_FILE", tmp_path / "expenses_audit.json")
+    monkeypatch.setattr(main, "EXPENSES", {})
+    monkeypatch.setattr(main, "EXPENSE_AUDIT_LOG", deque(maxlen=100))
+
+    client = TestClient(app)
+    first = client.post("/api/expenses", json={"channel": "google_ads", "amount": 1.0}).json()["id"]
+    second = client.post("/api/expenses", json={"channel": "meta_ads", "amount": 2.0}).json()["id"]
+    index = main._expense_audit_index()
+    client.delete(f"/api/expenses/{first}")
+
+    assert main._expense_audit_index() is index
+    assert [event.event_type for event in index[first]] == ["created", "deleted"]
+    assert [event["event_type"] for event in client.get(f"/api/expenses/{second}/audit").json()] == ["created"]
+
+    monkeypatch.setattr(main, "EXPENSE_AUDIT_LOG", deque(maxlen=100))
+    assert client.get(f"/api/expenses/{first}/audit").json() == []
+
+
+def test_with_converted_amount_uses_fx_table_from_revenue_config(monkeypatch):
+    monkeypatch.setattr(main, "_FX_RATES", {})
+    main._refresh_fx_rates(
+        main.RevenueConfig(
+            base_currency="USD",
+            fx_enabled=True,
+            fx_mode="static_rates",
+            fx_rates_json={"EUR": 1.1},
+        )
+    )
+
+    converted = main._with_converted_amount(main.ExpenseEntry(channel="email", amount=100.0, currency="EUR"))
+    explicit = main._with_converted_amount(
+        main.ExpenseEntry(channel="email", amount=100.0, currency="EUR", fx_rate=2.0)
+    )
+    unknown = main._with_converted_amount(main.ExpenseEntry(channel="email", amount=100.0, currency="GBP"))
+
+    assert converted.fx_rate == 1.1
+    assert converted.converted_amount == pytest.approx(110.0)
+    assert explicit.converted_amount == 200.0
+    assert unknown.fx_rate == 1.0 and unknown.converted_amount == 100.0
+
+
+def test_with_converted_amount_reports_in_usd_with_default_eur_base(monkeypatch):
+    monkeypatch.setattr(main, "_FX_RATES", {})
+    main._refresh_fx_rates(
+        main.RevenueConfig(fx_enabled=True, fx_mode="static_rates", fx_rates_json={"USD": 0.9, "GBP": 1.17})
+    )
+
+    from_eur = main._with_converted_amount(main.ExpenseEntry(channel="email", amount=90.0, currency="EUR"))
+    from_gbp = main._with_converted_amount(main.ExpenseEntry(channel="email", amount=100.0, currency="GBP"))
+
+    assert main.RevenueConfig().base_currency == "EUR"
+    assert from_eur.reporting_currency == "USD"
+    assert from_eur.converted_amount == pytest.approx(100.0)
+    assert from_gbp.converted_amount == pytest.approx(130.0)
@@ -25,3 +25,24 @@ def test_mapping_state_tracks_version_history_and_approval(monkeypatch, tmp_path
     assert state["mapping"]["touchpoint_attr"] == "journey_touchpoints"
     assert state["version"] == 2
     assert state["approval"]["status"] == "approved"
+
+
+def test_get_mapping_reuses_parsed_mapping_until_config_changes(monkeypatch, tmp_path):
+    config_path = tmp_path / "meiro_config.json"
+    monkeypatch.setattr(meiro_config, "CONFIG_PATH", config_path)
+    monkeypatch.setattr(meiro_config, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(meiro_config, "_MAPPING_CACHE", {"key": None, "mapping": {}})
+
+    meiro_config.save_mapping({"touchpoint_attr": "touchpoints"})
+    first = meiro_config.get_mapping()
+    first["touchpoint_attr"] = "mutated"
+
+    reads = []
+    original_load = meiro_config._load
+    monkeypatch.setattr(meiro_config, "_load", lambda: reads.append(1) or original_load())
+    assert meiro_config.get_mapping() == {"touchpoint_attr": "touchpoints"}
+    assert reads == []
+
+    meiro_config.save_mapping({"touchpoint_attr": "journey_touchpoints"})
+    assert meiro_config.get_mapping() == {"touchpoint_attr": "journey_touchpoints"}
+    assert reads == [1]
@@ -0,0 +1,67 @@
+import json
+import threading
+
+from app import main
+
+
+def test_save_runs_coalesces_burst_into_single_atomic_write(monkeypatch, tmp_path):
+    runs_file = tmp_path / "mmm_runs.json"
+    monkeypatch.setattr(main, "RUNS_FILE", runs_file)
+    monkeypatch.setattr(main, "RUNS", {})
+    monkeypatch.setattr(main, "RUNS_SAVE_DEBOUNCE_SECONDS", 60.0)
+
+    for pct in (5, 45, 100):
+        main.RUNS["run_1"] = {"status": "running", "progress_pct": pct, "path": tmp_path}
+        main._save_runs()
+
+    assert not runs_file.exists()
+    assert main._RUNS_SAVE_TIMER is not None
+
+    main._save_runs(immediate=True)
+
+    assert main._RUNS_SAVE_TIMER is None
+    assert list(tmp_path.glob("*.tmp")) == []
+    persisted = json.loads(runs_file.read_text(encoding="utf-8"))
+    assert persisted == {"run_1": {"status": "running", "progress_pct": 100}}
+
+
+def test_write_file_atomic_keeps_concurrent_writers_apart(tmp_path):
+    target = tmp_path / "expenses.json"
+    payloads = [json.dumps({"writer": idx, "data": "x" * 200_000}).encode() for idx in range(8)]
+    threads = [threading.Thread(target=main._write_file_atomic, args=(target, payload)) for payload in payloads]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert target.read_bytes() in payloads
+    assert list(tmp_path.glob("*.tmp")) == []
+
+
+def test_save_last_import_result_round_trips(monkeypatch, tmp_path):
+    result_file = tmp_path / "last_import_result.json"
+    monkeypatch.setattr(main, "LAST_IMPORT_RESULT_FILE", result_file)
+
+    main._save_last_import_result({"import_summary": {"total": 2}, "validation_items": [], "ignored": True})
+
+    assert list(tmp_path.glob("*.tmp")) == []
+    assert main._load_last_import_result() == {
+        "import_summary": {"total": 2},
+        "validation_items": [],
+        "items_detail": [],
+    }
+
+
+def test_save_settings_writes_atomically_and_skips_unchanged(monkeypatch, tmp_path):
+    settings_file = tmp_path / "settings.json"
+    monkeypatch.setattr(main, "SETTINGS_PATH", settings_file)
+    monkeypatch.setattr(main, "SETTINGS", main.Settings())
+
+    main._save_settings()
+    assert list(tmp_path.glob("*.tmp")) == []
+    assert main.Settings.model_validate_json(settings_file.read_bytes()) == main.SETTINGS
+
+    writes = []
+    monkeypatch.setattr(main, "_write_file_atomic", lambda path, payload: writes.append(path))
+    main._save_settings()
+    assert writes == []
@@ -5,7 +5,10 @@ from app.db import Base
 from app.models_config_dq import ConversionDataQualityFact, ConversionPath, ConversionScopeDiagnosticFact
 from app.models_config_dq import ConversionKpiSignalFact, ConversionTaxonomyTouchpointFact
 from app.models_config_dq import JourneyInstanceFact, JourneyRoleFact, JourneyStepFact, JourneyTransitionFact, SilverConversionFact, SilverTouchpointFact, TouchpointVisitFact
+import app.services_conversions as services_conversions
+from app.services_journey_cache import invalidate_journey_cache, load_cached_journeys
 from app.services_conversions import (
+    apply_model_config_to_journeys,
     classify_journey_interaction,
     conversion_path_is_converted,
     conversion_path_payload,
@@ -67,6 +70,22 @@ def test_v2_to_legacy_preserves_quality_metadata():
     assert legacy["touchpoints"][0]["utm"] == {"source": "google", "medium": "cpc", "campaign": "brand"}
 
 
+def test_v2_to_legacy_shares_channel_strings_across_journeys():
+    def _journey(customer_id):
+        return {
+            "_schema": "v2",
+            "customer": {"id": customer_id},
+            "touchpoints": [{"channel": "".join(["paid_", "search"]), "ts": "2026-03-01T00:00:00Z"}],
+            "conversions": [],
+        }
+
+    first = v2_to_legacy(_journey("a"))
+    second = v2_to_legacy(_journey("b"))
+
+    assert first["touchpoints"][0]["channel"] == "paid_search"
+    assert first["touchpoints"][0]["channel"] is second["touchpoints"][0]["channel"]
+
+
 def test_v2_to_legacy_preserves_interaction_type_and_outcome_summary():
     journey = {
         "_schema": "v2",
@@ -130,6 +149,48 @@ def test_filter_journeys_by_windows_supports_click_only_and_view_through_modes()
     assert classify_journey_interaction(click_preferred[1]) == "click_through"
 
 
+def test_apply_model_config_to_journeys_skips_noop_config_and_reuses_results(monkeypatch):
+    monkeypatch.setattr(services_conversions, "_MODEL_CONFIG_RESULTS", {})
+    journeys = [
+        {"customer_id": "c1", "touchpoints": [{"channel": "email", "timestamp": "2026-03-01T00:00:00Z"}], "converted": True},
+        {"customer_id": "c2", "touchpoints": [{"channel": "seo", "timestamp": "2026-03-02T00:00:00Z"}], "converted": False},
+    ]
+    config = {"windows": {"click_lookback_days": 30}, "conversions": {"primary_conversion_key": "purchase"}}
+
+    assert apply_model_config_to_journeys(journeys, {}) is journeys
+    assert apply_model_config_to_journeys(journeys, {"windows": {"click_lookback_days": 0}, "quality": {}}) is journeys
+
+    applied = apply_model_config_to_journeys(journeys, config)
+    assert [j.get("kpi_type") for j in applied] == ["purchase", None]
+    assert apply_model_config_to_journeys(journeys, dict(config)) is applied
+    assert apply_model_config_to_journeys([dict(j) for j in journeys], config) is not applied
+    assert apply_model_config_to_journeys(journeys, {**config, "conversions": {"primary_conversion_key": "lead"}}) is not applied
+
+
+def test_apply_model_config_to_journeys_reuses_results_across_journey_cache_reads(monkeypatch):
+    monkeypatch.setattr(services_conversions, "_MODEL_CONFIG_RESULTS", {})
+    invalidate_journey_cache()
+    dataset = [
+        {"customer_id": "c1", "touchpoints": [{"channel": "email", "timestamp": "2026-03-01T00:00:00Z"}], "converted": True},
+        {"customer_id": "c2", "touchpoints": [{"channel": "seo", "timestamp": "2026-03-02T00:00:00Z"}], "converted": False},
+    ]
+    config = {"conversions": {"primary_conversion_key": "purchase"}}
+
+    def loader(_db, *, limit: int):
+        return dataset[:limit]
+
+    first_read = load_cached_journeys(object(), loader_fn=loader)
+    second_read = load_cached_journeys(object(), loader_fn=loader)
+    assert first_read is not second_read
+
+    applied = apply_model_config_to_journeys(first_read, config)
+    assert apply_model_config_to_journeys(second_read, config) is applied
+
+    invalidate_journey_cache()
+    reloaded = load_cached_journeys(object(), loader_fn=loader)
+    assert apply_model_config_to_journeys(reloaded, config) is not applied
+
+
 def test_persist_journeys_as_conversion_paths_stamps_import_metadata():
     db = _make_session()
     inserted = persist_journeys_as_conversion_paths(
@@ -0,0 +1,27 @@
+import app.services_import_runs as import_runs
+
+
+def test_import_runs_reuse_parsed_file_until_it_changes(monkeypatch, tmp_path):
+    runs_file = tmp_path / "import_runs.json"
+    monkeypatch.setattr(import_runs, "IMPORT_RUNS_FILE", runs_file)
+    monkeypatch.setattr(import_runs, "_LOAD_CACHE", {"key": None, "runs": []})
+
+    assert import_runs.get_last_successful_run() is None
+    import_runs.create_run(source="upload", status="error")
+    first = import_runs.create_run(source="upload", valid=3)
+
+    reads = []
+    original_read_text = type(runs_file).read_text
+    monkeypatch.setattr(
+        type(runs_file),
+        "read_text",
+        lambda self, *args, **kwargs: reads.append(self) or original_read_text(self, *args, **kwargs),
+    )
+
+    assert import_runs.get_last_successful_run()["id"] == first["id"]
+    assert [r["id"] for r in import_runs.get_runs(status="success", limit=1)] == [first["id"]]
+    assert reads == []
+
+    runs_file.write_text('[{"id": "external", "status": "success"}]', encoding="utf-8")
+    assert import_runs.get_last_successful_run()["id"] == "external"
+    assert reads == [runs_file]
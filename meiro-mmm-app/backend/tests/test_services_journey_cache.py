@@ -3,9 +3,12 @@ import sys
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
+import app.services_journey_cache as journey_cache
 from app.services_journey_cache import (
+    get_journey_cache_generation,
     get_journey_cache_status,
     invalidate_journey_cache,
+    journey_dataset_key,
     load_cached_journeys,
 )
 
@@ -64,3 +67,60 @@ def test_invalidate_journey_cache_clears_cached_state():
         "cached_limit": 0,
         "initialized": False,
     }
+
+
+def test_journey_cache_generation_changes_on_reload_and_invalidation():
+    invalidate_journey_cache()
+    start = get_journey_cache_generation()
+
+    def loader(_db, *, limit: int):
+        return [{"id": "1"}]
+
+    load_cached_journeys(object(), loader_fn=loader, limit=1)
+    loaded = get_journey_cache_generation()
+    load_cached_journeys(object(), loader_fn=loader, limit=1)
+
+    assert loaded > start
+    assert get_journey_cache_generation() == loaded
+    invalidate_journey_cache()
+    assert get_journey_cache_generation() > loaded
+
+
+def test_journey_dataset_key_matches_copies_of_the_same_dataset():
+    invalidate_journey_cache()
+    dataset = [{"id": "1"}, {"id": "2"}]
+
+    def loader(_db, *, limit: int):
+        return dataset[:limit]
+
+    first = load_cached_journeys(object(), loader_fn=loader, limit=2)
+    second = load_cached_journeys(object(), loader_fn=loader, limit=2)
+
+    assert first is not second
+    assert journey_dataset_key(first) == journey_dataset_key(second)
+    assert journey_dataset_key(first[:1]) != journey_dataset_key(first)
+    assert journey_dataset_key([dict(j) for j in first]) != journey_dataset_key(first)
+    key = journey_dataset_key(first)
+    invalidate_journey_cache()
+    assert journey_dataset_key(first) != key
+
+
+def test_load_cached_journeys_remembers_empty_result_briefly():
+    invalidate_journey_cache()
+    calls = []
+
+    def loader(_db, *, limit: int):
+        calls.append(limit)
+        return []
+
+    assert load_cached_journeys(object(), loader_fn=loader, limit=5) == []
+    assert load_cached_journeys(object(), loader_fn=loader, limit=5) == []
+    assert calls == [5]
+
+    journey_cache._CACHE["loaded_at"] -= journey_cache.EMPTY_RESULT_TTL_SECONDS + 1
+    load_cached_journeys(object(), loader_fn=loader, limit=5)
+    assert calls == [5, 5]
+
+    invalidate_journey_cache()
+    load_cached_journeys(object(), loader_fn=loader, limit=5)
+    assert calls == [5, 5, 5]
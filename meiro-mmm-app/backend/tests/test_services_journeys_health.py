@@ -1,6 +1,11 @@
 from types import SimpleNamespace
 
-from app.services_journeys_health import build_journeys_preview, build_journeys_summary
+from app.services_journeys_health import (
+    build_journeys_preview,
+    build_journeys_summary,
+    compute_journey_validation,
+    converted_count_and_channels,
+)
 
 
 def test_build_journeys_preview_includes_revenue_value():
@@ -45,3 +50,145 @@ def test_build_journeys_summary_uses_kpi_config_and_import_runs():
     assert out["total_value"] == 100.0
     assert out["quality"]["average_score"] == 72.0
     assert out["quality"]["low_share"] == 0.0
+
+
+def test_build_journeys_summary_reuses_dataset_aggregates(monkeypatch):
+    import app.services_journeys_health as journeys_health
+
+    journeys = [
+        {"customer_id": "c1", "converted": True, "touchpoints": [{"channel": "email", "timestamp": "2026-01-01T00:00:00Z"}]},
+        {"customer_id": "c2", "converted": False, "touchpoints": [{"channel": "seo", "timestamp": "2026-01-03T00:00:00Z"}]},
+    ]
+    kpi_config = SimpleNamespace(primary_kpi_id=None, definitions=[])
+    monkeypatch.setattr(journeys_health, "_DATASET_AGGREGATES_CACHE", {})
+    validations = []
+    original_validation = journeys_health.compute_journey_validation
+    monkeypatch.setattr(
+        journeys_health,
+        "compute_journey_validation",
+        lambda rows: validations.append(len(rows)) or original_validation(rows),
+    )
+
+    first = build_journeys_summary(journeys=list(journeys), kpi_config=kpi_config, get_import_runs_fn=lambda **_: [])
+    second = build_journeys_summary(journeys=list(journeys), kpi_config=kpi_config, get_import_runs_fn=lambda **_: [])
+    subset = build_journeys_summary(journeys=journeys[:1], kpi_config=kpi_config, get_import_runs_fn=lambda **_: [])
+
+    assert validations == [2, 1]
+    assert second["total_value"] == first["total_value"] and second["kpi_counts"] == first["kpi_counts"]
+    assert first["channels"] == ["email", "seo"]
+    assert first["date_max"] == "2026-01-03T00:00:00+00:00"
+    assert subset["channels"] == ["email"]
+    assert subset["converted"] == 1
+    # Entries pin the journeys their id-based key was built from.
+    assert all(entry["journeys"][0] is journeys[0] for entry in journeys_health._DATASET_AGGREGATES_CACHE.values())
+
+
+def test_build_journeys_preview_reuses_timestamp_spans_from_summary(monkeypatch):
+    import app.services_journeys_health as journeys_health
+
+    journeys = [
+        {
+            "customer_id": "c1",
+            "touchpoints": [
+                {"channel": "email", "timestamp": "2026-01-02T00:00:00+02:00"},
+                {"channel": "seo", "timestamp": "2026-01-01"},
+            ],
+        },
+        {"customer_id": "c2", "touchpoints": [{"channel": "seo", "timestamp": "not a date"}]},
+    ]
+    kpi_config = SimpleNamespace(primary_kpi_id=None, definitions=[])
+    monkeypatch.setattr(journeys_health, "_DATASET_AGGREGATES_CACHE", {})
+    monkeypatch.setattr(journeys_health, "_TIMESTAMP_SPANS_CACHE", {})
+    monkeypatch.setattr(journeys_health, "_PREVIEW_ROWS_CACHE", {})
+    parsed = []
+    original_parse = journeys_health._parse_timestamp
+    monkeypatch.setattr(journeys_health, "_parse_timestamp", lambda value: parsed.append(value) or original_parse(value))
+
+    summary = build_journeys_summary(journeys=journeys, kpi_config=kpi_config, get_import_runs_fn=lambda **_: [])
+    parsed_by_summary = len(parsed)
+    preview = build_journeys_preview(journeys=journeys, limit=20)
+
+    assert len(parsed) == parsed_by_summary == 3
+    assert summary["date_min"] == "2026-01-01T00:00:00+00:00"
+    assert summary["date_max"] == "2026-01-02T00:00:00+02:00"
+    assert preview["rows"][0]["first_ts"] == "2026-01-01T00:00:00+00:00"
+    assert preview["rows"][0]["last_ts"] == "2026-01-02T00:00:00+02:00"
+    assert preview["rows"][1]["first_ts"] is None
+    assert preview["rows"][0]["channels_list"] == ["email", "seo"]
+
+
+def test_compute_journey_validation_counts_duplicate_customer_ids():
+    journeys = [
+        {"customer_id": "c1", "touchpoints": [{"channel": "email", "timestamp": "2026-01-01"}]},
+        {"customer_id": "c1", "touchpoints": [{"timestamp": "2026-01-02"}]},
+        {"customer_id": "c2", "touchpoints": []},
+        {"customer_id": "", "touchpoints": [{"channel": "seo"}]},
+        {"touchpoints": [{"source": "google", "timestamp": "2026-01-03"}]},
+    ]
+
+    out = compute_journey_validation(journeys)
+
+    assert out == {
+        "error_count": 1,
+        "warn_count": 3,
+        "top_errors": ["Journey has no touchpoints"],
+        "top_warnings": [
+            "Touchpoint missing channel/source",
+            "Touchpoint missing timestamp",
+            "Duplicate customer_ids: 1 ids",
+        ],
+        "duplicate_ids_count": 1,
+    }
+
+
+def test_compute_journey_validation_keeps_first_seen_message_order():
+    journeys = [
+        {"customer_id": "c1", "touchpoints": [{"channel": "email"}] * 50 + [{"timestamp": "2026-01-01"}]},
+        {"customer_id": "c2", "touchpoints": []},
+        {"customer_id": "c3", "touchpoints": []},
+    ]
+
+    out = compute_journey_validation(journeys)
+
+    assert out["error_count"] == 2
+    assert out["warn_count"] == 51
+    assert out["top_errors"] == ["Journey has no touchpoints"]
+    assert out["top_warnings"] == ["Touchpoint missing timestamp", "Touchpoint missing channel/source"]
+
+
+def test_build_journeys_preview_reuses_materialized_rows(monkeypatch):
+    import app.services_journeys_health as journeys_health
+
+    monkeypatch.setattr(journeys_health, "_PREVIEW_ROWS_CACHE", {})
+    monkeypatch.setattr(journeys_health, "PREVIEW_ROWS_MAX", 2)
+    built = []
+    original_row = journeys_health._preview_row
+    monkeypatch.setattr(
+        journeys_health,
+        "_preview_row",
+        lambda idx, journey, span=None: built.append(idx) or original_row(idx, journey, span),
+    )
+    journeys = [
+        {"customer_id": f"c{i}", "touchpoints": [{"channel": "email", "timestamp": "2026-01-01T00:00:00Z"}]}
+        for i in range(3)
+    ]
+
+    first = build_journeys_preview(journeys=journeys, limit=1)
+    first["rows"][0]["channels_list"].append("mutated")
+    second = build_journeys_preview(journeys=list(journeys), limit=3)
+
+    assert built == [0, 1, 2]
+    assert [row["customer_id"] for row in second["rows"]] == ["c0", "c1", "c2"]
+    assert second["rows"][0]["channels_list"] == ["email"]
+    assert second["total"] == 3
+
+
+def test_converted_count_and_channels_single_pass():
+    journeys = [
+        {"converted": True, "touchpoints": [{"channel": "seo"}, {"channel": "email"}]},
+        {"converted": False, "touchpoints": [{}]},
+        {"touchpoints": [{"channel": "email"}]},
+    ]
+
+    assert converted_count_and_channels(journeys) == (2, ["email", "seo", "unknown"])
+    assert converted_count_and_channels([]) == (0, [])
@@ -0,0 +1,28 @@
+import json
+
+from app.services_meiro_import import _record_customer_id, read_cdp_profiles_file
+
+
+def test_read_cdp_profiles_file_matches_stdlib_json(tmp_path):
+    profiles = [{"customer_id": "č1", "touchpoints": [{"channel": "email"}], "conversion_value": 12.5}]
+    path = tmp_path / "meiro_cdp_profiles.json"
+    path.write_text(json.dumps(profiles, indent=2))
+
+    assert read_cdp_profiles_file(path) == profiles
+
+
+def test_read_cdp_profiles_file_accepts_nan_written_by_json_dump(tmp_path):
+    path = tmp_path / "meiro_cdp_profiles.json"
+    path.write_text(json.dumps([{"customer_id": "c1", "conversion_value": float("nan")}]))
+
+    profiles = read_cdp_profiles_file(path)
+
+    assert profiles[0]["customer_id"] == "c1"
+    assert profiles[0]["conversion_value"] != profiles[0]["conversion_value"]
+
+
+def test_record_customer_id_prefers_top_level_id_then_customer_object():
+    assert _record_customer_id({"customer_id": " c1 ", "customer": {"id": "c2"}}) == "c1"
+    assert _record_customer_id({"customer": {"id": "c2"}}) == "c2"
+    assert _record_customer_id({"customer": "c3"}) == ""
+    assert _record_customer_id({}) == ""
@@ -0,0 +1,21 @@
+import app.services_nba_defaults as nba_defaults
+
+
+def test_compute_next_best_action_cached_reuses_result_for_same_journeys(monkeypatch):
+    calls = []
+
+    def fake_compute(journeys, level="channel"):
+        calls.append((len(journeys), level))
+        return {"": [{"channel": "email", "count": len(journeys)}]}
+
+    monkeypatch.setattr(nba_defaults, "compute_next_best_action", fake_compute)
+    monkeypatch.setattr(nba_defaults, "_NBA_RAW_CACHE", {})
+    journeys = [{"touchpoints": [{"channel": "email"}]}, {"touchpoints": []}]
+
+    first = nba_defaults.compute_next_best_action_cached(list(journeys), level="channel")
+    second = nba_defaults.compute_next_best_action_cached(list(journeys), level="channel")
+    nba_defaults.compute_next_best_action_cached(list(journeys), level="campaign")
+    nba_defaults.compute_next_best_action_cached(journeys[:1], level="channel")
+
+    assert second is first
+    assert calls == [(2, "channel"), (2, "campaign"), (1, "channel")]
@@ -4,6 +4,7 @@ from app.services_performance_helpers import (
     build_mapping_coverage,
     build_performance_query_context,
     compute_campaign_trends,
+    compute_campaign_uplift,
     compute_total_converted_value_for_period,
     normalize_channel_filter,
     summarize_mapped_current,
@@ -75,6 +76,70 @@ def test_compute_campaign_trends_uses_revenue_entries():
     assert out["series"]["email:welcome"][0]["revenue"] == 70.0
 
 
+def test_compute_campaign_trends_reads_last_touch_of_copied_journeys(monkeypatch):
+    import app.services_performance_helpers as helpers
+
+    monkeypatch.setattr(helpers, "_LAST_TOUCH_CACHE", {})
+    journey = {
+        "converted": True,
+        "conversion_value": 10.0,
+        "touchpoints": [
+            {"channel": "email", "timestamp": "2026-01-09T00:00:00Z"},
+            {"channel": "paid", "campaign": "brand", "timestamp": "2026-01-10T00:00:00Z"},
+        ],
+    }
+    first = compute_campaign_trends([journey])
+    assert first["campaigns"] == ["paid:brand"]
+    assert compute_campaign_trends([journey]) == first
+    assert len(helpers._LAST_TOUCH_CACHE) == 1
+
+    trimmed = {**journey, "touchpoints": journey["touchpoints"][:1]}
+    out = compute_campaign_trends([trimmed])
+    assert out["campaigns"] == ["email"]
+    assert out["dates"] == ["2026-01-09"]
+
+
+def test_compute_campaign_uplift_counts_each_journey_once_per_step():
+    journeys = [
+        {"converted": True, "touchpoints": [{"channel": "email", "campaign": "welcome"}, {"channel": "email", "campaign": "welcome"}]},
+        {"converted": False, "touchpoints": [{"channel": "email", "campaign": "welcome"}, {"channel": "paid"}]},
+        {"touchpoints": [{"channel": "paid"}]},
+        {"converted": False, "touchpoints": []},
+    ]
+    out = compute_campaign_uplift(journeys)
+    assert set(out) == {"email:welcome", "paid"}
+    assert out["email:welcome"] == {
+        "treatment_n": 2,
+        "treatment_conversions": 1,
+        "treatment_rate": 0.5,
+        "holdout_n": 2,
+        "holdout_conversions": 1,
+        "holdout_rate": 0.5,
+        "uplift_abs": 0.0,
+        "uplift_rel": 0.0,
+    }
+    assert out["paid"]["treatment_conversions"] == 1
+    assert out["paid"]["holdout_rate"] == 0.5
+    assert compute_campaign_uplift([{"converted": True, "touchpoints": [{"channel": "x"}]}])["x"]["uplift_rel"] is None
+
+
+def test_compute_campaign_uplift_keeps_none_channel_step_counts():
+    journeys = [
+        {"converted": True, "touchpoints": [{"channel": None}]},
+        {"converted": False, "touchpoints": [{"channel": "email"}, {"channel": None}]},
+        {"converted": False, "touchpoints": [{"channel": "email"}]},
+    ]
+    out = compute_campaign_uplift(journeys)
+    assert set(out) == {None, "email"}
+    assert out[None]["treatment_n"] == 2
+    assert out[None]["treatment_conversions"] == 1
+    assert out[None]["holdout_n"] == 1
+    assert out[None]["holdout_conversions"] == 0
+    assert out["email"]["treatment_n"] == 2
+    assert out["email"]["treatment_conversions"] == 0
+    assert out["email"]["holdout_conversions"] == 1
+
+
 def test_build_mapping_coverage_calculates_percentages():
     coverage = build_mapping_coverage(
         mapped_spend=50.0,
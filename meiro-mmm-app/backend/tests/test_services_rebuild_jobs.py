@@ -14,6 +14,7 @@ from app.services_rebuild_jobs import (
     rebuild_taxonomy_dq_outputs,
 )
 from app.modules.settings.schemas import KpiConfigModel, KpiDefinitionModel
+from app.services_journey_cache import invalidate_journey_cache
 
 
 def test_rebuild_taxonomy_dq_outputs_prefers_db_facts(monkeypatch):
@@ -47,21 +48,30 @@ def test_rebuild_taxonomy_dq_outputs_falls_back_to_journeys(monkeypatch):
         "app.services_rebuild_jobs.persist_taxonomy_dq_snapshots_from_db",
         lambda db, taxonomy=None: None,
     )
-    monkeypatch.setattr(
-        "app.services_conversions.load_journeys_from_db",
-        lambda db, limit=10000: [{"id": "j1"}],
-    )
+    loads = []
+
+    def fake_load(db, limit=10000):
+        loads.append(limit)
+        return [{"id": "j1"}]
+
+    monkeypatch.setattr("app.services_conversions.load_journeys_from_db", fake_load)
     monkeypatch.setattr(
         "app.services_rebuild_jobs.persist_taxonomy_dq_snapshots",
         lambda db, journeys, taxonomy=None: ["fallback-snapshot", journeys, taxonomy],
     )
+    invalidate_journey_cache()
 
-    out = rebuild_taxonomy_dq_outputs(object(), taxonomy="taxonomy")
+    try:
+        out = rebuild_taxonomy_dq_outputs(object(), taxonomy="taxonomy")
+        rebuild_taxonomy_dq_outputs(object(), taxonomy="taxonomy")
+    finally:
+        invalidate_journey_cache()
 
     assert out["source"] == "journeys_fallback"
     assert out["snapshots"][0] == "fallback-snapshot"
     assert out["snapshots"][1] == [{"id": "j1"}]
     assert out["snapshots"][2] == "taxonomy"
+    assert loads == [10000]
 
 
 class _FakeScalarQuery:
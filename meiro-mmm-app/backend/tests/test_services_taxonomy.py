@@ -57,6 +57,30 @@ def test_compute_unknown_share_reads_nested_utm_fields():
     assert report.unknown_share == 0.0
 
 
+def test_compute_unknown_share_maps_each_utm_combination_once(monkeypatch):
+    import app.services_taxonomy as taxonomy_module
+
+    calls = []
+    original_map = taxonomy_module.map_to_channel
+
+    def counting_map(*args, **kwargs):
+        calls.append(args[:3])
+        return original_map(*args, **kwargs)
+
+    monkeypatch.setattr(taxonomy_module, "map_to_channel", counting_map)
+    journeys = [
+        {"touchpoints": [{"utm_source": "google", "utm_medium": "cpc"}, {"utm_source": "mystery", "utm_medium": "x"}]},
+        {"touchpoints": [{"utm": {"source": "google", "medium": "cpc"}}, {"source": "mystery", "medium": "x"}]},
+    ]
+
+    report = compute_unknown_share(journeys)
+
+    assert len(calls) == 2
+    assert report.total_touchpoints == 4
+    assert report.unknown_count == 2
+    assert report.by_source_medium == {("mystery", "x"): 2}
+
+
 def test_compute_unknown_share_on_v2_legacy_roundtrip_preserves_utm_mapping():
     v2_journey = {
         "_schema": "v2",
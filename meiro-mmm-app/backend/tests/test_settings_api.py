@@ -10,6 +10,7 @@ from app.db import Base, get_db
 from app.main import app
 import app.main as main_module
 from app.models_config_dq import JourneyDefinition, JourneyHypothesis
+from app.modules.settings.schemas import NBASettings
 from app.utils.kpi_config import default_kpi_config
 
 
@@ -159,6 +160,19 @@ def test_update_kpis_invokes_shared_rebuild_job(client: TestClient, monkeypatch)
     assert calls == [("purchase", "lead", None)]
 
 
+def test_get_kpis_reuses_model_until_config_is_replaced(client: TestClient):
+    first = main_module._get_kpi_config_model()
+    assert main_module._get_kpi_config_model() is first
+    assert client.get("/api/kpis").json() == first.model_dump()
+
+    main_module.KPI_CONFIG = default_kpi_config()
+    main_module.KPI_CONFIG.primary_kpi_id = "lead"
+
+    replaced = main_module._get_kpi_config_model()
+    assert replaced is not first
+    assert client.get("/api/kpis").json()["primary_kpi_id"] == "lead"
+
+
 def test_taxonomy_rebuild_endpoint_invokes_shared_job(client: TestClient, monkeypatch):
     calls = []
 
@@ -269,3 +283,184 @@ def test_sync_nba_promoted_policies_from_journey_lab(client_and_session):
     assert settings_resp.status_code == 200
     settings_payload = settings_resp.json()
     assert settings_payload["nba"]["promoted_journey_policies"][0]["hypothesis_id"] == "hyp-settings-sync"
+
+
+def test_replace_settings_only_invalidates_journeys_on_revenue_change(monkeypatch, tmp_path):
+    monkeypatch.setattr(main_module, "SETTINGS_PATH", tmp_path / "settings.json")
+    monkeypatch.setattr(main_module, "SETTINGS", main_module.Settings())
+    invalidations = []
+    monkeypatch.setattr(main_module, "invalidate_journey_cache", lambda: invalidations.append(True))
+
+    current = main_module.SETTINGS
+    main_module._replace_settings(
+        current.model_copy(update={"nba": current.nba.model_copy(update={"min_prefix_support": 42})})
+    )
+    assert invalidations == []
+
+    current = main_module.SETTINGS
+    main_module._replace_settings(
+        current.model_copy(update={"revenue_config": current.revenue_config.model_copy(update={"default_value": 5.0})})
+    )
+    assert invalidations == [True]
+
+
+def test_replace_revenue_config_keeps_journey_cache_when_unchanged(monkeypatch, tmp_path):
+    monkeypatch.setattr(main_module, "SETTINGS_PATH", tmp_path / "settings.json")
+    monkeypatch.setattr(main_module, "SETTINGS", main_module.Settings())
+    invalidations = []
+    monkeypatch.setattr(main_module, "invalidate_journey_cache", lambda: invalidations.append(True))
+
+    main_module._replace_revenue_config(main_module.RevenueConfig(conversion_names=["purchase", "purchase"]))
+    assert invalidations == []
+
+    main_module._replace_revenue_config(main_module.RevenueConfig(conversion_names=["purchase", "lead"]))
+    assert invalidations == [True]
+
+
+def test_replace_revenue_config_returns_normalized_config(monkeypatch, tmp_path):
+    monkeypatch.setattr(main_module, "SETTINGS_PATH", tmp_path / "settings.json")
+    monkeypatch.setattr(main_module, "SETTINGS", main_module.Settings())
+    monkeypatch.setattr(main_module, "invalidate_journey_cache", lambda: None)
+
+    out = main_module._replace_revenue_config(
+        main_module.RevenueConfig(
+            conversion_names=["refund", " purchase", "refund"],
+            base_currency="usd",
+            fx_rates_json={"eur": 1.1, "bad": -1},
+        )
+    )
+
+    assert out["conversion_names"] == ["purchase", "refund"]
+    assert out["base_currency"] == "USD"
+    assert out["fx_rates_json"] == {"EUR": 1.1}
+    assert main_module.SETTINGS.revenue_config == main_module.RevenueConfig(**out)
+    assert main_module.normalize_revenue_config(main_module.SETTINGS.revenue_config.model_dump()) == out
+
+
+def test_attribution_preview_counts_window_quality_and_converted_impact(client: TestClient, monkeypatch):
+    journeys = [
+        {
+            "converted": True,
+            "quality_score": 80,
+            "touchpoints": [
+                {"channel": "email", "timestamp": "2026-01-01T00:00:00"},
+                {"channel": "paid", "timestamp": "2026-01-20T00:00:00"},
+                {"channel": "seo", "timestamp": "2026-01-05T00:00:00"},
+            ],
+        },
+        {"converted": False, "quality_score": 10, "touchpoints": [{"channel": "email", "timestamp": "2026-01-01T00:00:00"}]},
+        {"converted": True, "quality_score": 60, "touchpoints": [{"channel": "paid", "timestamp": "bad"}]},
+    ]
+    monkeypatch.setattr(main_module, "load_cached_journeys", lambda *_args, **_kwargs: list(journeys))
+    main_module.SETTINGS = main_module.Settings()
+    proposed = main_module.SETTINGS.attribution.model_dump()
+    proposed.update({"lookback_window_days": 7, "min_journey_quality_score": 50, "use_converted_flag": False})
+
+    for _ in range(2):
+        resp = client.post("/api/attribution/preview", headers={"X-User-Role": "admin"}, json={"settings": proposed})
+        assert resp.status_code == 200
+        body = resp.json()
+        assert body["totalJourneys"] == 3
+        assert body["eligibleJourneys"] == 2
+        assert body["windowImpactCount"] == 1
+        assert body["windowDirection"] == "tighten"
+        assert body["qualityImpactCount"] == 1
+        assert body["useConvertedFlagImpact"] == 1
+        assert body["useConvertedFlagDirection"] == "more_included"
+
+
+def test_current_user_id_reuses_given_session_and_memoizes_per_request(monkeypatch):
+    from types import SimpleNamespace
+
+    calls = []
+
+    def fake_resolve(db, raw_session_id):
+        calls.append((db, raw_session_id))
+        return SimpleNamespace(user=SimpleNamespace(id="user-1"))
+
+    def fail_internal_session():
+        raise AssertionError("should reuse the caller's session")
+
+    monkeypatch.setattr(main_module, "resolve_auth_context", fake_resolve)
+    monkeypatch.setattr(main_module, "_internal_db_session", fail_internal_session)
+    request = SimpleNamespace(
+        cookies={main_module.SESSION_COOKIE_NAME: "sess"},
+        headers={},
+        query_params={},
+        state=SimpleNamespace(),
+    )
+
+    assert main_module._current_user_id(request, "db") == "user-1"
+    assert main_module._current_user_id(request, "db") == "user-1"
+    assert calls == [("db", "sess")]
+
+
+def test_nba_test_scores_requested_prefix_against_its_baseline(client: TestClient, monkeypatch):
+    journeys = [
+        {"converted": True, "conversion_value": 10.0, "touchpoints": [{"channel": "email"}, {"channel": "paid"}]},
+        {"converted": False, "touchpoints": [{"channel": "email"}, {"channel": "paid"}]},
+        {"converted": True, "conversion_value": 5.0, "touchpoints": [{"channel": "email"}, {"channel": "seo"}]},
+        {"converted": True, "conversion_value": 5.0, "touchpoints": [{"channel": "seo"}, {"channel": "paid"}]},
+    ]
+    monkeypatch.setattr(main_module, "load_cached_journeys", lambda *_args, **_kwargs: list(journeys))
+    settings = NBASettings(min_prefix_support=1, min_conversion_rate=0.0, min_next_support=1).model_dump()
+
+    resp = client.post("/api/nba/test", json={"settings": settings, "path_prefix": "email", "level": "channel"})
+
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["prefix"] == "email"
+    assert body["totalPrefixSupport"] == 3
+    assert body["baselineConversionRate"] == pytest.approx(2 / 3)
+    by_step = {rec["step"]: rec for rec in body["recommendations"]}
+    assert set(by_step) == {"paid", "seo"}
+    assert by_step["seo"]["uplift_pct"] == pytest.approx(0.5)
+    assert by_step["paid"]["uplift_pct"] == pytest.approx(-0.25)
+
+
+def test_serialized_taxonomy_is_reused_until_file_changes(monkeypatch, tmp_path):
+    import app.modules.settings.router as settings_router
+    import app.utils.taxonomy as taxonomy_utils
+
+    monkeypatch.setattr(taxonomy_utils, "_taxonomy_path", lambda: tmp_path / "taxonomy.json")
+    monkeypatch.setattr(settings_router, "_SERIALIZED_TAXONOMY_CACHE", {"entry": None})
+    loads = []
+    original_load = taxonomy_utils.load_taxonomy
+
+    def counting_load():
+        loads.append(True)
+        return original_load()
+
+    monkeypatch.setattr(settings_router, "load_taxonomy", counting_load)
+
+    first = settings_router._serialize_taxonomy()
+    second = settings_router._serialize_taxonomy()
+    assert second is first
+    assert len(loads) == 1
+
+    taxonomy = original_load()
+    taxonomy.source_aliases = {"gg": "google"}
+    taxonomy_utils.save_taxonomy(taxonomy)
+
+    assert settings_router._serialize_taxonomy()["source_aliases"] == {"gg": "google"}
+    assert len(loads) == 2
+
+
+def test_kpi_test_matches_events_then_falls_back_to_kpi_type(client: TestClient, monkeypatch):
+    journeys = [
+        {"kpi_type": "lead", "events": [{"name": " Lead ", "value": 10}, {"event_name": "lead", "value": ""}]},
+        {"kpi_type": "LEAD", "value": None},
+        {"kpi_type": "purchase", "converted": True},
+    ]
+    monkeypatch.setattr(main_module, "load_cached_journeys", lambda *_args, **_kwargs: list(journeys))
+    definition = {"id": "lead", "label": "Lead", "type": "conversion", "event_name": "lead", "value_field": "value"}
+
+    for _ in range(2):
+        resp = client.post("/api/kpis/test", json={"definition": definition})
+        assert resp.status_code == 200
+        body = resp.json()
+        assert body["eventsMatched"] == 3
+        assert body["journeysMatched"] == 2
+        assert body["missingValueChecks"] == 3
+        assert body["missingValueCount"] == 2
+        assert body["message"] == "Matched using KPI ID fallback; event stream not found."
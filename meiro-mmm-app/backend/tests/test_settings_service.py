@@ -0,0 +1,25 @@
+import os
+
+from app.modules.settings.service import clear_settings_file_cache, load_settings_file
+
+
+def test_load_settings_file_reparses_only_when_mtime_changes(tmp_path):
+    path = tmp_path / "settings.json"
+    path.write_text('{"nba": {"min_prefix_support": 7}}')
+    clear_settings_file_cache()
+
+    first = load_settings_file(path)
+    assert first is not None and first.nba.min_prefix_support == 7
+    assert load_settings_file(path) is first
+
+    path.write_text('{"nba": {"min_prefix_support": 9}}')
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    second = load_settings_file(path)
+    assert second is not first
+    assert second.nba.min_prefix_support == 9
+
+    path.write_text("{not json")
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2_000_000))
+    assert load_settings_file(path) is None
+    assert load_settings_file(tmp_path / "missing.json") is None